@@ -1,70 +1,25 @@
-from datetime import datetime
-from Application.One import EcommOne
-from Application.WebDriverManager import Driver
-import pandas as pd
-
-
-INPUT_FILE_PATH = "INPUT.csv" # <<<< INPUT FILE TYPE MUST MATCH THE OUTPUT FILE TYPE
-OUTPUT_FILE_PATH = "OUTPUT.csv"
-if INPUT_FILE_PATH.endswith(".csv") and OUTPUT_FILE_PATH.endswith(".csv"):
-    input_file = pd.read_csv(INPUT_FILE_PATH)
-elif INPUT_FILE_PATH.endswith(".xlsx") and OUTPUT_FILE_PATH.endswith(".xlsx"):
-    input_file = pd.read_excel(INPUT_FILE_PATH)
-else:
-    raise ValueError("Incorrect file format.")
-
-booking_numbers = input_file.iloc[:, 0].dropna().unique().tolist()
-
-driver = Driver()
-base_url = "https://ecomm.one-line.com/one-ecom/manage-shipment/cargo-tracking"
-
-One = EcommOne(Driver().driver, base_url)
-    
-One.start(booking_numbers)
-milestone_keys = {"Gate in", "Departure", "Arrival", "Discharge", "Gate out for delivery"}
-
-data_list = []
-
-for shipment in One.shipments:
-
-    
-    for container in shipment.containers:
-        container_data = {
-                "Shipment ID": shipment.booking_number,
-                "Container ID": container.id,
-                "Gate in": None,
-                "Departure": None,
-                "Arrival": None,
-                "Discharge": None,
-                "Gate out for delivery": None
-            }
-       
-        for milestone in container.milestones:
-            if milestone.event not in milestone_keys:
-                continue  # skip unnecessary milestones
-
-            # this control flow records the first occurrence of Gate in and Departure
-            # and the last occurrence of Arrival, Discharge, and Gate out for delivery
-
-            if (container_data[milestone.event] is not None and milestone.event not in ["Gate in", "Departure"]) or (container_data[milestone.event] is None):
-                container_data[milestone.event] = milestone.date
-                if milestone.event in ["Arrival", "Departure"]:
-                    container_data[f"{milestone.event} Vessel Name"] = milestone.vessel_name
-                    container_data[f"{milestone.event} Voyage ID"] = milestone.vessel_id 
-
-        scrape_date = datetime.now().strftime("%m/%d/%y %H:%M %p")
-        container_data['Scrape Date'] = scrape_date
-
-        container_data['Status'] = 'Complete' if container.is_complete else 'On-going'
-                
-        data_list.append(container_data)
-
-df = pd.DataFrame(data_list)
-df.to_csv(OUTPUT_FILE_PATH, index=False)
-
-One.close()
-            
-
-
-
-
+from Application.Runner import RunConfig, read_booking_numbers, run_sharded
+
+# For command line runs see: python -m Application --help
+INPUT_FILE_PATH = "INPUT.csv" # .csv, .xlsx or .parquet
+OUTPUT_FILE_PATH = "OUTPUT.csv" # .csv, .xlsx or .parquet, independent of the input type
+WORKERS = 1 # worker processes, each owning one browser
+POOL_SIZE = 1 # number of browsers scraping in parallel in a single process
+WARM_SESSION = True # reuse the loaded page between bookings instead of refreshing
+USE_API = False # fetch through the tracking API first (endpoint not validated against the live site yet)
+CAPTURE_NETWORK = False # build shipments from the page's captured JSON responses instead of the DOM
+CACHE_PATH = "cache.sqlite3" # set to None to always fetch every booking
+CACHE_TTL = 6 * 60 * 60 # seconds before an on-going shipment is fetched again, completed ones never are
+LAZY_CONTAINERS = True # only open containers whose summary row changed since they were cached
+CHUNK_SIZE = 100 # bookings fetched before their rows are appended to the output
+THROUGHPUT = False # headless browsers with images, fonts, stylesheets and analytics blocked
+ADAPTIVE_RATE = True # slow the browsers down when the site does and speed them up again
+SCHEDULE = False # only fetch cached bookings whose next milestone is predicted soon
+DIFF_PATH = None # e.g. "DELTAS.jsonl" to also append the milestone changes since the previous run
+
+if __name__ == "__main__":
+    config = RunConfig(pool_size=POOL_SIZE, warm_session=WARM_SESSION, use_api=USE_API,
+                       capture_network=CAPTURE_NETWORK, cache_path=CACHE_PATH, cache_ttl=CACHE_TTL,
+                       lazy_containers=LAZY_CONTAINERS, chunk_size=CHUNK_SIZE, throughput=THROUGHPUT,
+                       adaptive_rate=ADAPTIVE_RATE, diff_path=DIFF_PATH, schedule=SCHEDULE)
+    run_sharded(config, read_booking_numbers(INPUT_FILE_PATH), OUTPUT_FILE_PATH, WORKERS)
@@ -0,0 +1,167 @@
+import argparse
+import sqlite3
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from Application.Events import configure, load_mapping, normalize_event, GATE_IN, DEPARTURE, ARRIVAL, DISCHARGE, GATE_OUT
+from Application.Records import ShipmentRecord, DATE_FORMAT, NO_DATE
+
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+MILESTONE_KEYS = [GATE_IN, DEPARTURE, ARRIVAL, DISCHARGE, GATE_OUT]
+FIRST_OCCURRENCE_KEYS = [GATE_IN, DEPARTURE]  # every other key keeps its last occurrence
+VESSEL_KEYS = [DEPARTURE, ARRIVAL]
+OUTPUT_COLUMNS = [
+    "Shipment ID", "Container ID",
+    *MILESTONE_KEYS,
+    "Departure Vessel Name", "Departure Voyage ID", "Arrival Vessel Name", "Arrival Voyage ID",
+    "Scrape Date", "Status", "Error",
+]
+SCRAPE_DATE_FORMAT = "%m/%d/%y %H:%M %p"
+
+# Long-form milestone frame, one row per milestone (a container without milestones gets one empty row,
+# a booking that could not be fetched gets one row without a container and with its error)
+MILESTONE_COLUMNS = [
+    "booking_number", "container_position", "container_id", "is_complete",
+    "event", "date", "vessel_name", "vessel_id", "error",
+]
+
+CACHE_QUERY = """
+SELECT c.booking_number, c.position AS container_position, c.container_id, c.is_complete,
+       m.event, m.date, m.vessel_name, m.vessel_id
+FROM containers c
+LEFT JOIN milestones m ON m.booking_number = c.booking_number AND m.container_position = c.position
+ORDER BY c.booking_number, c.position, m.position
+"""
+
+
+def milestone_frame(shipments: Iterable[ShipmentRecord]) -> pd.DataFrame:
+    """
+    Build the long-form milestone frame from shipment records.
+
+    Args:
+        shipments (Iterable[ShipmentRecord]): Shipments in output order
+
+    Returns:
+        pd.DataFrame: One row per milestone with the MILESTONE_COLUMNS
+    """
+    columns = {name: [] for name in MILESTONE_COLUMNS}
+    for shipment in shipments:
+        if shipment.error is not None:
+            for name in MILESTONE_COLUMNS:
+                columns[name].append(None)
+            columns["booking_number"][-1] = shipment.booking_number
+            columns["container_position"][-1] = 0
+            columns["is_complete"][-1] = False
+            columns["error"][-1] = shipment.error
+            continue
+        for container_position, container in enumerate(shipment.containers):
+            for milestone in container.milestones or (None,):
+                columns["booking_number"].append(shipment.booking_number)
+                columns["container_position"].append(container_position)
+                columns["container_id"].append(container.id)
+                columns["is_complete"].append(container.is_complete)
+                columns["event"].append(milestone.event if milestone else None)
+                columns["date"].append(milestone.date if milestone else None)
+                columns["vessel_name"].append(milestone.vessel_name if milestone else None)
+                columns["vessel_id"].append(milestone.vessel_id if milestone else None)
+                columns["error"].append(None)
+
+    frame = pd.DataFrame(columns, columns=MILESTONE_COLUMNS)
+    frame["date"] = pd.to_datetime(frame["date"])
+    return frame
+
+
+def read_cache(path: str) -> pd.DataFrame:
+    """
+    Load every cached milestone as a long-form milestone frame.
+
+    Args:
+        path (str): Location of a ResultCache SQLite database
+
+    Returns:
+        pd.DataFrame: One row per milestone with the MILESTONE_COLUMNS
+    """
+    with sqlite3.connect(path) as connection:
+        frame = pd.read_sql_query(CACHE_QUERY, connection)
+    frame["is_complete"] = frame["is_complete"].astype(bool)
+    frame["date"] = pd.to_datetime(frame["date"], format="ISO8601", errors="coerce")
+    frame["error"] = None  # failures are never cached
+    return frame
+
+
+def aggregate(milestones: pd.DataFrame, scrape_date: Optional[str] = None) -> pd.DataFrame:
+    """
+    Turn the long-form milestone frame into one output row per container.
+
+    Keeps the first occurrence of Gate in and Departure and the last occurrence
+    of Arrival, Discharge and Gate out for delivery, with the vessel of the
+    chosen Departure and Arrival milestones. A booking that could not be fetched
+    gets a single row with the Error status and its error message.
+
+    Args:
+        milestones (pd.DataFrame): Frame with the MILESTONE_COLUMNS, in milestone order
+        scrape_date (Optional[str]): Value of the Scrape Date column, defaults to now
+
+    Returns:
+        pd.DataFrame: The output rows with the OUTPUT_COLUMNS, containers in input order
+    """
+    scrape_date = scrape_date or datetime.now().strftime(SCRAPE_DATE_FORMAT)
+    milestones = milestones.assign(
+        container=milestones.groupby(["booking_number", "container_position"], sort=False).ngroup()
+    )
+    containers = milestones.drop_duplicates("container").set_index("container")
+
+    # events cached before the canonical names were introduced are mapped once per distinct text
+    events = milestones["event"].dropna().unique()
+    canonical = {event: normalize_event(event) for event in events}
+    if any(event != name for event, name in canonical.items()):
+        milestones = milestones.assign(event=milestones["event"].map(canonical))
+
+    relevant = milestones[milestones["event"].isin(MILESTONE_KEYS)]
+    is_first_key = relevant["event"].isin(FIRST_OCCURRENCE_KEYS)
+    picked = pd.concat([
+        relevant[is_first_key].drop_duplicates(["container", "event"], keep="first"),
+        relevant[~is_first_key].drop_duplicates(["container", "event"], keep="last"),
+    ])
+    picked = picked.assign(date=picked["date"].dt.strftime(DATE_FORMAT).fillna(NO_DATE))
+    wide = picked.pivot(index="container", columns="event", values=["date", "vessel_name", "vessel_id"])
+
+    output = pd.DataFrame(index=containers.index)
+    output["Shipment ID"] = containers["booking_number"]
+    output["Container ID"] = containers["container_id"]
+    for key in MILESTONE_KEYS:
+        output[key] = wide.get(("date", key))
+    for key in VESSEL_KEYS:
+        output[f"{key} Vessel Name"] = wide.get(("vessel_name", key))
+        output[f"{key} Voyage ID"] = wide.get(("vessel_id", key))
+    output["Scrape Date"] = scrape_date
+    output["Status"] = np.where(containers["error"].notna(), 'Error',
+                                np.where(containers["is_complete"], 'Complete', 'On-going'))
+    output["Error"] = containers["error"]
+
+    output = output[OUTPUT_COLUMNS].reset_index(drop=True)
+    return output.astype(object).where(output.notna(), None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate a result cache into the output format.")
+    parser.add_argument("cache", help="ResultCache SQLite database")
+    parser.add_argument("output", help="Output .csv or .xlsx file")
+    parser.add_argument("--event-mapping", help="JSON list of [pattern, event] pairs replacing the built-in one")
+    args = parser.parse_args()
+
+    if args.event_mapping:
+        configure(load_mapping(args.event_mapping))
+
+    result = aggregate(read_cache(args.cache))
+    if args.output.endswith(".xlsx"):
+        result.to_excel(args.output, index=False)
+    else:
+        result.to_csv(args.output, index=False)
+    print(f"Wrote {len(result)} containers to {args.output}")
@@ -0,0 +1,284 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from Application.Metrics import metrics
+from Application.Milestone import Milestone
+from Application.Records import ContainerRecord, MilestoneRecord, ShipmentRecord, parse_date
+from Application.RunIndex import RunIndex
+from Application.Search import BookingNotFound
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+API_BASE_URL = "https://ecomm.one-line.com"
+TRACKING_PATH = "/ecom/CUP_HOM_3301GS.do"
+REFERER = "https://ecomm.one-line.com/one-ecom/manage-shipment/cargo-tracking"
+SEARCH_COMMAND = "121"  # booking number -> container list
+DETAIL_COMMAND = "125"  # container -> event list
+TIMEOUT = 30
+MAX_WORKERS = 8
+
+# Field names used by the tracking page's JSON responses
+CONTAINER_ID_FIELD = "cntrNo"
+BOOKING_FIELD = "bkgNo"
+COP_FIELD = "copNo"
+EVENT_FIELD = "statusNm"
+DATE_FIELD = "eventDt"
+PLACE_FIELD = "placeNm"
+YARD_FIELD = "yardNm"
+VESSEL_NAME_FIELD = "vslEngNm"
+VOYAGE_FIELD = "skdVoyNo"
+DIRECTION_FIELD = "skdDirCd"
+
+
+class TrackingApiError(Exception):
+    """Raised when the tracking API returns an error or an unexpected payload."""
+
+
+def parse_milestone(event: Dict[str, Any]) -> MilestoneRecord:
+    """
+    Build a MilestoneRecord from one entry of a container event list.
+
+    Args:
+        event (Dict[str, Any]): One entry of the DETAIL_COMMAND response list
+
+    Returns:
+        MilestoneRecord: The parsed milestone
+    """
+    location = event.get(PLACE_FIELD) or ""
+    if event.get(YARD_FIELD):
+        location = f"{location}\n{event[YARD_FIELD]}" if location else event[YARD_FIELD]
+
+    vessel_name = event.get(VESSEL_NAME_FIELD) or None
+    voyage = f"{event.get(VOYAGE_FIELD) or ''}{event.get(DIRECTION_FIELD) or ''}" or None
+    return MilestoneRecord(
+        event=Milestone.normalize_event(event.get(EVENT_FIELD) or ""),
+        date=parse_date(event.get(DATE_FIELD)),
+        location=location,
+        vessel_name=vessel_name,
+        vessel_id=voyage if vessel_name else None,
+    )
+
+
+def parse_container(container_row: Dict[str, Any], events: List[Dict[str, Any]]) -> ContainerRecord:
+    """
+    Build a ContainerRecord from its search result row and its event list.
+
+    Args:
+        container_row (Dict[str, Any]): One entry of the SEARCH_COMMAND response list
+        events (List[Dict[str, Any]]): The DETAIL_COMMAND response list for the container
+
+    Returns:
+        ContainerRecord: The parsed container
+
+    Raises:
+        IndexError: If the container has no events
+    """
+    return ContainerRecord.from_milestones(
+        container_row[CONTAINER_ID_FIELD],
+        [parse_milestone(event) for event in events],
+    )
+
+
+class TrackingApi:
+    """
+    Fetches shipments from the JSON endpoints behind the cargo tracking page.
+
+    One pooled `requests.Session` is shared by every call so connections are kept
+    alive and reused. Responses can be recorded into fixture files that
+    `Application.StubServer` serves back for offline runs.
+
+    Attributes:
+        base_url (str): Scheme and host of the tracking API
+        max_workers (int): Number of bookings fetched concurrently by get_shipments
+        record_dir (Optional[str]): Directory where responses are recorded as fixtures
+        index (Optional[RunIndex]): Containers already fetched in this run
+    """
+
+    def __init__(self, base_url: str = API_BASE_URL, max_workers: int = MAX_WORKERS,
+                 record_dir: Optional[str] = None, index: Optional[RunIndex] = None) -> None:
+        """
+        Initialize a TrackingApi instance.
+
+        Args:
+            base_url (str): Scheme and host of the tracking API
+            max_workers (int): Number of bookings fetched concurrently by get_shipments
+            record_dir (Optional[str]): Directory where responses are recorded as fixtures
+            index (Optional[RunIndex]): Containers already fetched in this run, whose events are not requested again
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.record_dir = record_dir
+        self.index = index
+        self._record_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                              allowed_methods=None),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json, text/javascript, */*; q=0.01",
+            "X-Requested-With": "XMLHttpRequest",
+            "Referer": REFERER,
+            "Connection": "keep-alive",
+        })
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _post(self, form: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Post a form to the tracking endpoint and return its result list.
+
+        Raises:
+            TrackingApiError: If the request fails or the payload has no result list
+        """
+        try:
+            with metrics.span(f"api request {form.get('f_cmd')}"):
+                response = self.session.post(f"{self.base_url}{TRACKING_PATH}", data=form, timeout=TIMEOUT)
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise TrackingApiError(f"Tracking request {form.get('f_cmd')} failed: {e}") from e
+
+        if not isinstance(payload, dict) or not isinstance(payload.get("list"), list):
+            raise TrackingApiError(f"Unexpected tracking payload for command {form.get('f_cmd')}")
+        return payload["list"]
+
+    def search(self, booking_number: str) -> List[Dict[str, Any]]:
+        """
+        Get the container rows of a booking.
+
+        Raises:
+            BookingNotFound: If the booking has no containers
+            TrackingApiError: If the request fails
+        """
+        rows = self._post({
+            "f_cmd": SEARCH_COMMAND,
+            "search_type": "B",
+            "search_name": booking_number,
+            "cust_cd": "",
+        })
+        if not rows:
+            raise BookingNotFound(f"No results for booking {booking_number}")
+        return rows
+
+    def get_events(self, booking_number: str, container_row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Get the event list of one container.
+
+        Raises:
+            TrackingApiError: If the request fails
+        """
+        return self._post({
+            "f_cmd": DETAIL_COMMAND,
+            "cntr_no": container_row[CONTAINER_ID_FIELD],
+            "bkg_no": container_row.get(BOOKING_FIELD) or booking_number,
+            "cop_no": container_row.get(COP_FIELD) or "",
+        })
+
+    def get_shipment(self, booking_number: str) -> ShipmentRecord:
+        """
+        Fetch one booking and build the same model the browser scraper produces.
+
+        Containers already fetched in this run are taken from the index instead of
+        requesting their events again, except when recording, as fixtures need
+        every response.
+
+        Args:
+            booking_number (str): The booking number to fetch
+
+        Returns:
+            ShipmentRecord: The shipment with its containers and milestones
+
+        Raises:
+            BookingNotFound: If the booking has no containers
+            TrackingApiError: If any request fails, a container has no events or a
+                response does not have the expected shape
+        """
+        booking_number = str(booking_number)
+        logging.info(f"Fetching booking {booking_number} from the tracking API...")
+        container_rows = self.search(booking_number)
+
+        containers = []
+        details = {}
+        index = self.index if not self.record_dir else None
+        try:
+            for container_row in container_rows:
+                journey = container_row.get(COP_FIELD)
+                known = index.container(container_row[CONTAINER_ID_FIELD], journey) if index is not None else None
+                if known is not None:
+                    containers.append(known)
+                    continue
+                events = self.get_events(booking_number, container_row)
+                details[container_row[CONTAINER_ID_FIELD]] = events
+                container = parse_container(container_row, events)
+                containers.append(container)
+                if index is not None:
+                    index.add_container(container, journey)
+        except (IndexError, KeyError, TypeError, AttributeError, ValueError) as e:
+            # any payload shape the parser does not expect sends the booking to the browser
+            raise TrackingApiError(f"Incomplete data for booking {booking_number}: {e!r}") from e
+
+        self._record(booking_number, container_rows, details)
+        return ShipmentRecord(booking_number, tuple(containers))
+
+    def get_shipments(self, booking_numbers: List[str]) -> Tuple[Dict[int, ShipmentRecord], Dict[int, str]]:
+        """
+        Fetch many bookings concurrently over the shared session.
+
+        Args:
+            booking_numbers (List[str]): Booking numbers to fetch
+
+        Returns:
+            Tuple[Dict[int, ShipmentRecord], Dict[int, str]]: Shipments and failed booking
+            numbers, both keyed by input position; a booking the API does not know is
+            returned as an error record rather than a failure, as the browser would not
+            find it either
+        """
+        shipments: Dict[int, ShipmentRecord] = {}
+        failures: Dict[int, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                index: executor.submit(self.get_shipment, booking_number)
+                for index, booking_number in enumerate(booking_numbers)
+            }
+            for index, future in futures.items():
+                try:
+                    shipments[index] = future.result()
+                except BookingNotFound as e:
+                    shipments[index] = ShipmentRecord.failed(booking_numbers[index], str(e))
+                except TrackingApiError as e:
+                    logging.warning(f"Tracking API failed for {booking_numbers[index]}: {e}")
+                    failures[index] = str(booking_numbers[index])
+        return shipments, failures
+
+    def _record(self, booking_number: str, container_rows: List[Dict[str, Any]],
+                details: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        Save the raw responses of a booking as a fixture file when recording is enabled.
+        """
+        if not self.record_dir:
+            return
+        with self._record_lock:
+            os.makedirs(self.record_dir, exist_ok=True)
+        path = os.path.join(self.record_dir, f"{booking_number}.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"search": {"list": container_rows},
+                       "details": {cntr: {"list": events} for cntr, events in details.items()}},
+                      file, indent=2)
+        logging.info(f"Recorded tracking fixture {path}")
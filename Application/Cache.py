@@ -0,0 +1,206 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from Application.Records import ContainerRecord, MilestoneRecord, ShipmentRecord, parse_date
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+CACHE_PATH = "cache.sqlite3"
+TTL = 6 * 60 * 60  # seconds before an on-going shipment is fetched again
+BUSY_TIMEOUT = 30  # seconds a worker process waits for another one writing the cache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shipments (
+    booking_number TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    is_complete INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS containers (
+    booking_number TEXT NOT NULL REFERENCES shipments(booking_number) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    container_id TEXT NOT NULL,
+    is_complete INTEGER NOT NULL,
+    summary TEXT,
+    PRIMARY KEY (booking_number, position)
+);
+CREATE TABLE IF NOT EXISTS milestones (
+    booking_number TEXT NOT NULL REFERENCES shipments(booking_number) ON DELETE CASCADE,
+    container_position INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    date TEXT,
+    location TEXT,
+    vessel_name TEXT,
+    vessel_id TEXT,
+    PRIMARY KEY (booking_number, container_position, position)
+);
+"""
+
+
+class ResultCache:
+    """
+    On-disk SQLite cache of scraped shipments keyed by booking number.
+
+    A shipment whose containers are all complete never expires; any other
+    shipment is served from the cache for `ttl` seconds after it was fetched,
+    unless `refresh_times` gives it its own expiry (see Application.Scheduler).
+
+    Attributes:
+        path (str): Location of the SQLite database
+        ttl (float): Seconds an on-going shipment stays fresh
+        refresh_times (Dict[str, float]): UNIX time from which a booking expires, overriding the ttl
+    """
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = TTL) -> None:
+        """
+        Initialize a ResultCache instance, creating the database if needed.
+
+        Args:
+            path (str): Location of the SQLite database
+            ttl (float): Seconds an on-going shipment stays fresh
+        """
+        self.path = path
+        self.ttl = ttl
+        self.refresh_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        # sharded runs share the cache: WAL lets them read while another process writes
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(SCHEMA)
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(containers)")]
+        if "summary" not in columns:
+            self._connection.execute("ALTER TABLE containers ADD COLUMN summary TEXT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def get(self, booking_number: str, now: Optional[float] = None) -> Optional[ShipmentRecord]:
+        """
+        Return the cached shipment if it is complete or still fresh.
+
+        Args:
+            booking_number (str): The booking number to look up
+            now (Optional[float]): Current time as a UNIX timestamp, defaults to time.time()
+
+        Returns:
+            Optional[ShipmentRecord]: The cached shipment, or None if it has to be fetched
+        """
+        booking_number = str(booking_number)
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT fetched_at, is_complete FROM shipments WHERE booking_number = ?", (booking_number,)
+            ).fetchone()
+            if row is None:
+                return None
+            fetched_at, is_complete = row
+            refresh_at = self.refresh_times.get(booking_number, fetched_at + self.ttl)
+            if not is_complete and now >= refresh_at:
+                logging.info(f"Cached booking {booking_number} expired")
+                return None
+            logging.info(f"Booking {booking_number} served from cache")
+            return self._read_shipment(booking_number)
+
+    def peek(self, booking_number: str) -> Optional[ShipmentRecord]:
+        """
+        Return the cached shipment however old, or None if the booking was never cached.
+        """
+        booking_number = str(booking_number)
+        with self._lock:
+            if self._fetched_at(booking_number) is None:
+                return None
+            return self._read_shipment(booking_number)
+
+    def fetched_at(self, booking_number: str) -> Optional[float]:
+        """
+        Return when the booking was last fetched, as a UNIX timestamp, or None if it never was.
+        """
+        with self._lock:
+            return self._fetched_at(str(booking_number))
+
+    def _fetched_at(self, booking_number: str) -> Optional[float]:
+        row = self._connection.execute(
+            "SELECT fetched_at FROM shipments WHERE booking_number = ?", (booking_number,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_containers(self, booking_number: str) -> Dict[str, ContainerRecord]:
+        """
+        Return the last known state of a booking's containers, however old.
+
+        Args:
+            booking_number (str): The booking number to look up
+
+        Returns:
+            Dict[str, ContainerRecord]: Cached containers by ID, empty if the booking is unknown
+        """
+        with self._lock:
+            shipment = self._read_shipment(str(booking_number))
+        return {container.id: container for container in shipment.containers}
+
+    def _read_shipment(self, booking_number: str) -> ShipmentRecord:
+        container_rows = self._connection.execute(
+            "SELECT position, container_id, is_complete, summary FROM containers WHERE booking_number = ? "
+            "ORDER BY position",
+            (booking_number,),
+        ).fetchall()
+        milestone_rows = self._connection.execute(
+            "SELECT container_position, event, date, location, vessel_name, vessel_id FROM milestones "
+            "WHERE booking_number = ? ORDER BY container_position, position",
+            (booking_number,),
+        ).fetchall()
+
+        milestones = {position: [] for position, _, _, _ in container_rows}
+        for container_position, event, date, location, vessel_name, vessel_id in milestone_rows:
+            milestones[container_position].append(
+                MilestoneRecord(event, parse_date(date), location, vessel_name, vessel_id)
+            )
+        return ShipmentRecord(booking_number, tuple(
+            ContainerRecord(container_id, tuple(milestones[position]), bool(is_complete), summary)
+            for position, container_id, is_complete, summary in container_rows
+        ))
+
+    def put(self, shipment: ShipmentRecord, now: Optional[float] = None) -> None:
+        """
+        Store or replace a shipment with its containers and milestones.
+
+        Args:
+            shipment (ShipmentRecord): The freshly scraped shipment
+            now (Optional[float]): Fetch time as a UNIX timestamp, defaults to time.time()
+        """
+        if shipment.error is not None:
+            return  # failures are fetched again next time
+        now = time.time() if now is None else now
+        is_complete = bool(shipment.containers) and all(container.is_complete for container in shipment.containers)
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM shipments WHERE booking_number = ?", (shipment.booking_number,))
+            self._connection.execute(
+                "INSERT INTO shipments (booking_number, fetched_at, is_complete) VALUES (?, ?, ?)",
+                (shipment.booking_number, now, int(is_complete)),
+            )
+            self._connection.executemany(
+                "INSERT INTO containers (booking_number, position, container_id, is_complete, summary) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (shipment.booking_number, position, container.id, int(container.is_complete), container.summary)
+                    for position, container in enumerate(shipment.containers)
+                ],
+            )
+            self._connection.executemany(
+                "INSERT INTO milestones (booking_number, container_position, position, event, date, location, "
+                "vessel_name, vessel_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (shipment.booking_number, container_position, position, milestone.event,
+                     milestone.date.isoformat(sep=" ") if milestone.date else None,
+                     milestone.location, milestone.vessel_name, milestone.vessel_id)
+                    for container_position, container in enumerate(shipment.containers)
+                    for position, milestone in enumerate(container.milestones)
+                ],
+            )
@@ -1,12 +1,16 @@
-import time
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-from typing import List
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException, WebDriverException
+from typing import List, Optional
 from Application.Milestone import Milestone
+from Application.Events import EMPTY_RETURN
+from Application.RunIndex import RunIndex
+from Application.Records import ContainerRecord
+from Application.Readiness import find_first, wait_for_content_change
+from Application.Metrics import metrics
 import logging
 
 from Application.logging_config import setup_logger
@@ -14,9 +18,32 @@ setup_logger()
 
 # Constants
 TIMEOUT = 30
+DETAIL_TIMEOUT = 5  # the detail table may legitimately look the same for two containers
 DETAIL_INFO_ID = "//*[@id='detail']"
 CONTAINER_LINK_XPATH = "./a"
 MILESTONE_ROW_XPATH = "./tr"
+DETAIL_BODY_XPATH = "//*[@id='detail']/tbody"
+BULK_EXTRACTION = True  # read the whole milestone table in a single execute_script call
+
+# Returns the texts of every milestone row in the tbody passed as arguments[0].
+# Cells follow the same layout as the Milestone XPaths: td[2] event, td[3] location, td[4] date.
+MILESTONE_TABLE_SCRIPT = """
+var rows = arguments[0].querySelectorAll(':scope > tr');
+var milestones = [];
+for (var i = 0; i < rows.length; i++) {
+    var cells = rows[i].querySelectorAll(':scope > td');
+    var event = cells[1] || null;
+    var vessel = event ? event.querySelector(':scope > a') : null;
+    milestones.push({
+        event: event ? event.innerText : null,
+        location: cells[2] ? cells[2].innerText : null,
+        date: cells[3] ? cells[3].innerText : null,
+        vessel_title: vessel ? vessel.getAttribute('title') : null,
+        vessel_text: vessel ? vessel.innerText : null
+    });
+}
+return milestones;
+"""
 
 
 class Container:
@@ -27,16 +54,20 @@ class Container:
         shipment_page (WebDriver): The Selenium WebDriver instance for the shipment page
         container (WebElement): The container element
         id (str): The unique identifier for this container
+        summary (Optional[str]): Text of the container's row in the shipment table
         milestones (List[Milestone]): List of milestones associated with this container
     """
     
-    def __init__(self, container: WebElement, shipment_page: WebDriver) -> None:
+    def __init__(self, container: WebElement, shipment_page: WebDriver, lazy: bool = False,
+                 index: Optional[RunIndex] = None) -> None:
         """
         Initialize a Container instance.
         
         Args:
             container (WebElement): The container element
             shipment_page (WebDriver): The Selenium WebDriver instance for the shipment page
+            lazy (bool): Defer clicking the container until its milestones are first accessed
+            index (Optional[RunIndex]): Vessel names already read in this run
             
         Raises:
             ValueError: If container or shipment_page is invalid
@@ -47,12 +78,40 @@ class Container:
             
         self.shipment_page = shipment_page
         self.container = container
+        self.index = index
         self.id: str = self.get_container_id()
+        self.summary: Optional[str] = None
+        self._milestones: Optional[List[Milestone]] = None
+
+        if not lazy:
+            self.open()
+            self._milestones = self.get_milestones()
 
-        self.open()
-        self.milestones: List[Milestone] = self.get_milestones()
-        self.is_complete: bool = self.is_complete()
+    @property
+    def milestones(self) -> List[Milestone]:
+        """
+        The container's milestones, opened and scraped on first access.
+        """
+        if self._milestones is None:
+            self.open()
+            self._milestones = self.get_milestones()
+        return self._milestones
         
+    def to_record(self) -> ContainerRecord:
+        """
+        Convert to a detached record with parsed milestone dates.
+        
+        Returns:
+            ContainerRecord: The container data without the page or WebElements
+        """
+        return ContainerRecord(
+            id=self.id,
+            milestones=tuple(milestone.to_record() for milestone in self.milestones),
+            is_complete=self.is_complete,
+            summary=self.summary,
+        )
+
+    @property
     def is_complete(self) -> bool:
         """
         Check if the container is complete.
@@ -61,7 +120,7 @@ class Container:
             bool: True if the container is complete, False otherwise
         """
         try:
-            return self.milestones[-1].event.lower().startswith("empty")
+            return self.milestones[-1].event == EMPTY_RETURN
         except IndexError:
             raise IndexError("No milestones found yet for container")
     
@@ -89,24 +148,30 @@ class Container:
 
     def open(self) -> None:
         """
-        Open the container details by clicking its link.
+        Open the container details by clicking its link and wait for the
+        detail table to be replaced or to show this container.
         
         Raises:
             NoSuchElementException: If the container link cannot be found
             ElementClickInterceptedException: If the container link cannot be clicked
         """
-        try:
-            container_link = WebDriverWait(self.container, TIMEOUT).until(
-                EC.element_to_be_clickable((By.XPATH, CONTAINER_LINK_XPATH))
-            )
-            container_link.click()
-            time.sleep(2)
-        except ElementClickInterceptedException as e:
-            raise ElementClickInterceptedException(
-                "Container link click was intercepted"
-            ) from e
-        except TimeoutException as e:
-            raise TimeoutException("Container link not found within timeout period") from e
+        with metrics.span("container click"):
+            try:
+                container_link = WebDriverWait(self.container, TIMEOUT).until(
+                    EC.element_to_be_clickable((By.XPATH, CONTAINER_LINK_XPATH))
+                )
+            except TimeoutException as e:
+                raise TimeoutException("Container link not found within timeout period") from e
+            previous_detail = find_first(self.shipment_page, By.XPATH, DETAIL_BODY_XPATH)
+            previous_text = previous_detail.text if previous_detail is not None else ""
+            try:
+                container_link.click()
+            except ElementClickInterceptedException as e:
+                raise ElementClickInterceptedException(
+                    "Container link click was intercepted"
+                ) from e
+            wait_for_content_change(self.shipment_page, previous_detail, previous_text,
+                                    self.id, "container detail", timeout=DETAIL_TIMEOUT)
         
     def get_milestone_table(self) -> WebElement:
         """
@@ -138,6 +203,49 @@ class Container:
         """
         Get all milestones associated with this container.
         
+        Uses the single round trip bulk extraction when enabled and falls back to
+        reading every row element by element if the script fails. A timeout is not
+        retried row by row, as the same table would be waited for again.
+        
+        Returns:
+            List[Milestone]: List of Milestone objects for this container
+            
+        Raises:
+            TimeoutException: If milestone rows cannot be found within timeout period
+        """
+        with metrics.span("milestone extraction"):
+            if BULK_EXTRACTION:
+                try:
+                    return self.get_milestones_bulk()
+                except TimeoutException:
+                    raise
+                except WebDriverException as e:
+                    logging.warning(f"Bulk milestone extraction failed, falling back to row by row: {e}")
+            return self.get_milestones_by_row()
+
+    def get_milestones_bulk(self) -> List[Milestone]:
+        """
+        Get all milestones with one execute_script call per poll.
+        
+        Returns:
+            List[Milestone]: List of Milestone objects for this container
+            
+        Raises:
+            TimeoutException: If no milestone rows appear within timeout period
+            JavascriptException: If the extraction script fails
+        """
+        logging.info(f"Getting milestones in bulk...")
+        milestone_table = self.get_milestone_table()
+        rows = WebDriverWait(self.shipment_page, TIMEOUT).until(
+            lambda driver: driver.execute_script(MILESTONE_TABLE_SCRIPT, milestone_table) or False
+        )
+        logging.info(f"Found {len(rows)} milestones...")
+        return [Milestone.from_cells(row, index=self.index) for row in rows]
+
+    def get_milestones_by_row(self) -> List[Milestone]:
+        """
+        Get all milestones by reading every cell of every row separately.
+        
         Returns:
             List[Milestone]: List of Milestone objects for this container
             
@@ -150,7 +258,7 @@ class Container:
                 EC.visibility_of_all_elements_located((By.XPATH, MILESTONE_ROW_XPATH))
             )
             logging.info(f"Found {len(milestones)} milestones...")
-            return [Milestone(milestone) for milestone in milestones]
+            return [Milestone(milestone, index=self.index) for milestone in milestones]
         except TimeoutException as e:
             raise TimeoutException(
                 f"Milestone rows not found within {TIMEOUT} seconds"
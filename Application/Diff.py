@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from Application.Records import ContainerRecord, MilestoneRecord, ShipmentRecord
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+SNAPSHOT_PATH = "snapshot.sqlite3"
+BUSY_TIMEOUT = 30  # seconds a worker process waits for another one writing the snapshot
+MILESTONE_FIELDS = ("event", "date", "location", "vessel_name", "vessel_id")
+CHANGED_FIELDS = ("date", "vessel_name", "vessel_id")  # fields compared between matching milestones
+MAX_VARIABLES = 500  # bound parameters per query, below the 999 SQLite allows by default on older builds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS containers (
+    booking_number TEXT NOT NULL,
+    container_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    is_complete INTEGER NOT NULL,
+    milestones TEXT NOT NULL,
+    PRIMARY KEY (booking_number, container_id)
+);
+"""
+
+# Delta types written to the JSONL stream
+MILESTONE_ADDED = "milestone_added"
+MILESTONE_CHANGED = "milestone_changed"
+MILESTONE_REMOVED = "milestone_removed"
+COMPLETED = "completed"
+CONTAINER_REMOVED = "container_removed"
+
+
+def milestone_values(milestone: MilestoneRecord) -> List[Optional[str]]:
+    """
+    Returns:
+        List[Optional[str]]: The MILESTONE_FIELDS of a milestone as JSON-ready values
+    """
+    return [milestone.event, milestone.date.isoformat(sep=" ") if milestone.date else None,
+            milestone.location, milestone.vessel_name, milestone.vessel_id]
+
+
+def container_hash(milestones: List[List[Optional[str]]], is_complete: bool) -> str:
+    """
+    Content hash of a container, equal for two scrapes exactly when nothing changed.
+
+    Args:
+        milestones (List[List[Optional[str]]]): The container's milestone values, oldest first
+        is_complete (bool): Whether the container is complete
+
+    Returns:
+        str: Hex digest of the canonical JSON of the container
+    """
+    content = json.dumps([is_complete, milestones], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _keyed(milestones: List[List[Optional[str]]]) -> Dict[Tuple[Any, ...], Dict[str, Optional[str]]]:
+    # a milestone is identified by its event, location and how often that pair occurred before it,
+    # so a re-estimated date is a change while a repeated event (e.g. transhipment) is a new milestone
+    occurrences: Dict[Tuple[Any, ...], int] = {}
+    keyed = {}
+    for values in milestones:
+        milestone = dict(zip(MILESTONE_FIELDS, values))
+        pair = (milestone["event"], milestone["location"])
+        occurrences[pair] = occurrences.get(pair, 0) + 1
+        keyed[(*pair, occurrences[pair])] = milestone
+    return keyed
+
+
+def diff_container(previous: List[List[Optional[str]]], previous_complete: bool,
+                   current: List[List[Optional[str]]], current_complete: bool) -> List[Dict[str, Any]]:
+    """
+    List what changed between two states of a container.
+
+    Args:
+        previous (List[List[Optional[str]]]): Milestone values of the snapshot, empty for a new container
+        previous_complete (bool): Whether the snapshot was complete
+        current (List[List[Optional[str]]]): Milestone values just scraped
+        current_complete (bool): Whether the container is complete now
+
+    Returns:
+        List[Dict[str, Any]]: Deltas without booking and container, in milestone order
+    """
+    deltas = []
+    before, after = _keyed(previous), _keyed(current)
+    for key, milestone in after.items():
+        old = before.get(key)
+        if old is None:
+            deltas.append({"type": MILESTONE_ADDED, **milestone})
+            continue
+        changes = {field: [old[field], milestone[field]] for field in CHANGED_FIELDS if old[field] != milestone[field]}
+        if changes:
+            deltas.append({"type": MILESTONE_CHANGED, "event": milestone["event"],
+                           "location": milestone["location"], "changes": changes})
+    for key, milestone in before.items():
+        if key not in after:
+            deltas.append({"type": MILESTONE_REMOVED, **milestone})
+    if current_complete and not previous_complete:
+        deltas.append({"type": COMPLETED})
+    return deltas
+
+
+class ChangeDetector:
+    """
+    Writes what changed since the previous run as a JSON lines delta stream.
+
+    The snapshot keeps, per booking and container, the content hash and the
+    milestones last emitted. A freshly scraped container whose hash matches the
+    snapshot is skipped without comparing its milestones; any other container is
+    diffed milestone by milestone and the snapshot updated. A container missing
+    from a booking that was fetched successfully is reported as removed and
+    dropped from the snapshot. Deltas are flushed to
+    disk before the snapshot is committed, so a change is never lost, but delivery
+    is at least once: if a run stops between the two, the resumed run diffs the
+    last chunk against the same snapshot and writes its deltas again (with a new
+    `detected_at`). Consumers must de-duplicate, e.g. on booking, container, type,
+    event, location and changes.
+
+    Attributes:
+        snapshot_path (str): SQLite database holding the previous state
+        delta_path (str): JSON lines file the deltas are appended to
+        detected_at (str): Timestamp written on every delta of this run
+    """
+
+    def __init__(self, delta_path: str, snapshot_path: str = SNAPSHOT_PATH) -> None:
+        """
+        Initialize a ChangeDetector, creating the snapshot if needed.
+
+        Args:
+            delta_path (str): JSON lines file the deltas are appended to
+            snapshot_path (str): SQLite database holding the previous state
+        """
+        self.delta_path = delta_path
+        self.snapshot_path = snapshot_path
+        self.detected_at = datetime.now().isoformat(sep=" ", timespec="seconds")
+        self._connection = sqlite3.connect(snapshot_path, timeout=BUSY_TIMEOUT)
+        self._connection.executescript(SCHEMA)
+        self._file = open(delta_path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        self._file.close()
+        self._connection.close()
+
+    def process(self, shipments: Iterable[ShipmentRecord]) -> int:
+        """
+        Emit the deltas of a batch of shipments and update the snapshot.
+
+        Shipments that could not be fetched are skipped and keep their snapshot.
+        Containers of the snapshot that a fetched shipment no longer lists get a
+        container_removed delta and are dropped from the snapshot.
+
+        Args:
+            shipments (Iterable[ShipmentRecord]): Freshly fetched shipments
+
+        Returns:
+            int: Number of deltas written
+        """
+        fetched = [shipment for shipment in shipments if shipment.error is None]
+        if not fetched:
+            return 0
+        containers: List[Tuple[str, ContainerRecord]] = [
+            (shipment.booking_number, container) for shipment in fetched for container in shipment.containers
+        ]
+
+        known = self._hashes({shipment.booking_number for shipment in fetched})
+        lines, updates = [], []
+        removed = set(known) - {(booking_number, container.id) for booking_number, container in containers}
+        for booking_number, container_id in sorted(removed):
+            lines.append(json.dumps({"booking_number": booking_number, "container_id": container_id,
+                                     "detected_at": self.detected_at, "type": CONTAINER_REMOVED},
+                                    ensure_ascii=False))
+        for booking_number, container in containers:
+            milestones = [milestone_values(milestone) for milestone in container.milestones]
+            digest = container_hash(milestones, container.is_complete)
+            if known.get((booking_number, container.id)) == digest:
+                continue
+
+            previous, previous_complete = self._previous(booking_number, container.id)
+            for delta in diff_container(previous, previous_complete, milestones, container.is_complete):
+                lines.append(json.dumps({"booking_number": booking_number, "container_id": container.id,
+                                         "detected_at": self.detected_at, **delta}, ensure_ascii=False))
+            updates.append((booking_number, container.id, digest, int(container.is_complete),
+                            json.dumps(milestones, ensure_ascii=False)))
+
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        if updates or removed:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO containers (booking_number, container_id, hash, is_complete, milestones) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    updates,
+                )
+                self._connection.executemany(
+                    "DELETE FROM containers WHERE booking_number = ? AND container_id = ?",
+                    sorted(removed),
+                )
+        logging.info(f"{len(updates)} of {len(containers)} containers changed, {len(removed)} removed, "
+                     f"{len(lines)} deltas written")
+        return len(lines)
+
+    def _hashes(self, booking_numbers: Iterable[str]) -> Dict[Tuple[str, str], str]:
+        booking_numbers = list(booking_numbers)
+        hashes = {}
+        for offset in range(0, len(booking_numbers), MAX_VARIABLES):
+            batch = booking_numbers[offset:offset + MAX_VARIABLES]
+            placeholders = ", ".join("?" * len(batch))
+            rows = self._connection.execute(
+                f"SELECT booking_number, container_id, hash FROM containers WHERE booking_number IN ({placeholders})",
+                batch,
+            )
+            hashes.update({(booking_number, container_id): digest for booking_number, container_id, digest in rows})
+        return hashes
+
+    def _previous(self, booking_number: str, container_id: str) -> Tuple[List[List[Optional[str]]], bool]:
+        row = self._connection.execute(
+            "SELECT milestones, is_complete FROM containers WHERE booking_number = ? AND container_id = ?",
+            (booking_number, container_id),
+        ).fetchone()
+        if row is None:
+            return [], False
+        return json.loads(row[0]), bool(row[1])
@@ -0,0 +1,233 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from Application.Metrics import metrics
+from Application.WebDriverManager import Driver
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+SPARES = 1  # browsers kept launched ahead of demand
+RECYCLE_AFTER = 200  # bookings before a browser is replaced
+STARTUP_TIMEOUT = 180  # seconds to wait for a browser before giving up
+LAUNCH_ATTEMPTS = 3
+LAUNCH_RETRY_DELAY = 5
+
+
+class Session:
+    """
+    A pooled browser and what it has been used for.
+
+    Attributes:
+        driver (Driver): The browser
+        bookings (int): Bookings processed since the browser started
+        started (float): time.monotonic() when the browser became ready
+        context (Any): State the caller keeps with the browser, e.g. its opened EcommOne page
+    """
+
+    def __init__(self, driver: Driver) -> None:
+        self.driver = driver
+        self.bookings = 0
+        self.started = time.monotonic()
+        self.context: Any = None
+
+
+class DriverPool:
+    """
+    Keeps browsers launched ahead of demand and replaces worn out or dead ones.
+
+    Browsers are started on background threads: `start` launches one per worker
+    plus `spares`, and every `acquire` or `retire` tops the spares up again, so a
+    worker that loses or recycles its browser gets an already running one
+    instead of waiting for a cold start.
+
+    A session is recycled after `recycle_after` bookings or once its browser
+    processes use more than `max_rss` bytes (measured with psutil when installed).
+
+    Attributes:
+        size (int): Number of sessions used at the same time
+        spares (int): Sessions kept ready on top of the ones in use
+        recycle_after (int): Bookings before a session is replaced
+        max_rss (Optional[int]): Browser memory in bytes before a session is replaced
+    """
+
+    def __init__(self, driver_factory: Callable[[], Driver], size: int = 1, spares: int = SPARES,
+                 recycle_after: int = RECYCLE_AFTER, max_rss: Optional[int] = None,
+                 startup_timeout: float = STARTUP_TIMEOUT) -> None:
+        """
+        Initialize a DriverPool instance; no browser is launched before `start`.
+
+        Args:
+            driver_factory (Callable[[], Driver]): Launches a new browser
+            size (int): Number of sessions used at the same time
+            spares (int): Sessions kept ready on top of the ones in use
+            recycle_after (int): Bookings before a session is replaced
+            max_rss (Optional[int]): Browser memory in bytes before a session is replaced
+            startup_timeout (float): Seconds `acquire` waits for a browser
+        """
+        self.size = size
+        self.spares = spares
+        self.recycle_after = recycle_after
+        self.max_rss = max_rss
+        self.startup_timeout = startup_timeout
+        self._driver_factory = driver_factory
+        self._ready: queue.LifoQueue = queue.LifoQueue()  # most recently used sessions first
+        self._lock = threading.Lock()
+        self._launching = 0
+        self._started = False
+        self._closed = False
+
+    def start(self) -> None:
+        """
+        Launch a browser for every worker plus the spares, without waiting for them.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            count = self.size + self.spares
+        for _ in range(count):
+            self._launch_async()
+
+    def close(self) -> None:
+        """
+        Quit every idle browser; browsers still launching are quit when they come up.
+        """
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._quit(self._ready.get_nowait())
+            except queue.Empty:
+                break
+
+    def acquire(self) -> Session:
+        """
+        Take a ready session, waiting for one to finish launching if needed.
+
+        Returns:
+            Session: A running browser, possibly with the context it was released with
+
+        Raises:
+            RuntimeError: If no browser becomes ready within the startup timeout
+        """
+        self.start()
+        try:
+            with metrics.span("browser wait"):
+                session = self._ready.get(timeout=self.startup_timeout)
+        except queue.Empty:
+            raise RuntimeError(f"No browser ready within {self.startup_timeout} seconds")
+        self._refill()
+        return session
+
+    def release(self, session: Session) -> None:
+        """
+        Give a session back for reuse, or retire it if it is worn out or dead.
+        """
+        if self._closed or self.should_recycle(session) or not self.is_alive(session):
+            self.retire(session)
+        else:
+            self._ready.put(session)
+
+    def retire(self, session: Session) -> None:
+        """
+        Quit a session in the background and launch its replacement.
+        """
+        logging.info(f"Retiring browser after {session.bookings} bookings")
+        threading.Thread(target=self._quit, args=(session,), daemon=True).start()
+        self._refill()
+
+    def should_recycle(self, session: Session) -> bool:
+        """
+        Whether a session has processed enough bookings or grown too big to keep.
+        """
+        if session.bookings >= self.recycle_after:
+            return True
+        if self.max_rss is not None:
+            rss = self.rss(session)
+            if rss is not None and rss > self.max_rss:
+                logging.info(f"Browser uses {rss / 2 ** 20:.0f} MiB, recycling it")
+                return True
+        return False
+
+    @staticmethod
+    def is_alive(session: Session) -> bool:
+        """
+        Whether the browser still answers WebDriver commands.
+        """
+        try:
+            session.driver.driver.window_handles
+            return True
+        except WebDriverException as e:
+            logging.warning(f"Browser is not responding: {e}")
+            return False
+
+    @staticmethod
+    def rss(session: Session) -> Optional[int]:
+        """
+        Resident memory of the browser and its child processes, in bytes.
+
+        Returns:
+            Optional[int]: The summed RSS, or None if psutil is missing or the process is unknown
+        """
+        pid = getattr(session.driver.driver, "browser_pid", None)
+        if pid is None:
+            return None
+        try:
+            import psutil
+        except ImportError:
+            return None
+        try:
+            browser = psutil.Process(pid)
+            return sum(process.memory_info().rss for process in [browser, *browser.children(recursive=True)])
+        except psutil.Error:
+            return None
+
+    def _refill(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.spares - self._ready.qsize() - self._launching
+        for _ in range(max(missing, 0)):
+            self._launch_async()
+
+    def _launch_async(self) -> None:
+        with self._lock:
+            self._launching += 1
+        threading.Thread(target=self._launch, name="browser-launcher", daemon=True).start()
+
+    def _launch(self) -> None:
+        try:
+            for attempt in range(1, LAUNCH_ATTEMPTS + 1):
+                if self._closed:
+                    return
+                try:
+                    session = Session(self._driver_factory())
+                    break
+                except Exception as e:
+                    logging.error(f"Browser launch {attempt}/{LAUNCH_ATTEMPTS} failed: {e}")
+                    if attempt < LAUNCH_ATTEMPTS:
+                        time.sleep(LAUNCH_RETRY_DELAY)
+            else:
+                return
+
+            if self._closed:
+                self._quit(session)
+            else:
+                self._ready.put(session)
+        finally:
+            with self._lock:
+                self._launching -= 1
+
+    @staticmethod
+    def _quit(session: Session) -> None:
+        try:
+            session.driver.driver.quit()
+        except Exception as e:
+            logging.info(f"Browser already closed: {e}")
@@ -0,0 +1,117 @@
+import json
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Canonical event codes, shared by the scraper, the API client and the aggregator
+GATE_IN = "Gate in"
+DEPARTURE = "Departure"
+ARRIVAL = "Arrival"
+DISCHARGE = "Discharge"
+GATE_OUT = "Gate out for delivery"
+EMPTY_RETURN = "Empty container return"
+
+# (regular expression searched in the lower-cased event text, canonical event), first match wins.
+# Events matching none of them are kept as they are.
+EVENT_MAPPING: List[Tuple[str, str]] = [
+    (r"^unloaded\b.*\bdischarging$", DISCHARGE),
+    (r"gate in", GATE_IN),
+    (r"departure from port of loading", DEPARTURE),
+    (r"arrival at port of discharging", ARRIVAL),
+    (r"gate out", GATE_OUT),
+    (r"^empty container return", EMPTY_RETURN),
+]
+CACHE_SIZE = 4096  # distinct raw event texts remembered; the site uses a few dozen
+
+
+class EventNormalizer:
+    """
+    Maps raw event texts to canonical events with one precompiled regular expression.
+
+    The mapping is compiled into a single alternation of lookaheads anchored at
+    the start of the text, so one search tries the patterns in table order and
+    the first one found anywhere in the text wins. Results are memoized per raw
+    text, which makes normalizing repeated events a dictionary lookup. Canonical
+    events map to themselves, so normalizing twice (e.g. cached events) is safe.
+
+    Attributes:
+        mapping (List[Tuple[str, str]]): (pattern, canonical event) pairs, in priority order
+    """
+
+    def __init__(self, mapping: Sequence[Tuple[str, str]] = EVENT_MAPPING, cache_size: int = CACHE_SIZE) -> None:
+        """
+        Compile a mapping table.
+
+        Args:
+            mapping (Sequence[Tuple[str, str]]): (pattern, canonical event) pairs, in priority order
+            cache_size (int): Distinct raw event texts to memoize
+
+        Raises:
+            re.error: If a pattern is not a valid regular expression
+        """
+        self.mapping = list(mapping)
+        self._events = [event for _, event in self.mapping]
+        self._canonical: Dict[str, str] = {event.lower(): event for event in self._events}
+        self._pattern = re.compile("|".join(
+            f"^(?=.*?(?P<e{index}>{pattern}))" for index, (pattern, _) in enumerate(self.mapping)
+        )) if self.mapping else None
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _normalize(self, event: str) -> str:
+        match_string = event.lower().strip()
+        if match_string in self._canonical:
+            return self._canonical[match_string]
+
+        match = self._pattern.search(match_string) if self._pattern is not None else None
+        if match is not None:
+            return self._events[int(match.lastgroup[1:])]
+        logging.info(f"No match found for event: {event}")
+        return event
+
+
+def load_mapping(path: str) -> List[Tuple[str, str]]:
+    """
+    Read an event mapping table from a JSON file.
+
+    Args:
+        path (str): JSON file holding a list of [pattern, canonical event] pairs
+
+    Returns:
+        List[Tuple[str, str]]: The mapping, in file order
+
+    Raises:
+        ValueError: If the file is not a list of [pattern, event] pairs
+    """
+    with open(path, encoding="utf-8") as file:
+        entries = json.load(file)
+    if not isinstance(entries, list) or not all(isinstance(entry, list) and len(entry) == 2 for entry in entries):
+        raise ValueError(f"Event mapping {path} must be a list of [pattern, event] pairs")
+    return [(str(pattern), str(event)) for pattern, event in entries]
+
+
+_normalizer = EventNormalizer()
+
+
+def configure(mapping: Optional[Sequence[Tuple[str, str]]] = None) -> None:
+    """
+    Replace the mapping used by normalize_event, or restore EVENT_MAPPING if None.
+    """
+    global _normalizer
+    _normalizer = EventNormalizer(EVENT_MAPPING if mapping is None else mapping)
+
+
+def normalize_event(event: str) -> str:
+    """
+    Map a raw event text to its canonical event.
+
+    Args:
+        event (str): The raw event text, e.g. "Gate In to Outbound Terminal"
+
+    Returns:
+        str: The canonical event, or the text unchanged if no pattern matches
+    """
+    return _normalizer.normalize(event)
@@ -0,0 +1,212 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from Application.helpers import write_atomic
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = "ecomm"
+
+
+def quantile(samples: List[float], q: float) -> float:
+    """
+    Nearest-rank quantile of already sorted samples.
+
+    The rank is rounded before taking its ceiling, as q * n carries float error
+    (0.07 * 100 is 7.000000000000001, which would otherwise pick the 8th sample).
+    """
+    if not samples:
+        return 0.0
+    rank = math.ceil(round(q * len(samples), 9))
+    return samples[min(max(rank - 1, 0), len(samples) - 1)]
+
+
+class Metrics:
+    """
+    Collects timing spans per scraping stage and counts WebDriver calls per command.
+
+    Unlike WaitStats, which only sums waiting time, every span is kept so the
+    summary can report percentiles. Workers in other processes send their
+    `snapshot` back to be `merge`d into the parent's metrics.
+
+    Attributes:
+        stages (Dict[str, List[float]]): Span durations in seconds, keyed by stage
+        calls (Dict[str, List[float]]): [count, total seconds] of WebDriver calls, keyed by command
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages: Dict[str, List[float]] = {}
+            self.calls: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages.setdefault(stage, []).append(seconds)
+
+    def add_call(self, command: str, seconds: float) -> None:
+        with self._lock:
+            call = self.calls.setdefault(command, [0, 0.0])
+            call[0] += 1
+            call[1] += seconds
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """
+        Time the enclosed block under the given stage, whether it succeeds or raises.
+
+        Args:
+            stage (str): Name of the stage, e.g. "container click"
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return a picklable copy of the raw samples.
+        """
+        with self._lock:
+            return {
+                "stages": {stage: list(samples) for stage, samples in self.stages.items()},
+                "calls": {command: list(call) for command, call in self.calls.items()},
+            }
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Add the samples of another Metrics' snapshot to this one.
+        """
+        with self._lock:
+            for stage, samples in snapshot["stages"].items():
+                self.stages.setdefault(stage, []).extend(samples)
+            for command, (count, seconds) in snapshot["calls"].items():
+                call = self.calls.setdefault(command, [0, 0.0])
+                call[0] += count
+                call[1] += seconds
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize every stage and WebDriver command.
+
+        Returns:
+            Dict[str, Any]: {"stages": {stage: {count, total, mean, p50, p95, p99, max}},
+                "calls": {command: {count, total}}}
+        """
+        with self._lock:
+            stages = {}
+            for stage, samples in self.stages.items():
+                samples = sorted(samples)
+                total = sum(samples)
+                stages[stage] = {
+                    "count": len(samples),
+                    "total": total,
+                    "mean": total / len(samples),
+                    **{f"p{round(q * 100)}": quantile(samples, q) for q in QUANTILES},
+                    "max": samples[-1],
+                }
+            calls = {command: {"count": int(count), "total": seconds} for command, (count, seconds) in self.calls.items()}
+        return {"stages": stages, "calls": calls}
+
+    def to_json(self, path: str) -> None:
+        """
+        Write the summary as JSON.
+        """
+        write_atomic(path, json.dumps(self.summary(), indent=2, sort_keys=True))
+        logging.info(f"Metrics written to {path}")
+
+    def to_prometheus(self, path: str) -> None:
+        """
+        Write the summary in the Prometheus text format, for node_exporter's textfile collector.
+        """
+        summary = self.summary()
+        lines = [
+            f"# HELP {METRIC_PREFIX}_stage_seconds Time spent per scraping stage.",
+            f"# TYPE {METRIC_PREFIX}_stage_seconds summary",
+        ]
+        for stage, stats in sorted(summary["stages"].items()):
+            label = _label(stage)
+            for q in QUANTILES:
+                lines.append(f'{METRIC_PREFIX}_stage_seconds{{stage="{label}",quantile="{q}"}} '
+                             f'{stats[f"p{round(q * 100)}"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_sum{{stage="{label}"}} {stats["total"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_count{{stage="{label}"}} {stats["count"]}')
+        lines += [
+            f"# HELP {METRIC_PREFIX}_webdriver_calls_total WebDriver commands sent to the browser.",
+            f"# TYPE {METRIC_PREFIX}_webdriver_calls_total counter",
+        ]
+        for command, stats in sorted(summary["calls"].items()):
+            lines.append(f'{METRIC_PREFIX}_webdriver_calls_total{{command="{_label(command)}"}} {stats["count"]}')
+        lines += [
+            f"# HELP {METRIC_PREFIX}_webdriver_call_seconds_total Time spent in WebDriver commands.",
+            f"# TYPE {METRIC_PREFIX}_webdriver_call_seconds_total counter",
+        ]
+        for command, stats in sorted(summary["calls"].items()):
+            lines.append(f'{METRIC_PREFIX}_webdriver_call_seconds_total{{command="{_label(command)}"}} '
+                         f'{stats["total"]:.6f}')
+        write_atomic(path, "\n".join(lines) + "\n")
+        logging.info(f"Metrics written to {path}")
+
+    def report(self) -> str:
+        """
+        Summarize the stages and the busiest WebDriver commands.
+
+        Returns:
+            str: A multi-line, human readable report
+        """
+        summary = self.summary()
+        lines = ["Stage latency (count, p50 / p95 / p99, total):"]
+        for stage, stats in sorted(summary["stages"].items(), key=lambda item: item[1]["total"], reverse=True):
+            lines.append(f"  {stage}: {stats['count']}x, {stats['p50']:.2f}s / {stats['p95']:.2f}s / "
+                         f"{stats['p99']:.2f}s, {stats['total']:.1f}s")
+        lines.append(f"WebDriver calls: {sum(stats['count'] for stats in summary['calls'].values())}")
+        for command, stats in sorted(summary["calls"].items(), key=lambda item: item[1]["count"], reverse=True):
+            lines.append(f"  {command}: {stats['count']}x, {stats['total']:.1f}s")
+        return "\n".join(lines)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+def instrument_driver(driver: WebDriver) -> WebDriver:
+    """
+    Count and time every WebDriver command the driver sends.
+
+    WebElements send their commands through their parent driver's `execute`, so
+    wrapping it on the instance covers element lookups, clicks and scripts too.
+
+    Args:
+        driver (WebDriver): The driver to instrument
+
+    Returns:
+        WebDriver: The same driver
+    """
+    execute = driver.execute
+
+    def timed_execute(driver_command: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            metrics.add_call(driver_command, time.perf_counter() - started)
+
+    driver.execute = timed_execute
+    return driver
@@ -1,20 +1,15 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import NoSuchElementException
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Dict
+from Application.Records import MilestoneRecord, parse_date
+from Application.Events import normalize_event
+from Application.RunIndex import RunIndex
 
 import logging
 from Application.logging_config import setup_logger
 setup_logger()
 
-# Constants for event mapping
-EVENTS = [
-    ('gate in', 'Gate In'),
-    ('departure from port of loading', 'Departure'),
-    ('arrival at port of discharging', 'Arrival'),
-    ('gate out', 'Gate Out')
-]
-
 # XPath/selectors
 EVENT_CELL_XPATH = "./td[2]"
 DATE_CELL_XPATH = "./td[4]"
@@ -36,21 +31,89 @@ class Milestone:
         voyage_id (Optional[str]): The voyage ID if available
     """
     
-    def __init__(self, milestone: WebElement) -> None:
+    def __init__(self, milestone: WebElement, index: Optional[RunIndex] = None) -> None:
         """
         Initialize a Milestone instance.
         
         Args:
             milestone (WebElement): The Selenium WebElement containing milestone data
+            index (Optional[RunIndex]): Vessel names already read in this run
      
         """
             
         self.milestone = milestone
+        self.index = index
+        self.vessel_name: Optional[str] = None
+        self.vessel_id: Optional[str] = None
         self.event: str = self.get_event()
         self.date: str = self.get_date()
         self.location: str = self.get_location()
-        self.vessel_name: Optional[str] = None
-        self.vessel_id: Optional[str] = None
+
+    @classmethod
+    def from_values(cls, event: str, date: str, location: str,
+                    vessel_name: Optional[str] = None, vessel_id: Optional[str] = None) -> "Milestone":
+        """
+        Build a Milestone from values that were read without a WebElement.
+        
+        Args:
+            event (str): The raw event name, normalized here
+            date (str): The milestone date
+            location (str): The milestone location
+            vessel_name (Optional[str]): The name of the vessel if available
+            vessel_id (Optional[str]): The ID of the vessel if available
+            
+        Returns:
+            Milestone: A Milestone without a backing WebElement
+        """
+        milestone = cls.__new__(cls)
+        milestone.milestone = None
+        milestone.index = None
+        milestone.vessel_name = vessel_name
+        milestone.vessel_id = vessel_id
+        milestone.event = milestone.normalize_event(event)
+        milestone.date = date
+        milestone.location = location
+        return milestone
+
+    @classmethod
+    def from_cells(cls, cells: Dict[str, Optional[str]], index: Optional[RunIndex] = None) -> "Milestone":
+        """
+        Build a Milestone from cell texts that were already read from the page.
+        
+        Args:
+            cells (Dict[str, Optional[str]]): Raw texts keyed by "event", "date", "location",
+                "vessel_title" and "vessel_text"
+            index (Optional[RunIndex]): Vessel names already read in this run, shared with this one
+                
+        Returns:
+            Milestone: A Milestone without a backing WebElement
+        """
+        has_vessel = bool(cells.get("vessel_text"))
+        vessel_name = cells.get("vessel_title") if has_vessel else None
+        if has_vessel and index is not None:
+            vessel_name = index.add_vessel(cls.parse_vessel_code(cells["vessel_text"]), vessel_name)
+        return cls.from_values(
+            event=(cells.get("event") or "").split('\n')[0],
+            date=cls.parse_date(cells.get("date") or ""),
+            location=cells.get("location") or "",
+            vessel_name=vessel_name,
+            vessel_id=cls.parse_vessel_id(cells["vessel_text"]) if has_vessel else None,
+        )
+
+    def to_record(self) -> MilestoneRecord:
+        """
+        Convert to a detached record with a parsed date.
+        
+        Returns:
+            MilestoneRecord: The milestone data without the WebElement
+        """
+        return MilestoneRecord(
+            event=self.event,
+            date=parse_date(self.date),
+            location=self.location,
+            vessel_name=self.vessel_name,
+            vessel_id=self.vessel_id,
+        )
 
     def get_event(self) -> str:
         """
@@ -74,21 +137,31 @@ class Milestone:
         """
         Extract vessel information from the event element if available.
         
+        The vessel name is taken from the run index when the vessel was seen
+        before, saving the read of the link title.
+        
         Args:
             event_element (WebElement): The event cell WebElement
         """
         try:
             vessel = event_element.find_element(By.XPATH, VESSEL_LINK_XPATH)
-            self.vessel_name = vessel.get_attribute("title")
-            self.vessel_id = vessel.text.split()[-1]
+            vessel_text = vessel.text
+            code = self.parse_vessel_code(vessel_text)
+            self.vessel_name = self.index.vessel(code) if self.index is not None else None
+            if self.vessel_name is None:
+                self.vessel_name = vessel.get_attribute("title")
+                if self.index is not None:
+                    self.vessel_name = self.index.add_vessel(code, self.vessel_name)
+            self.vessel_id = self.parse_vessel_id(vessel_text)
             logging.info(f'Extracted vessel info: {self.vessel_name} - {self.vessel_id}')
         except NoSuchElementException:
             logging.info("No vessel info found..")
             pass
     
-    def normalize_event(self, event: str) -> str:
+    @staticmethod
+    def normalize_event(event: str) -> str:
         """
-        Normalize the event name based on predefined patterns.
+        Normalize the event name to its canonical event (see Application.Events).
         
         Args:
             event (str): The raw event name to normalize
@@ -96,16 +169,7 @@ class Milestone:
         Returns:
             str: The normalized event name
         """
-        match_string = event.lower().strip()
-        
-        if match_string.startswith('unloaded') and match_string.endswith('discharging'):
-            return 'Discharge'
-
-        for event_pattern, event_name in EVENTS:
-            if event_pattern in match_string:
-                return event_name
-        logging.info(f"No match found for event: {event}")
-        return event
+        return normalize_event(event)
 
     def get_date(self) -> str:
         """
@@ -120,11 +184,52 @@ class Milestone:
         try:
             logging.info(f"Getting date...")
             date = self.milestone.find_element(By.XPATH, DATE_CELL_XPATH).text
-            return " ".join(date.split()[1:]) if date else 'No Date Available'
+            return self.parse_date(date)
         
         except NoSuchElementException as e:
             raise NoSuchElementException("Failed to find date cell in milestone") from e
     
+    @staticmethod
+    def parse_date(date: str) -> str:
+        """
+        Strip the leading label (e.g. "Actual") from the date cell text.
+        
+        Args:
+            date (str): The raw date cell text
+            
+        Returns:
+            str: The milestone date
+        """
+        return " ".join(date.split()[1:]) if date else 'No Date Available'
+    
+    @staticmethod
+    def parse_vessel_id(vessel_text: str) -> Optional[str]:
+        """
+        Extract the voyage ID from the vessel link text.
+        
+        Args:
+            vessel_text (str): The vessel link text
+            
+        Returns:
+            Optional[str]: The last word of the link text, or None if it is empty
+        """
+        parts = vessel_text.split()
+        return parts[-1] if parts else None
+    
+    @staticmethod
+    def parse_vessel_code(vessel_text: str) -> Optional[str]:
+        """
+        Extract the vessel code from the vessel link text.
+        
+        Args:
+            vessel_text (str): The vessel link text
+            
+        Returns:
+            Optional[str]: The link text without its voyage ID, or None if there is nothing else
+        """
+        parts = vessel_text.split()
+        return " ".join(parts[:-1]) or None
+    
     def get_location(self) -> str:
         """
         Extract the location from the milestone element.
@@ -0,0 +1,169 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from Application.Api import TRACKING_PATH, SEARCH_COMMAND, DETAIL_COMMAND, CONTAINER_ID_FIELD, parse_container
+from Application.Readiness import wait_stats
+from Application.Records import ShipmentRecord
+from Application.Search import BookingNotFound
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+TIMEOUT = 30
+POLL_FREQUENCY = 0.1
+CONTAINER_LINK_XPATH = "//*[@id='main-grid']/tbody/tr[@id]/td[4][@title='{container_id}']/a"
+
+
+class NetworkCapture:
+    """
+    Reads the tracking page's JSON responses from Chrome's performance log.
+
+    The driver must be started with performance logging enabled
+    (Driver(capture_network=True)). Every tracking response seen so far is kept
+    by (command, key) so a payload that arrived before it was asked for, e.g. the
+    first container's detail loaded together with the search, is not missed.
+
+    Attributes:
+        driver (WebDriver): The Selenium WebDriver instance
+        payloads (Dict[Tuple[str, str], Dict[str, Any]]): Captured responses by (f_cmd, key)
+    """
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self.payloads: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._requests: Dict[str, Dict[str, str]] = {}
+        self.driver.execute_cdp_cmd("Network.enable", {})
+
+    @staticmethod
+    def _key(form: Dict[str, str]) -> Tuple[str, str]:
+        command = form.get("f_cmd", "")
+        if command == SEARCH_COMMAND:
+            return command, form.get("search_name", "")
+        if command == DETAIL_COMMAND:
+            return command, form.get("cntr_no", "")
+        return command, ""
+
+    def clear(self) -> None:
+        """
+        Drop captured payloads and any log entries not read yet.
+        """
+        self.poll()
+        self.payloads.clear()
+        self._requests.clear()
+
+    def poll(self) -> None:
+        """
+        Read new performance log entries and store finished tracking responses.
+        """
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.requestWillBeSent":
+                request = params.get("request", {})
+                if TRACKING_PATH in request.get("url", ""):
+                    self._requests[params["requestId"]] = self._read_form(params["requestId"], request)
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._requests:
+                form = self._requests.pop(params["requestId"])
+                payload = self._read_body(params["requestId"])
+                if payload is not None:
+                    self.payloads[self._key(form)] = payload
+
+    def _read_form(self, request_id: str, request: Dict[str, Any]) -> Dict[str, str]:
+        post_data = request.get("postData")
+        if post_data is None and request.get("hasPostData"):
+            try:
+                post_data = self.driver.execute_cdp_cmd("Network.getRequestPostData", {"requestId": request_id})["postData"]
+            except WebDriverException:
+                post_data = ""
+        return {key: values[0] for key, values in parse_qs(post_data or "").items()}
+
+    def _read_body(self, request_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            return json.loads(body["body"])
+        except (WebDriverException, KeyError, ValueError) as e:
+            logging.info(f"Could not read captured response {request_id}: {e}")
+            return None
+
+    def wait_for(self, command: str, key: str, timeout: float = TIMEOUT) -> Dict[str, Any]:
+        """
+        Wait until the response for a command and key has been captured.
+
+        Args:
+            command (str): The f_cmd of the request, e.g. SEARCH_COMMAND
+            key (str): The booking number for searches, the container ID for details
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            Dict[str, Any]: The decoded JSON response
+
+        Raises:
+            TimeoutException: If no matching response arrives within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with wait_stats.waiting("network capture"):
+            while True:
+                self.poll()
+                if (command, key) in self.payloads:
+                    return self.payloads[(command, key)]
+                if time.monotonic() > deadline:
+                    raise TimeoutException(f"No response for command {command} ({key}) within {timeout} seconds")
+                time.sleep(POLL_FREQUENCY)
+
+    def capture_shipment(self, booking_number: str, submit_search: Callable[[], None],
+                         on_search_response: Optional[Callable[[], None]] = None) -> ShipmentRecord:
+        """
+        Run a search and build the shipment from the responses it triggers.
+
+        The search result and each container's detail are read from the captured
+        JSON; container rows are clicked only to make the page request their details.
+
+        Args:
+            booking_number (str): The booking number being searched
+            submit_search (Callable[[], None]): Types the booking number and submits the search
+            on_search_response (Optional[Callable[[], None]]): Called once the search response
+                arrives, before any container is clicked
+
+        Returns:
+            ShipmentRecord: The shipment built from the captured payloads
+
+        Raises:
+            TimeoutException: If an expected response is not captured in time
+            IndexError: If a container has no events
+            BookingNotFound: If the search returned no containers
+        """
+        self.clear()
+        submit_search()
+        container_rows: List[Dict[str, Any]] = self.wait_for(SEARCH_COMMAND, booking_number)["list"]
+        if on_search_response is not None:
+            on_search_response()
+        logging.info(f"Captured {len(container_rows)} containers for {booking_number}...")
+        if not container_rows:
+            raise BookingNotFound(f"No results for booking {booking_number}")
+
+        containers = []
+        for container_row in container_rows:
+            container_id = container_row[CONTAINER_ID_FIELD]
+            if (DETAIL_COMMAND, container_id) not in self.payloads:
+                link = WebDriverWait(self.driver, TIMEOUT).until(
+                    EC.element_to_be_clickable((By.XPATH, CONTAINER_LINK_XPATH.format(container_id=container_id)))
+                )
+                link.click()
+            events = self.wait_for(DETAIL_COMMAND, container_id)["list"]
+            containers.append(parse_container(container_row, events))
+        return ShipmentRecord(booking_number, tuple(containers))
@@ -1,63 +1,219 @@
 from Application.Shipments import Shipment
-from Application.Search import SearchBar
+from Application.Records import ShipmentRecord, format_date
+from Application.Search import SearchBar, BookingNotFound
 from Application.WebDriverManager import Driver
+from Application.NetworkCapture import NetworkCapture
+from Application.Cache import ResultCache
+from Application.Readiness import wait_stats, find_first, wait_for_search_outcome, wait_for_network_idle, NO_RESULTS, \
+    snapshot_search_messages, clear_network_activity
+from Application.Metrics import metrics
+from Application.RateController import RateController, ChallengeDetected, detect_challenge
+from Application.RunIndex import RunIndex
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from typing import Iterator, Optional
+from contextlib import nullcontext
+import logging
 import time
 TIMEOUT = 30
+RESULT_ROW_XPATH = "//*[@id='main-grid']/tbody/tr[@id]"
 
 class EcommOne:
-    def __init__(self, driver: WebDriver, base_url: str):
+    def __init__(self, driver: WebDriver, base_url: str, warm_session: bool = False, capture_network: bool = False,
+                 cache: Optional[ResultCache] = None, lazy_containers: bool = False,
+                 rate_controller: Optional[RateController] = None, index: Optional[RunIndex] = None):
         self._driver = driver
         self._base_url = base_url
+        self.cache = cache # bookings found fresh or complete in the cache are not searched
+        self._searched = False # whether the last booking touched the page
+        # only open containers whose summary row differs from the cached state, needs a cache
+        self.lazy_containers = lazy_containers
+        self.warm_session = warm_session # reuse the loaded iframe and search bar between bookings
+        # build shipments from the page's JSON responses, needs Driver(capture_network=True)
+        self.network_capture = NetworkCapture(driver) if capture_network else None
+        # paces searches and adapts their timeout to the site's responses, may be shared between sessions
+        self.rate_controller = rate_controller
+        # containers and vessels already scraped in this run, shared between sessions
+        self.index = index
         self.search_bar = None
-        self.shipments: list[Shipment] = []
+        self._opened = False
+        self.shipments: list[ShipmentRecord] = []
         
     def goto_search_bar(self):
-        self.search_bar = SearchBar(self._driver)
+        with metrics.span("search bar"):
+            self.search_bar = SearchBar(self._driver)
 
     def goto_main_page(self):
-        iframe = WebDriverWait(self._driver, TIMEOUT).until(
-                EC.visibility_of_element_located((By.ID, "IframeCurrentEcom"))
-            )
-        self._driver.switch_to.frame(iframe)
+        with metrics.span("iframe"):
+            iframe = WebDriverWait(self._driver, TIMEOUT).until(
+                    EC.visibility_of_element_located((By.ID, "IframeCurrentEcom"))
+                )
+            self._driver.switch_to.frame(iframe)
 
     def close(self):
         self._driver.close()
 
-    def start(self, tracking_numbers: list[str]):
-        self._driver.get(self._base_url)
-        self._driver.maximize_window()
+    def open(self):
+        with metrics.span("page load"):
+            self._driver.get(self._base_url)
         self.remove_popup()
         self.goto_main_page()
         self.goto_search_bar()
-        
-        for tracking_number in tracking_numbers:
+        self._opened = True
+
+    def reset(self):
+        self._driver.refresh()
+        self.goto_main_page()
+        self.goto_search_bar()
+
+    def is_search_ready(self) -> bool:
+        if self.search_bar is None or self.search_bar.search_box is None or self.search_bar.search_button is None:
+            return False
+        try:
+            return self.search_bar.search_box.is_enabled() and self.search_bar.search_button.is_displayed()
+        except WebDriverException as e:
+            logging.info(f"Search page is broken: {e}")
+            return False
+
+    def prepare_next_search(self, failed: bool = False):
+        if not failed and not self._searched:
+            return
+        if self.warm_session and not failed and self.is_search_ready():
+            self.search_bar.clear()
+        else:
+            self.reset()
+
+    def submit_search(self, booking_number: str):
+        snapshot_search_messages(self._driver) # a no-results message must come from this search
+        clear_network_activity(self._driver) # keep the resource timing buffer from filling up
+        self.search_bar.type_keyword(booking_number)
+        self.search_bar.click_search_button()
+
+    def search(self, tracking_number) -> ShipmentRecord:
+        booking_number = str(tracking_number) if not isinstance(tracking_number, str) else tracking_number
+        self._searched = False
+        if self.cache is not None:
+            cached = self.cache.get(booking_number)
+            if cached is not None:
+                return cached
+
+        self._searched = True
+        with self.rate_controller.slot() if self.rate_controller is not None else nullcontext():
+            with metrics.span("booking"):
+                shipment = self.scrape(booking_number)
+        if self.cache is not None:
+            self.cache.put(shipment)
+        return shipment
+
+    def search_timeout(self) -> float:
+        return self.rate_controller.search_timeout() if self.rate_controller is not None else TIMEOUT
+
+    def report_search_timeout(self, booking_number: str):
+        """
+        Tell the rate controller a search timed out, raising ChallengeDetected if the site blocked it.
+        """
+        if self.rate_controller is None:
+            return
+        if detect_challenge(self._driver):
+            self.rate_controller.record_challenge()
+            raise ChallengeDetected(f"Bot challenge while searching {booking_number}")
+        self.rate_controller.record_timeout()
+
+    def record_search_latency(self, started: float):
+        """
+        Tell the rate controller how long the search round trip took, container clicks excluded.
+        """
+        if self.rate_controller is not None:
+            self.rate_controller.record_success(time.perf_counter() - started)
+
+    def scrape(self, booking_number: str) -> ShipmentRecord:
+        started = time.perf_counter()
+        if self.network_capture is not None:
+            # rows of the previous booking stay on a warm page, the fallback must wait for them to go
+            previous_row = find_first(self._driver, By.XPATH, RESULT_ROW_XPATH)
             try:
-                self.search_bar.type_keyword(tracking_number)
-                self.search_bar.click_search_button()
-                time.sleep(2)
-
-                self.shipments.append(Shipment((str(tracking_number) if not isinstance(tracking_number, str) else tracking_number), self._driver))
-            except Exception as e:
-                print(f"Error: {e}")
-                raise e
-            finally:
-                self._driver.refresh()
-                self.goto_main_page()
-                self.goto_search_bar()
-    
-        
+                with metrics.span("network capture"):
+                    shipment = self.network_capture.capture_shipment(
+                        booking_number, lambda: self.submit_search(booking_number),
+                        on_search_response=lambda: self.record_search_latency(started),
+                    )
+            except (TimeoutException, IndexError, KeyError) as e:
+                if isinstance(e, TimeoutException):
+                    self.report_search_timeout(booking_number)
+                logging.warning(f"Network capture failed for {booking_number}, scraping the page instead: {e}")
+                if wait_for_search_outcome(self._driver, previous_row, timeout=self.search_timeout()) == NO_RESULTS:
+                    raise BookingNotFound(f"No results for booking {booking_number}")
+                return self.scrape_page(booking_number)
+            return shipment
+
+        with metrics.span("search"):
+            previous_row = find_first(self._driver, By.XPATH, RESULT_ROW_XPATH)
+            self.submit_search(booking_number)
+            timeout = self.search_timeout()
+            try:
+                # an unknown booking shows a message instead of rows, stop at once rather than wait for rows
+                outcome = wait_for_search_outcome(self._driver, previous_row, timeout=timeout)
+                if outcome != NO_RESULTS:
+                    wait_for_network_idle(self._driver, timeout=timeout)
+            except TimeoutException:
+                self.report_search_timeout(booking_number)
+                raise
+        self.record_search_latency(started)
+        if outcome == NO_RESULTS:
+            raise BookingNotFound(f"No results for booking {booking_number}")
+
+        return self.scrape_page(booking_number)
+
+    def scrape_page(self, booking_number: str) -> ShipmentRecord:
+        known_containers = None
+        if self.lazy_containers and self.cache is not None:
+            known_containers = self.cache.get_containers(booking_number)
+        return Shipment(booking_number, self._driver, known_containers=known_containers, index=self.index).to_record()
+
+    def iter_shipments(self, tracking_numbers: list[str]) -> Iterator[ShipmentRecord]:
+        """
+        Search booking numbers one by one and yield each shipment as soon as it is scraped.
+
+        Shipments are yielded as ShipmentRecords, which hold no WebElements, and are
+        not kept by EcommOne, so memory stays bounded however many bookings are processed.
+        A booking that fails is yielded as a record with its error instead of ending
+        the run; only a browser that can no longer be used stops it.
+        """
+        wait_stats.reset()
+        if not self._opened:
+            self.open()
+
+        try:
+            for tracking_number in tracking_numbers:
+                failed = True
+                try:
+                    shipment = self.search(tracking_number)
+                    failed = False
+                except Exception as e:
+                    print(f"Error: {e}")
+                    shipment = ShipmentRecord.failed(tracking_number, e)
+                finally:
+                    self.prepare_next_search(failed)
+                yield shipment
+        finally:
+            logging.info(f"Wait statistics:\n{wait_stats.report()}")
+            logging.info(f"Metrics:\n{metrics.report()}")
+
+    def start(self, tracking_numbers: list[str]):
+        self.shipments.extend(self.iter_shipments(tracking_numbers))
 
     def remove_popup(self):
         try:
-            skip_button = WebDriverWait(self._driver, 20).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[text()='Skip']"))
-            )
-            skip_button.click()
-            time.sleep(2)
+            with metrics.span("popup"):
+                skip_button = WebDriverWait(self._driver, 20).until(
+                    EC.element_to_be_clickable((By.XPATH, "//button[text()='Skip']"))
+                )
+                skip_button.click()
+                with wait_stats.waiting("popup"):
+                    WebDriverWait(self._driver, TIMEOUT).until(EC.invisibility_of_element(skip_button))
         except Exception as e:
             print(f"Error: {e}")
 
@@ -70,16 +226,16 @@ if __name__ == "__main__":
     One = EcommOne(Driver().driver, "https://ecomm.one-line.com/one-ecom/manage-shipment/cargo-tracking")
     
     print("Opening...")
-    One.run(["SGNF62462500", "GESF00388800"])
-
-    for shipment in One.shipments:
+    for shipment in One.iter_shipments(["SGNF62462500", "GESF00388800"]):
         print(f"Shipment: {shipment.booking_number}")
+        if shipment.error:
+            print(f"Error: {shipment.error}")
         print(f"Containers: {len(shipment.containers)}")
         for container in shipment.containers:
             print(f"Container: {container.id}")
             print(f"Milestones: {len(container.milestones)}")
             for milestone in container.milestones:
-                print(f"Milestone: {milestone.event} - {milestone.date} - {milestone.location}")
+                print(f"Milestone: {milestone.event} - {format_date(milestone.date)} - {milestone.location}")
                 if milestone.vessel_name and milestone.vessel_id:
                     print(f"Vessel: {milestone.vessel_name} - {milestone.vessel_id}")
 
@@ -0,0 +1,262 @@
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from Application.One import EcommOne
+from Application.RateController import ChallengeDetected
+from Application.Records import ShipmentRecord
+from Application.DriverPool import Session
+from Application.WorkerPool import WorkerPool, MAX_REQUEUES, URGENT, NORMAL
+from Application.helpers import retry_budget
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+TASK_TIMEOUT = 300  # seconds before a booking counts as stuck and its browser is killed
+SENTINEL = float("inf")  # priority of the wake-up entry, sorts after every booking
+
+
+class SessionLost(Exception):
+    """Raised when the browser of a booking died or was killed while the booking ran."""
+
+
+class _Job:
+    """
+    A booking waiting in or taken from the priority queue.
+
+    `session` is the browser the booking owns. Whoever clears it under `lock`,
+    the executor thread when the booking ends or `_kill` when it times out, is the
+    only one that may release or retire that browser.
+    """
+
+    def __init__(self, index: int, booking_number: str, priority: int) -> None:
+        self.index = index
+        self.booking_number = booking_number
+        self.priority = priority
+        self.lock = threading.Lock()
+        self.session: Optional[Session] = None
+        self.cancelled = False
+
+
+class AsyncOrchestrator(WorkerPool):
+    """
+    Runs bookings on many browser sessions from one asyncio event loop.
+
+    Selenium waits block, so every booking runs on a thread of a bounded
+    executor behind an async façade; the event loop only schedules. A dispatcher
+    takes bookings from a priority queue, lowest priority first and in input
+    order among equals, and starts one task per booking while a semaphore of
+    `pool_size` permits allows. `submit` adds urgent bookings while a run is
+    going on. A task that exceeds `task_timeout` is cancelled: its browser is
+    quit, which makes the blocked WebDriver call fail and frees the thread, and
+    the booking is put back on the queue for a fresh browser.
+
+    Sessions, browser recycling, rate control and results are shared with
+    WorkerPool, so the two are interchangeable.
+
+    Attributes:
+        task_timeout (float): Seconds a booking may run before it is cancelled
+    """
+
+    def __init__(self, base_url: str, pool_size: int = 4, task_timeout: float = TASK_TIMEOUT, **kwargs) -> None:
+        """
+        Initialize an AsyncOrchestrator instance.
+
+        Args:
+            base_url (str): The cargo tracking page URL
+            pool_size (int): Number of bookings, and so browsers, running at the same time
+            task_timeout (float): Seconds a booking may run before it is cancelled
+            **kwargs: Remaining WorkerPool arguments
+        """
+        super().__init__(base_url, pool_size=pool_size, **kwargs)
+        self.task_timeout = task_timeout
+        # cancelled bookings keep their thread until the killed browser call returns, hence the spare threads
+        self._executor = ThreadPoolExecutor(max_workers=pool_size * 2, thread_name_prefix="session")
+        self._jobs: Optional[asyncio.PriorityQueue] = None
+        self._order = itertools.count()
+        self._pending = 0
+        self._next_index = 0
+
+    def close(self) -> None:
+        super().close()
+        self._executor.shutdown(wait=False)
+
+    def run(self, tracking_numbers: List[str], priorities: Optional[Dict[str, int]] = None) -> List[ShipmentRecord]:
+        """
+        Scrape all booking numbers and return the shipments in input order.
+
+        Args:
+            tracking_numbers (List[str]): Booking numbers to scrape
+            priorities (Optional[Dict[str, int]]): Priority by booking number, NORMAL if missing
+
+        Returns:
+            List[ShipmentRecord]: Scraped shipments, ordered like the input
+        """
+        return asyncio.run(self.run_async(tracking_numbers, priorities))
+
+    async def run_async(self, tracking_numbers: List[str],
+                        priorities: Optional[Dict[str, int]] = None) -> List[ShipmentRecord]:
+        """
+        Coroutine version of `run`, for callers that already have an event loop.
+        """
+        self.results = {}
+        self.failures = {}
+        self._attempts = {}
+        self._jobs = asyncio.PriorityQueue()
+        self._pending = 0
+        self._next_index = 0
+        for tracking_number in tracking_numbers:
+            self.submit(tracking_number, (priorities or {}).get(str(tracking_number), NORMAL))
+
+        if self._pending:
+            await self._dispatch()
+
+        for index in sorted(self.failures):
+            tracking_number, error = self.failures[index]
+            logging.error(f"Booking {tracking_number} failed: {error}")
+        if self.rate_controller is not None:
+            logging.info(f"Rate controller state: {self.rate_controller.state()}")
+        return [self.results[index] for index in sorted(self.results)]
+
+    def submit(self, tracking_number: str, priority: int = URGENT) -> None:
+        """
+        Queue a booking for the running run, ahead of every booking with a higher priority.
+
+        Must be called from the event loop thread. The shipment is returned after
+        those of the bookings submitted before it.
+
+        Args:
+            tracking_number (str): The booking number
+            priority (int): Lower runs first, URGENT by default
+
+        Raises:
+            RuntimeError: If no run is in progress
+        """
+        if self._jobs is None:
+            raise RuntimeError("No run is in progress")
+        self._pending += 1
+        self._put(_Job(self._next_index, str(tracking_number), priority))
+        self._next_index += 1
+
+    def _put(self, job: _Job) -> None:
+        self._jobs.put_nowait((job.priority, next(self._order), job))
+
+    async def _dispatch(self) -> None:
+        semaphore = asyncio.Semaphore(self.pool_size)
+        tasks = set()
+        while self._pending:
+            await semaphore.acquire()
+            priority, _, job = await self._jobs.get()
+            if job is None:  # woken up because the last task finished
+                semaphore.release()
+                continue
+            task = asyncio.create_task(self._process(job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(lambda _: semaphore.release())
+        await asyncio.gather(*tasks)
+
+    async def _process(self, job: _Job) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._scrape, job)
+        try:
+            shipment = await asyncio.wait_for(future, self.task_timeout)
+            self.results[job.index] = shipment
+        except asyncio.TimeoutError:
+            logging.error(f"Booking {job.booking_number} stuck for {self.task_timeout} seconds, killing its browser")
+            await loop.run_in_executor(None, self._kill, job)
+            self._retry(job, TimeoutError(f"Booking took longer than {self.task_timeout} seconds"))
+        except (SessionLost, ChallengeDetected) as e:
+            self._retry(job, e)
+        except Exception as e:
+            self.failures[job.index] = (job.booking_number, e)
+        finally:
+            self._finish_job()
+
+    def _retry(self, job: _Job, error: Exception) -> None:
+        self._attempts[job.index] = self._attempts.get(job.index, 0) + 1
+        if self._attempts[job.index] > MAX_REQUEUES or not retry_budget.spend():
+            self.failures[job.index] = (job.booking_number, error)
+            return
+        logging.info(f"Re-queueing booking {job.booking_number}")
+        self._pending += 1
+        self._put(_Job(job.index, job.booking_number, job.priority))
+
+    def _finish_job(self) -> None:
+        self._pending -= 1
+        if not self._pending:
+            self._jobs.put_nowait((SENTINEL, next(self._order), None))
+
+    def _kill(self, job: _Job) -> None:
+        with job.lock:
+            job.cancelled = True
+            session, job.session = job.session, None
+        if session is not None:  # otherwise the booking already gave its browser back
+            self.drivers.retire(session)
+
+    def _take_session(self, job: _Job) -> Session:
+        """
+        Take back the browser of a finished booking, so that `_kill` can no longer retire it.
+
+        Raises:
+            SessionLost: If the booking was cancelled and its browser is being quit
+        """
+        with job.lock:
+            session, job.session = job.session, None
+        if session is None:
+            raise SessionLost("Booking cancelled")
+        return session
+
+    def _scrape(self, job: _Job) -> ShipmentRecord:
+        """
+        Run one booking on a pooled session; executed on an executor thread.
+
+        Raises:
+            SessionLost: If the browser died or the booking was cancelled
+        """
+        session = self._open_session(job.index)
+        if session is None:
+            raise RuntimeError("No browser could open the tracking page")
+        with job.lock:
+            cancelled = job.cancelled
+            if not cancelled:
+                job.session = session
+        if cancelled:
+            self.drivers.release(session)
+            raise SessionLost("Booking cancelled")
+        one: EcommOne = session.context
+
+        logging.info(f"Processing booking {job.booking_number}...")
+        try:
+            shipment = one.search(job.booking_number)
+        except ChallengeDetected:
+            self._finish_session(self._take_session(job), one, failed=True)
+            raise
+        except Exception as e:
+            session = self._take_session(job)
+            if not self.drivers.is_alive(session):
+                self.drivers.retire(session)
+                raise SessionLost(f"Browser died: {e}") from e
+            self._finish_session(session, one, failed=True)
+            raise
+        self._finish_session(self._take_session(job), one, failed=False)
+        return shipment
+
+    def _finish_session(self, session: Session, one: EcommOne, failed: bool) -> None:
+        session.bookings += 1
+        if self.drivers.should_recycle(session):
+            self.drivers.retire(session)
+            return
+        try:
+            one.prepare_next_search(failed)
+        except WebDriverException as e:
+            logging.error(f"Browser is unusable, replacing it: {e}")
+            self.drivers.retire(session)
+            return
+        self.drivers.release(session)
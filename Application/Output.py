@@ -0,0 +1,159 @@
+import csv
+import json
+import os
+from typing import Iterable, List, Optional, Set
+
+import pandas as pd
+
+from Application.Aggregate import OUTPUT_COLUMNS
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+CHUNK_SIZE = 10000  # rows per chunk when converting the staged CSV
+
+
+class OutputWriter:
+    """
+    Appends output rows as shipments finish and checkpoints progress.
+
+    Rows are streamed into a CSV file (the output itself for .csv, a staging file
+    for .xlsx and .parquet). After every write the booking numbers and the
+    staging file size are appended to a checkpoint file, so an interrupted run can
+    resume: finished bookings are skipped and anything written after the last
+    checkpoint is truncated away. `finalize` converts the staging file to the
+    target format in chunks and removes the checkpoint.
+
+    Attributes:
+        path (str): The final output file
+        staging_path (str): The CSV file rows are appended to
+        checkpoint_path (str): The JSON lines checkpoint file
+        columns (List[str]): Output columns, in order
+        format (str): The final output format, "csv", "xlsx" or "parquet"
+    """
+
+    FORMATS = ("csv", "xlsx", "parquet")
+
+    def __init__(self, path: str, columns: List[str] = OUTPUT_COLUMNS, output_format: Optional[str] = None) -> None:
+        """
+        Initialize an OutputWriter, resuming from an existing checkpoint.
+
+        Args:
+            path (str): The final output file
+            columns (List[str]): Output columns, in order
+            output_format (Optional[str]): "csv", "xlsx" or "parquet", defaults to the file extension
+
+        Raises:
+            ValueError: If the output format is not supported
+        """
+        output_format = (output_format or os.path.splitext(path)[1].lstrip(".")).lower()
+        if output_format not in self.FORMATS:
+            raise ValueError("Incorrect file format.")
+
+        self.path = path
+        self.columns = columns
+        self.format = output_format
+        self.staging_path = path if output_format == "csv" else f"{path}.partial.csv"
+        self.checkpoint_path = f"{path}.checkpoint"
+        self._completed: Set[str] = set()
+        self._resume()
+        self._file = open(self.staging_path, "a", newline="", encoding="utf-8")
+        if self._file.tell() == 0:
+            csv.writer(self._file).writerow(self.columns)
+            self._file.flush()
+
+    def _resume(self) -> None:
+        """
+        Load the checkpoint and drop rows written after its last entry.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            if os.path.exists(self.staging_path):
+                os.remove(self.staging_path)  # leftover of a finished or never checkpointed run
+            return
+
+        offset = 0
+        valid_size = 0
+        with open(self.checkpoint_path, "rb") as checkpoint:
+            for line in checkpoint:
+                if not line.endswith(b"\n"):
+                    break  # torn last line
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._completed.add(entry["booking_number"])
+                offset = entry["offset"]
+                valid_size += len(line)
+        if valid_size < os.path.getsize(self.checkpoint_path):
+            # drop the torn line, new entries appended to it would be unreadable next time
+            with open(self.checkpoint_path, "r+b") as checkpoint:
+                checkpoint.truncate(valid_size)
+
+        if os.path.exists(self.staging_path):
+            with open(self.staging_path, "r+b") as staging:
+                staging.truncate(offset)
+        logging.info(f"Resuming {self.path}: {len(self._completed)} bookings already written")
+
+    def completed(self) -> Set[str]:
+        """
+        Returns:
+            Set[str]: Booking numbers already written by previous or current runs
+        """
+        return set(self._completed)
+
+    def write(self, booking_numbers: Iterable[str], rows: pd.DataFrame) -> None:
+        """
+        Append the rows of some bookings and checkpoint them.
+
+        Args:
+            booking_numbers (Iterable[str]): The bookings the rows belong to
+            rows (pd.DataFrame): Output rows with the writer's columns
+        """
+        rows[self.columns].to_csv(self._file, header=False, index=False)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        offset = os.fstat(self._file.fileno()).st_size
+        with open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            for booking_number in booking_numbers:
+                checkpoint.write(json.dumps({"booking_number": booking_number, "offset": offset}) + "\n")
+                self._completed.add(booking_number)
+
+    def finalize(self) -> None:
+        """
+        Write the final output file and remove the checkpoint.
+        """
+        self._file.close()
+        if self.format == "xlsx":
+            self._convert_to_xlsx()
+        elif self.format == "parquet":
+            self._convert_to_parquet()
+        if self.staging_path != self.path:
+            os.remove(self.staging_path)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        logging.info(f"Output written to {self.path}")
+
+    def _convert_to_xlsx(self) -> None:
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        with open(self.staging_path, newline="", encoding="utf-8") as staging:
+            for row in csv.reader(staging):
+                sheet.append([value if value != "" else None for value in row])
+        workbook.save(self.path)
+
+    def _convert_to_parquet(self) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Writing .parquet output requires pyarrow") from e
+
+        schema = pa.schema([(column, pa.string()) for column in self.columns])
+        with pq.ParquetWriter(self.path, schema) as parquet:
+            for chunk in pd.read_csv(self.staging_path, dtype=str, chunksize=CHUNK_SIZE):
+                parquet.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
@@ -0,0 +1,205 @@
+import collections
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+TARGET_LATENCY = 8.0  # seconds a search may take before the site counts as slowing down
+MAX_INTERVAL = 30.0  # longest pause between two searches
+BACKOFF_INTERVAL = 2.0  # pause between searches right after the first timeout
+INTERVAL_STEP = 0.5  # seconds removed from the pause after a window of fast searches
+SLOW_FACTOR = 1.5  # pause growth when searches are slower than the target
+JITTER = 0.2  # random share added to every pause so searches do not look scheduled
+CHALLENGE_COOLDOWN = 120.0  # seconds every worker waits after a bot challenge
+EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 100  # recent latencies kept for the adaptive timeout
+TIMEOUT = 30  # search timeout until enough latencies are known
+MIN_TIMEOUT = 10
+MAX_TIMEOUT = 60
+TIMEOUT_FACTOR = 4  # adaptive timeout as a multiple of the recent p95 latency
+MIN_SAMPLES = 10
+
+CHALLENGE_MARKERS = (
+    "captcha", "cf-challenge", "just a moment", "verify you are human", "unusual traffic",
+    "access denied", "too many requests",
+)
+# Title and the start of the visible text of the current frame and of the top document.
+PAGE_TEXT_SCRIPT = """
+var texts = [document.title, document.body ? document.body.innerText.slice(0, 2000) : ''];
+try {
+    texts.push(window.top.document.title);
+} catch (e) {}
+return texts.join(' ').toLowerCase();
+"""
+
+
+class ChallengeDetected(Exception):
+    """Raised when the site answers a search with a bot challenge or block page."""
+
+
+def detect_challenge(driver: WebDriver) -> bool:
+    """
+    Check whether the page shows a bot challenge or block page instead of results.
+
+    Args:
+        driver (WebDriver): The Selenium WebDriver instance
+
+    Returns:
+        bool: True if a challenge marker appears in the page title or text
+    """
+    try:
+        text = driver.execute_script(PAGE_TEXT_SCRIPT) or ""
+    except WebDriverException:
+        return False
+    return any(marker in text for marker in CHALLENGE_MARKERS)
+
+
+class RateController:
+    """
+    Adapts how many searches run at once and how far apart they start (AIMD).
+
+    Every worker takes a slot before searching. Searches that come back within
+    the target latency grow the allowance additively: after a full window of
+    fast searches the concurrency goes up by one and the pause between searches
+    shrinks. Congestion shrinks it multiplicatively: a slow search stretches the
+    pause, a timeout halves the concurrency and doubles the pause, and a bot
+    challenge drops to the minimum concurrency and pauses every worker for a
+    cooldown.
+
+    Attributes:
+        min_concurrency (int): Lowest number of concurrent searches
+        max_concurrency (int): Highest number of concurrent searches, usually the pool size
+        concurrency (int): Current number of concurrent searches allowed
+        min_interval (float): Shortest pause between two search starts
+        interval (float): Current pause between two search starts
+        target_latency (float): Search latency above which the site counts as slowing down
+        latency (float): Exponentially weighted average search latency
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1, min_interval: float = 0.0,
+                 target_latency: float = TARGET_LATENCY) -> None:
+        """
+        Initialize a RateController at full concurrency and minimum pause.
+
+        Args:
+            max_concurrency (int): Highest number of concurrent searches
+            min_concurrency (int): Lowest number of concurrent searches
+            min_interval (float): Shortest pause between two search starts
+            target_latency (float): Search latency above which the site counts as slowing down
+        """
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max(max_concurrency, min_concurrency)
+        self.concurrency = self.max_concurrency
+        self.min_interval = min_interval
+        self.interval = min_interval
+        self.target_latency = target_latency
+        self.latency = 0.0
+        self._latencies: Deque[float] = collections.deque(maxlen=LATENCY_WINDOW)
+        self._condition = threading.Condition()
+        self._active = 0
+        self._fast_streak = 0
+        self._next_start = 0.0
+        self._paused_until = 0.0
+
+    def acquire(self) -> None:
+        """
+        Wait for a free slot, the pause since the previous search start and any cooldown.
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                ready_at = max(self._next_start, self._paused_until)
+                if self._active < self.concurrency and now >= ready_at:
+                    self._active += 1
+                    self._next_start = now + self.interval * (1 + random.uniform(0, JITTER))
+                    return
+                self._condition.wait(timeout=ready_at - now if now < ready_at else None)
+
+    def release(self) -> None:
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Hold a search slot for the enclosed block.
+        """
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_success(self, latency: float) -> None:
+        """
+        Report a search that returned results after `latency` seconds.
+        """
+        with self._condition:
+            self._latencies.append(latency)
+            self.latency = latency if self.latency == 0.0 else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+            if self.latency > self.target_latency:
+                self._fast_streak = 0
+                self._set(self.concurrency, min(max(self.interval * SLOW_FACTOR, INTERVAL_STEP), MAX_INTERVAL),
+                          f"searches slowing down ({self.latency:.1f}s)")
+                return
+
+            self._fast_streak += 1
+            if self._fast_streak >= self.concurrency:
+                self._fast_streak = 0
+                self._set(min(self.concurrency + 1, self.max_concurrency),
+                          max(self.interval - INTERVAL_STEP, self.min_interval), "searches fast")
+
+    def record_timeout(self) -> None:
+        """
+        Report a search that timed out.
+        """
+        with self._condition:
+            self._fast_streak = 0
+            self._set(max(self.concurrency // 2, self.min_concurrency),
+                      min(max(self.interval * 2, BACKOFF_INTERVAL), MAX_INTERVAL), "search timed out")
+
+    def record_challenge(self) -> None:
+        """
+        Report a bot challenge or block page; every worker pauses for the cooldown.
+        """
+        with self._condition:
+            self._fast_streak = 0
+            self._paused_until = time.monotonic() + CHALLENGE_COOLDOWN
+            self._set(self.min_concurrency, MAX_INTERVAL, "bot challenge detected")
+
+    def search_timeout(self) -> float:
+        """
+        Seconds to wait for search results, a multiple of the recent p95 latency.
+
+        Returns:
+            float: TIMEOUT until enough searches were seen, then between MIN_TIMEOUT and MAX_TIMEOUT
+        """
+        with self._condition:
+            if len(self._latencies) < MIN_SAMPLES:
+                return TIMEOUT
+            latencies = sorted(self._latencies)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        return min(max(TIMEOUT_FACTOR * p95, MIN_TIMEOUT), MAX_TIMEOUT)
+
+    def state(self) -> Dict[str, Any]:
+        with self._condition:
+            return {"concurrency": self.concurrency, "interval": self.interval, "latency": self.latency,
+                    "active": self._active}
+
+    def _set(self, concurrency: int, interval: float, reason: str) -> None:
+        if concurrency != self.concurrency or abs(interval - self.interval) > 1e-9:
+            logging.info(f"Rate controller: {reason}, concurrency {self.concurrency} -> {concurrency}, "
+                         f"pause {self.interval:.1f}s -> {interval:.1f}s")
+        self.concurrency = concurrency
+        self.interval = interval
+        self._condition.notify_all()
@@ -0,0 +1,312 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Union
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+TIMEOUT = 30
+POLL_FREQUENCY = 0.1
+NETWORK_IDLE_TIME = 0.5  # seconds without a new request before the page counts as idle
+
+# Number of finished resource loads plus pending jQuery requests (the tracking page uses jQuery).
+# The count only moves while the resource timing buffer (250 entries by default) has room, so it is
+# cleared before every search by CLEAR_NETWORK_ACTIVITY_SCRIPT.
+NETWORK_ACTIVITY_SCRIPT = """
+return {
+    resources: performance.getEntriesByType('resource').length,
+    pending: (window.jQuery && window.jQuery.active) || 0,
+    ready: document.readyState
+};
+"""
+CLEAR_NETWORK_ACTIVITY_SCRIPT = "performance.clearResourceTimings();"
+RESULTS = "results"
+NO_RESULTS = "no results"
+# Lower-case text of the row the result grid shows instead of result rows for an unknown booking number;
+# matched exactly so that other messages on the page never turn a real booking into a missing one
+NO_RESULTS_MESSAGES = ["no data found."]
+# The grid row that carries the no-results message: result rows always have an id, this one does not
+SEARCH_MESSAGE_SELECTOR = "#main-grid > tbody > tr:not([id])"
+VISIBLE_TEXT_FUNCTION = """
+function visibleText(element) {
+    return (element.offsetWidth || element.offsetHeight) ? element.innerText.trim().toLowerCase() : '';
+}
+"""
+# Remembers the displayed text of every message element (arguments[0] is the selector) so that only
+# messages shown by the next search count, not placeholders or dialogs already on the page.
+SEARCH_SNAPSHOT_SCRIPT = VISIBLE_TEXT_FUNCTION + """
+var snapshot = new WeakMap();
+var elements = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < elements.length; i++) {
+    snapshot.set(elements[i], visibleText(elements[i]));
+}
+window.__searchSnapshot = snapshot;
+"""
+# Returns "results" once the grid shows new result rows (arguments[0] tells whether the previous rows are
+# gone), "no results" if a visible message row that is new or changed since the snapshot reads exactly
+# one of the messages (arguments[1]), otherwise null.
+SEARCH_OUTCOME_SCRIPT = VISIBLE_TEXT_FUNCTION + """
+var rowsReplaced = arguments[0], messages = arguments[1];
+var snapshot = window.__searchSnapshot || new WeakMap();
+if (rowsReplaced && document.querySelector('#main-grid > tbody > tr[id]')) {
+    return 'results';
+}
+var candidates = document.querySelectorAll(arguments[2]);
+for (var i = 0; i < candidates.length; i++) {
+    var element = candidates[i];
+    var text = visibleText(element);
+    if (text && !(snapshot.has(element) && snapshot.get(element) === text) && messages.indexOf(text) >= 0) {
+        return 'no results';
+    }
+}
+return null;
+"""
+
+
+class WaitStats:
+    """
+    Collects how long the scraper spends waiting on the page versus working.
+
+    Waiting time is summed over every session, so with a worker pool it can exceed
+    the elapsed wall time.
+
+    Attributes:
+        waits (Dict[str, float]): Seconds spent waiting, keyed by wait label
+        counts (Dict[str, int]): Number of waits, keyed by wait label
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.waits: Dict[str, float] = {}
+            self.counts: Dict[str, int] = {}
+            self._started = time.perf_counter()
+
+    def add(self, label: str, seconds: float) -> None:
+        with self._lock:
+            self.waits[label] = self.waits.get(label, 0.0) + seconds
+            self.counts[label] = self.counts.get(label, 0) + 1
+
+    @contextmanager
+    def waiting(self, label: str) -> Iterator[None]:
+        """
+        Time the enclosed block as waiting under the given label.
+
+        Args:
+            label (str): Name of the wait, e.g. "search results"
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(label, time.perf_counter() - started)
+
+    def report(self) -> str:
+        """
+        Summarize waiting versus working time since the last reset.
+
+        Returns:
+            str: A multi-line, human readable report
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            waited = sum(self.waits.values())
+            lines = [
+                f"Elapsed: {elapsed:.1f}s, waiting: {waited:.1f}s, working: {max(elapsed - waited, 0.0):.1f}s"
+            ]
+            for label in sorted(self.waits, key=self.waits.get, reverse=True):
+                lines.append(f"  {label}: {self.waits[label]:.1f}s over {self.counts[label]} waits")
+        return "\n".join(lines)
+
+
+wait_stats = WaitStats()
+
+
+class staleness_or_text_change:
+    """
+    Expected condition that is met once an element is replaced or its text changes.
+
+    Args:
+        element (WebElement): The element that was on the page before the action
+        previous_text (str): The element text before the action
+        expected_text (Optional[str]): Text whose appearance also satisfies the condition
+    """
+
+    def __init__(self, element: WebElement, previous_text: str, expected_text: Optional[str] = None) -> None:
+        self.element = element
+        self.previous_text = previous_text
+        self.expected_text = expected_text
+
+    def __call__(self, driver: WebDriver) -> bool:
+        try:
+            text = self.element.text
+        except StaleElementReferenceException:
+            return True
+        if self.expected_text and self.expected_text in text:
+            return True
+        return text != self.previous_text
+
+
+class search_outcome:
+    """
+    Expected condition that is met once a search shows new result rows or a no-results message.
+
+    Args:
+        previous_row (Optional[WebElement]): A result row shown before the search, None if there was none
+    """
+
+    def __init__(self, previous_row: Optional[WebElement]) -> None:
+        self.previous_row = previous_row
+
+    def __call__(self, driver: WebDriver) -> Union[str, bool]:
+        rows_replaced = self.previous_row is None or EC.staleness_of(self.previous_row)(driver)
+        return driver.execute_script(SEARCH_OUTCOME_SCRIPT, rows_replaced, NO_RESULTS_MESSAGES,
+                                     SEARCH_MESSAGE_SELECTOR) or False
+
+
+def find_first(driver: WebDriver, by: str, value: str) -> Optional[WebElement]:
+    """
+    Return the first matching element without waiting, or None.
+    """
+    elements: List[WebElement] = driver.find_elements(by, value)
+    return elements[0] if elements else None
+
+
+def wait_for_staleness(driver: WebDriver, element: Optional[WebElement], label: str, timeout: float = TIMEOUT) -> None:
+    """
+    Wait until a previously rendered element has been removed from the page.
+
+    Args:
+        driver (WebDriver): The Selenium WebDriver instance
+        element (Optional[WebElement]): The element to watch; nothing is waited for if None
+        label (str): Label used in the wait statistics
+        timeout (float): Maximum seconds to wait
+
+    Raises:
+        TimeoutException: If the element is still attached after the timeout
+    """
+    if element is None:
+        return
+    with wait_stats.waiting(label):
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(EC.staleness_of(element))
+
+
+def snapshot_search_messages(driver: WebDriver) -> None:
+    """
+    Remember the messages on the page before a search is submitted.
+
+    wait_for_search_outcome only accepts a no-results message from an element that
+    appeared or whose displayed text changed after this call.
+
+    Args:
+        driver (WebDriver): The Selenium WebDriver instance, switched to the search frame
+    """
+    driver.execute_script(SEARCH_SNAPSHOT_SCRIPT, SEARCH_MESSAGE_SELECTOR)
+
+
+def wait_for_search_outcome(driver: WebDriver, previous_row: Optional[WebElement], timeout: float = TIMEOUT) -> str:
+    """
+    Wait until a submitted search shows either result rows or a no-results message.
+
+    Call snapshot_search_messages before submitting, otherwise any message already
+    on the page counts as the outcome.
+
+    Args:
+        driver (WebDriver): The Selenium WebDriver instance
+        previous_row (Optional[WebElement]): A result row shown before the search, None if there was none
+        timeout (float): Maximum seconds to wait
+
+    Returns:
+        str: RESULTS or NO_RESULTS
+
+    Raises:
+        TimeoutException: If the page shows neither within the timeout
+    """
+    with wait_stats.waiting("search results"):
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(search_outcome(previous_row))
+
+
+def wait_for_content_change(driver: WebDriver, element: Optional[WebElement], previous_text: str,
+                            expected_text: Optional[str], label: str, timeout: float = TIMEOUT) -> bool:
+    """
+    Wait until an element is replaced, shows the expected text or its text changes.
+
+    Unlike the other waits this one does not raise: if nothing changes within the
+    timeout the content is most likely identical and the caller can carry on.
+
+    Args:
+        driver (WebDriver): The Selenium WebDriver instance
+        element (Optional[WebElement]): The element to watch; nothing is waited for if None
+        previous_text (str): The element text before the action
+        expected_text (Optional[str]): Text whose appearance means the new content is loaded
+        label (str): Label used in the wait statistics
+        timeout (float): Maximum seconds to wait
+
+    Returns:
+        bool: True if a change was detected, False if the wait timed out
+    """
+    if element is None:
+        return True
+    with wait_stats.waiting(label):
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+                staleness_or_text_change(element, previous_text, expected_text)
+            )
+            return True
+        except TimeoutException:
+            logging.info(f"No content change detected for {label} within {timeout} seconds")
+            return False
+
+
+def clear_network_activity(driver: WebDriver) -> None:
+    """
+    Empty the resource timing buffer so that wait_for_network_idle keeps seeing new requests.
+
+    A warm session keeps the same page for many bookings; once the buffer is full
+    the resource count stops changing and the page would look idle at once.
+
+    Args:
+        driver (WebDriver): The Selenium WebDriver instance, switched to the search frame
+    """
+    driver.execute_script(CLEAR_NETWORK_ACTIVITY_SCRIPT)
+
+
+def wait_for_network_idle(driver: WebDriver, idle_time: float = NETWORK_IDLE_TIME, timeout: float = TIMEOUT) -> None:
+    """
+    Wait until the current frame has no pending requests for `idle_time` seconds.
+
+    Call clear_network_activity before the action that triggers the requests.
+
+    Args:
+        driver (WebDriver): The Selenium WebDriver instance
+        idle_time (float): Seconds without new network activity required
+        timeout (float): Maximum seconds to wait
+
+    Raises:
+        TimeoutException: If the page keeps loading for longer than the timeout
+    """
+    state = {"activity": None, "since": time.perf_counter()}
+
+    def is_idle(driver: WebDriver) -> bool:
+        activity = driver.execute_script(NETWORK_ACTIVITY_SCRIPT)
+        now = time.perf_counter()
+        if activity["pending"] or activity["ready"] != "complete" or activity != state["activity"]:
+            state["activity"] = activity
+            state["since"] = now
+            return False
+        return now - state["since"] >= idle_time
+
+    with wait_stats.waiting("network idle"):
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(is_idle)
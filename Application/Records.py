@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from Application.Events import normalize_event, EMPTY_RETURN
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+DATE_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d %b %Y %H:%M", "%m/%d/%Y %H:%M")
+NO_DATE = 'No Date Available'
+
+
+def parse_date(date: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a milestone date as shown by the tracking page or stored in the cache.
+
+    Args:
+        date (Optional[str]): The date text, e.g. "2025-04-28 05:19"
+
+    Returns:
+        Optional[datetime]: The parsed date, or None if it is missing or unreadable
+    """
+    if not date or date == NO_DATE:
+        return None
+    date = date.strip()
+    try:
+        return datetime.fromisoformat(date)
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(date, date_format)
+        except ValueError:
+            continue
+    logging.warning(f"Unrecognized milestone date: {date}")
+    return None
+
+
+def format_date(date: Optional[datetime]) -> str:
+    """
+    Format a milestone date the way the tracking page displays it.
+
+    Args:
+        date (Optional[datetime]): The milestone date
+
+    Returns:
+        str: The formatted date, or NO_DATE if there is none
+    """
+    return date.strftime(DATE_FORMAT) if date is not None else NO_DATE
+
+
+@dataclass(frozen=True, slots=True)
+class MilestoneRecord:
+    """
+    A scraped milestone, detached from the page.
+
+    Attributes:
+        event (str): The normalized event name
+        date (Optional[datetime]): The milestone date, None if not available
+        location (str): The milestone location
+        vessel_name (Optional[str]): The name of the vessel if available
+        vessel_id (Optional[str]): The ID of the vessel if available
+    """
+    event: str
+    date: Optional[datetime]
+    location: str
+    vessel_name: Optional[str] = None
+    vessel_id: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ContainerRecord:
+    """
+    A scraped container with its milestones, detached from the page.
+
+    Attributes:
+        id (str): The unique identifier for this container
+        milestones (Tuple[MilestoneRecord, ...]): The container's milestones, oldest first
+        is_complete (bool): Whether the last milestone is an empty container return
+        summary (Optional[str]): Text of the container's row in the shipment table when scraped
+    """
+    id: str
+    milestones: Tuple[MilestoneRecord, ...]
+    is_complete: bool
+    summary: Optional[str] = None
+
+    @classmethod
+    def from_milestones(cls, container_id: str, milestones: Sequence[MilestoneRecord]) -> "ContainerRecord":
+        """
+        Build a ContainerRecord; it is complete once the last milestone is the empty container return.
+
+        Raises:
+            IndexError: If no milestones are given
+        """
+        if not milestones:
+            raise IndexError("No milestones found yet for container")
+        return cls(container_id, tuple(milestones), normalize_event(milestones[-1].event) == EMPTY_RETURN)
+
+
+@dataclass(frozen=True, slots=True)
+class ShipmentRecord:
+    """
+    A scraped shipment with its containers, detached from the page.
+
+    Attributes:
+        booking_number (str): The unique booking number for this shipment
+        containers (Tuple[ContainerRecord, ...]): The shipment's containers
+        error (Optional[str]): Why the shipment could not be fetched, None if it was
+    """
+    booking_number: str
+    containers: Tuple[ContainerRecord, ...]
+    error: Optional[str] = None
+
+    @classmethod
+    def failed(cls, booking_number: str, error: object) -> "ShipmentRecord":
+        """
+        Build the record of a booking that could not be fetched.
+        """
+        return cls(booking_number=str(booking_number), containers=(), error=str(error) or type(error).__name__)
@@ -0,0 +1,88 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from Application.Records import ContainerRecord
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+
+class RunIndex:
+    """
+    Containers and vessels already scraped during the current run.
+
+    Bookings in one input often share containers (e.g. a booking and its
+    split) and vessel voyages. The first booking that scrapes a container stores
+    its record here and every later booking listing the same container on the
+    same journey gets the record from memory instead of clicking and reading it
+    again; the record is immutable, so each booking still lists it in the output.
+    Container IDs are reused across journeys, so containers are keyed by ID and
+    journey: the journey number (copNo) from the API, or the container's summary
+    row on the page, which differs between journeys. Vessel names are kept by
+    vessel code so the vessel link title is read once per vessel.
+
+    The index is shared by every session and cleared at the start of each run.
+
+    Attributes:
+        containers (Dict[Tuple[str, str], ContainerRecord]): Scraped containers by container ID and journey
+        vessels (Dict[str, str]): Vessel names by vessel code
+        hits (int): Containers served from the index
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.containers: Dict[Tuple[str, str], ContainerRecord] = {}
+        self.vessels: Dict[str, str] = {}
+        self.hits = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self.containers.clear()
+            self.vessels.clear()
+            self.hits = 0
+
+    def container(self, container_id: str, journey: Optional[str]) -> Optional[ContainerRecord]:
+        """
+        Return the container scraped earlier in the run on the same journey, or None.
+
+        A container whose journey is unknown is never reused.
+        """
+        if not journey:
+            return None
+        with self._lock:
+            record = self.containers.get((container_id, journey))
+            if record is not None:
+                self.hits += 1
+        if record is not None:
+            logging.info(f"Container {container_id} already scraped in this run, reusing it")
+        return record
+
+    def add_container(self, record: ContainerRecord, journey: Optional[str]) -> None:
+        if not journey:
+            return
+        with self._lock:
+            self.containers[(record.id, journey)] = record
+
+    def vessel(self, code: Optional[str]) -> Optional[str]:
+        """
+        Return the name of a vessel seen earlier in the run, or None.
+        """
+        if not code:
+            return None
+        with self._lock:
+            return self.vessels.get(code)
+
+    def add_vessel(self, code: Optional[str], name: Optional[str]) -> Optional[str]:
+        """
+        Remember a vessel name and return the stored one, so repeated names share one string.
+        """
+        if not code or not name:
+            return name
+        with self._lock:
+            return self.vessels.setdefault(code, name)
+
+    def report(self) -> str:
+        with self._lock:
+            return (f"Run index: {len(self.containers)} containers, {self.hits} reused, "
+                    f"{len(self.vessels)} vessels")
@@ -0,0 +1,423 @@
+import multiprocessing
+import os
+import shutil
+import zlib
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+from Application.Aggregate import aggregate, milestone_frame
+from Application.Api import TrackingApi
+from Application.Metrics import metrics
+from Application.Cache import ResultCache, CACHE_PATH, TTL
+from Application.Diff import ChangeDetector, SNAPSHOT_PATH
+from Application.Events import configure as configure_events, load_mapping
+from Application.DriverPool import RECYCLE_AFTER
+from Application.helpers import retry_budget, RETRY_BUDGET
+from Application.Output import OutputWriter, CHUNK_SIZE as READ_CHUNK_SIZE
+from Application.Records import ShipmentRecord
+from Application.RunIndex import RunIndex
+from Application.StartupCache import user_agents, patched_driver_path
+from Application.WebDriverManager import CHROME_VERSION_MAIN
+from Application.WorkerPool import WorkerPool, NORMAL
+from Application.Orchestrator import AsyncOrchestrator, TASK_TIMEOUT
+from Application.Scheduler import Scheduler
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+BASE_URL = "https://ecomm.one-line.com/one-ecom/manage-shipment/cargo-tracking"
+CHUNK_SIZE = 100  # bookings fetched before their rows are appended to the output
+INPUT_FORMATS = ("csv", "xlsx", "parquet")
+DEFERRED_ERROR = "Deferred by refresh limit"
+
+
+@dataclass
+class RunConfig:
+    """
+    Settings of a scraping run.
+
+    Attributes:
+        base_url (str): The cargo tracking page URL
+        pool_size (int): Number of browsers scraping in parallel within one process
+        warm_session (bool): Reuse the loaded page between bookings instead of refreshing
+        use_api (bool): Fetch through the tracking API first, the browser only scrapes what it could not get
+        capture_network (bool): Build shipments from the page's captured JSON responses instead of the DOM
+        cache_path (Optional[str]): ResultCache database, None to always fetch every booking
+        cache_ttl (float): Seconds before an on-going shipment is fetched again
+        lazy_containers (bool): Only open containers whose summary row changed since they were cached
+        chunk_size (int): Bookings fetched before their rows are appended to the output
+        throughput (bool): Run browsers headless with images, fonts, stylesheets and analytics blocked
+        recycle_after (int): Bookings before a browser is replaced by a fresh one
+        max_browser_mb (Optional[float]): Browser memory in MiB before it is replaced, needs psutil
+        retry_budget (int): Retries allowed in the whole run (split between processes when sharded)
+        event_mapping (Optional[str]): JSON file replacing the built-in event mapping table
+        diff_path (Optional[str]): JSON lines file receiving the milestone deltas since the previous run;
+            an interrupted run may write the deltas of its last chunk twice (see ChangeDetector)
+        snapshot_path (str): SQLite database with the state the deltas are computed against
+        async_sessions (bool): Drive the browsers from an asyncio orchestrator that cancels stuck bookings
+        task_timeout (float): Seconds a booking may run before the orchestrator cancels it
+        schedule (bool): Only fetch cached bookings whose next milestone is predicted soon, needs the cache;
+            due bookings are fetched first but the output keeps the input order
+        refresh_limit (Optional[int]): Most bookings fetched per run when scheduling, the most overdue first
+        adaptive_rate (bool): Slow the browsers down when the site does and speed them up again (AIMD)
+        min_interval (float): Shortest pause in seconds between two browser searches
+    """
+    base_url: str = BASE_URL
+    pool_size: int = 1
+    warm_session: bool = True
+    use_api: bool = True
+    capture_network: bool = False
+    cache_path: Optional[str] = CACHE_PATH
+    cache_ttl: float = TTL
+    lazy_containers: bool = True
+    chunk_size: int = CHUNK_SIZE
+    throughput: bool = False
+    recycle_after: int = RECYCLE_AFTER
+    max_browser_mb: Optional[float] = None
+    adaptive_rate: bool = True
+    min_interval: float = 0.0
+    retry_budget: int = RETRY_BUDGET
+    event_mapping: Optional[str] = None
+    diff_path: Optional[str] = None
+    snapshot_path: str = SNAPSHOT_PATH
+    async_sessions: bool = False
+    task_timeout: float = TASK_TIMEOUT
+    schedule: bool = False
+    refresh_limit: Optional[int] = None
+
+
+def resolve_format(path: str, file_format: Optional[str] = None) -> str:
+    """
+    Return the explicit format or the one implied by the file extension.
+
+    Raises:
+        ValueError: If the format is not one of INPUT_FORMATS
+    """
+    file_format = (file_format or os.path.splitext(path)[1].lstrip(".")).lower()
+    if file_format not in INPUT_FORMATS:
+        raise ValueError("Incorrect file format.")
+    return file_format
+
+
+def read_booking_numbers(path: str, input_format: Optional[str] = None) -> List[str]:
+    """
+    Read the unique booking numbers from the first column of the input file.
+
+    Args:
+        path (str): The input file
+        input_format (Optional[str]): "csv", "xlsx" or "parquet", defaults to the file extension
+
+    Returns:
+        List[str]: Booking numbers in input order, without duplicates or blanks
+    """
+    input_format = resolve_format(path, input_format)
+    if input_format == "csv":
+        input_file = pd.read_csv(path)
+    elif input_format == "xlsx":
+        input_file = pd.read_excel(path)
+    else:
+        input_file = pd.read_parquet(path)
+    return [str(booking_number) for booking_number in input_file.iloc[:, 0].dropna().unique().tolist()]
+
+
+def select_shard(booking_numbers: List[str], index: int, count: int) -> List[str]:
+    """
+    Keep the booking numbers that belong to shard `index` of `count`.
+
+    Bookings are assigned by a stable hash of the booking number, so every host
+    gets the same split whatever the order of its input file.
+
+    Args:
+        booking_numbers (List[str]): All booking numbers
+        index (int): The shard to keep, from 1 to count
+        count (int): The number of shards
+
+    Returns:
+        List[str]: The booking numbers of the shard, in input order
+    """
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {index}/{count}")
+    return [
+        booking_number for booking_number in booking_numbers
+        if zlib.crc32(str(booking_number).encode()) % count == index - 1
+    ]
+
+
+class Runner:
+    """
+    Fetches booking numbers chunk by chunk and streams the rows to an output file.
+
+    Each chunk goes through the cache, then the tracking API, then the browser,
+    and is written in input order with a checkpoint so an interrupted run resumes.
+
+    Attributes:
+        config (RunConfig): Settings of the run
+    """
+
+    def __init__(self, config: RunConfig) -> None:
+        self.config = config
+        if config.event_mapping:
+            configure_events(load_mapping(config.event_mapping))
+        self.cache = ResultCache(config.cache_path, ttl=config.cache_ttl) if config.cache_path else None
+        self.index = RunIndex()
+        self.api = TrackingApi(index=self.index) if config.use_api else None
+        pool_options = dict(
+            pool_size=config.pool_size, warm_session=config.warm_session,
+            capture_network=config.capture_network, cache=self.cache, lazy_containers=config.lazy_containers,
+            throughput=config.throughput, recycle_after=config.recycle_after,
+            max_browser_rss=int(config.max_browser_mb * 2 ** 20) if config.max_browser_mb else None,
+            adaptive_rate=config.adaptive_rate, min_interval=config.min_interval, index=self.index,
+        )
+        self.priorities: Dict[str, int] = {}
+        self.skip: Set[str] = set()  # bookings served from the cache however old, see plan()
+        self.deferred: Set[str] = set()  # skipped bookings that were never cached, see plan()
+        if config.async_sessions:
+            self.pool = AsyncOrchestrator(config.base_url, task_timeout=config.task_timeout, **pool_options)
+        else:
+            self.pool = WorkerPool(config.base_url, **pool_options)
+
+    def close(self) -> None:
+        self.pool.close()
+        if self.api is not None:
+            self.api.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def fetch(self, chunk: List[str]) -> List[ShipmentRecord]:
+        """
+        Fetch a chunk of booking numbers from the cache, the API and the browser, in that order.
+
+        Returns:
+            List[ShipmentRecord]: The shipments, with an error record for every failed booking,
+                in no particular order
+        """
+        fetched = [ShipmentRecord.failed(booking_number, DEFERRED_ERROR)
+                   for booking_number in chunk if str(booking_number) in self.deferred]
+        browser_booking_numbers = [booking_number for booking_number in chunk if str(booking_number) not in self.deferred]
+        if self.cache is not None:
+            chunk, browser_booking_numbers = browser_booking_numbers, []
+            for booking_number in chunk:
+                if str(booking_number) in self.skip:
+                    cached = self.cache.peek(str(booking_number))
+                else:
+                    cached = self.cache.get(booking_number)
+                if cached is not None:
+                    fetched.append(cached)
+                else:
+                    browser_booking_numbers.append(booking_number)
+
+        if self.api is not None and browser_booking_numbers:
+            api_shipments, api_failures = self.api.get_shipments(browser_booking_numbers)
+            for shipment in api_shipments.values():
+                fetched.append(shipment)
+                if self.cache is not None:
+                    self.cache.put(shipment)
+            browser_booking_numbers = [browser_booking_numbers[index] for index in sorted(api_failures)]
+
+        if browser_booking_numbers:
+            fetched.extend(self.pool.run(browser_booking_numbers, self.priorities))
+            for index, (booking_number, error) in sorted(self.pool.failures.items()):
+                print(f"Failed: {booking_number} - {error}")
+                fetched.append(ShipmentRecord.failed(booking_number, error))
+        return fetched
+
+    def run(self, booking_numbers: List[str], output_path: str, output_format: Optional[str] = None) -> List[str]:
+        """
+        Fetch every booking number and write the output, resuming from a checkpoint.
+
+        A booking that fails is written as an error row instead of stopping the run,
+        so the output always covers the whole input. With a diff path, the changes
+        since the previous run are also appended to it as JSON lines.
+
+        Args:
+            booking_numbers (List[str]): Booking numbers in output order
+            output_path (str): The output file
+            output_format (Optional[str]): "csv", "xlsx" or "parquet", defaults to the file extension
+
+        Returns:
+            List[str]: Booking numbers that could not be fetched
+        """
+        retry_budget.reset(self.config.retry_budget)
+        self.index.clear()
+        writer = OutputWriter(output_path, output_format=output_format)
+        completed = writer.completed()
+        booking_numbers = [booking_number for booking_number in booking_numbers if str(booking_number) not in completed]
+        self.priorities, self.skip, self.deferred = {}, set(), set()
+        if self.config.schedule:
+            self.plan(booking_numbers)
+        if booking_numbers and not self.config.use_api:
+            self.pool.drivers.start()  # browsers launch while the cache is read
+
+        detector = ChangeDetector(self.config.diff_path, self.config.snapshot_path) if self.config.diff_path else None
+        try:
+            missing = self._run_chunks(booking_numbers, writer, detector)
+        finally:
+            if detector is not None:
+                detector.close()
+
+        logging.info(self.index.report())
+        if missing:
+            print(f"{len(missing)} bookings failed, see the Error column of the output: {missing}")
+        writer.finalize()
+        return missing
+
+    def plan(self, booking_numbers: List[str]) -> None:
+        """
+        Let the Scheduler pick the bookings to fetch in this run.
+
+        The plan only sets the fetch priorities, the one due the longest first; the
+        output keeps the input order. Skipped bookings are served from the cache
+        however old; skipped bookings that were never cached get a "Deferred by
+        refresh limit" error row, are not reported as failed, and are fetched again
+        by the next run that does not resume this output.
+
+        Args:
+            booking_numbers (List[str]): Booking numbers of the run
+        """
+        if self.cache is None:
+            logging.warning("Scheduling needs the result cache, fetching every booking")
+            return
+        plan = Scheduler(self.cache).plan(booking_numbers, limit=self.config.refresh_limit)
+        self.cache.refresh_times = plan.refresh_times
+        self.skip = plan.skip
+        self.priorities = {booking_number: NORMAL + rank for rank, booking_number in enumerate(plan.due)}
+        self.deferred = {booking_number for booking_number in plan.skip if self.cache.fetched_at(booking_number) is None}
+        if self.deferred:
+            print(f"{len(self.deferred)} new bookings left for a later run by the refresh limit")
+
+    def _run_chunks(self, booking_numbers: List[str], writer: OutputWriter,
+                    detector: Optional[ChangeDetector]) -> List[str]:
+        missing = []
+        for offset in range(0, len(booking_numbers), self.config.chunk_size):
+            chunk = booking_numbers[offset:offset + self.config.chunk_size]
+            # keep the output in input file order, whichever backend fetched the shipment
+            fetched_by_booking = {shipment.booking_number: shipment for shipment in self.fetch(chunk)}
+            shipments = []
+            for booking_number in chunk:
+                shipment = fetched_by_booking.pop(str(booking_number), None)
+                if shipment is None:
+                    shipment = ShipmentRecord.failed(booking_number, "Not fetched")
+                if shipment.error is not None and str(booking_number) not in self.deferred:
+                    missing.append(booking_number)
+                shipments.append(shipment)
+            if detector is not None:
+                # before the checkpoint: a resumed chunk is diffed again, which the snapshot makes a no-op
+                detector.process(shipments)
+            writer.write([shipment.booking_number for shipment in shipments], aggregate(milestone_frame(shipments)))
+        return missing
+
+
+def run(config: RunConfig, booking_numbers: List[str], output_path: str,
+        output_format: Optional[str] = None) -> List[str]:
+    """
+    Run a single-process Runner and close it afterwards.
+
+    Returns:
+        List[str]: Booking numbers that could not be fetched
+    """
+    runner = Runner(config)
+    try:
+        return runner.run(booking_numbers, output_path, output_format)
+    finally:
+        runner.close()
+
+
+def run_part(config: RunConfig, booking_numbers: List[str], output_path: str) -> tuple:
+    """
+    Worker process entry point: run a part and send the missing bookings and metrics back.
+    """
+    return run(config, booking_numbers, output_path), metrics.snapshot()
+
+
+def run_sharded(config: RunConfig, booking_numbers: List[str], output_path: str, workers: int,
+                output_format: Optional[str] = None) -> List[str]:
+    """
+    Split the booking numbers across worker processes, each owning one browser,
+    and merge their partial outputs into `output_path`.
+
+    Worker k scrapes the k-th contiguous block of the input into its own partial
+    CSV (with its own checkpoint), so concatenating the parts keeps the input order
+    and a rerun with the same input and worker count resumes every part.
+
+    Args:
+        config (RunConfig): Settings of the run, pool_size is forced to 1 per process
+        booking_numbers (List[str]): Booking numbers in output order
+        output_path (str): The output file
+        workers (int): Number of worker processes
+        output_format (Optional[str]): "csv", "xlsx" or "parquet", defaults to the file extension
+
+    Returns:
+        List[str]: Booking numbers that could not be fetched
+    """
+    if workers <= 1:
+        return run(config, booking_numbers, output_path, output_format)
+
+    config = replace(config, pool_size=1, retry_budget=-(-config.retry_budget // workers),
+                     refresh_limit=-(-config.refresh_limit // workers) if config.refresh_limit else config.refresh_limit)
+    # fill the startup cache once here rather than in every worker at the same time
+    user_agents()
+    patched_driver_path(CHROME_VERSION_MAIN)
+    block = -(-len(booking_numbers) // workers)
+    parts = [(f"{output_path}.part-{part}.csv", booking_numbers[part * block:(part + 1) * block])
+             for part in range(workers)]
+    parts = [(part_path, part_booking_numbers) for part_path, part_booking_numbers in parts if part_booking_numbers]
+    diff_paths = [f"{config.diff_path}.part-{part}.jsonl" if config.diff_path else None for part in range(len(parts))]
+
+    with multiprocessing.get_context("spawn").Pool(len(parts)) as processes:
+        results = processes.starmap(run_part, [(replace(config, diff_path=diff_path), part_booking_numbers, part_path)
+                                               for (part_path, part_booking_numbers), diff_path
+                                               in zip(parts, diff_paths)])
+    missing = []
+    for part_missing, part_metrics in results:
+        missing.extend(part_missing)
+        metrics.merge(part_metrics)
+    if missing:
+        print(f"{len(missing)} bookings failed, see the Error column of the output: {missing}")
+
+    merge_outputs([part_path for part_path, _ in parts], output_path, output_format)
+    if config.diff_path:
+        merge_deltas(diff_paths, config.diff_path)
+    return missing
+
+
+def merge_outputs(part_paths: List[str], output_path: str, output_format: Optional[str] = None) -> None:
+    """
+    Concatenate partial CSV outputs into the final output and remove them.
+
+    Args:
+        part_paths (List[str]): Finished partial CSV outputs, in order
+        output_path (str): The output file
+        output_format (Optional[str]): "csv", "xlsx" or "parquet", defaults to the file extension
+    """
+    if os.path.exists(f"{output_path}.checkpoint"):
+        os.remove(f"{output_path}.checkpoint")  # a merge always starts over
+    writer = OutputWriter(output_path, output_format=output_format)
+    for part_path in part_paths:
+        for rows in pd.read_csv(part_path, dtype=str, keep_default_na=False, chunksize=READ_CHUNK_SIZE):
+            rows = rows.where(rows != "", None)
+            writer.write(rows["Shipment ID"].unique().tolist(), rows)
+    writer.finalize()
+    for part_path in part_paths:
+        os.remove(part_path)
+    logging.info(f"Merged {len(part_paths)} partial outputs into {output_path}")
+
+
+def merge_deltas(part_paths: List[str], delta_path: str) -> None:
+    """
+    Append the delta streams of the worker processes to `delta_path` and remove them.
+
+    Args:
+        part_paths (List[str]): Delta files of the parts, in order
+        delta_path (str): The JSON lines file of the run
+    """
+    with open(delta_path, "ab") as deltas:
+        for part_path in part_paths:
+            if not os.path.exists(part_path):
+                continue
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, deltas)
+            os.remove(part_path)
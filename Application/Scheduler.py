@@ -0,0 +1,155 @@
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from Application.Cache import ResultCache
+from Application.Events import normalize_event, GATE_IN, DEPARTURE, ARRIVAL, DISCHARGE, GATE_OUT
+from Application.Records import ContainerRecord, ShipmentRecord
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+# usual time from a milestone to the next one, used when the site gives no estimate
+TYPICAL_GAPS = {
+    GATE_IN: timedelta(days=3),  # to departure
+    DEPARTURE: timedelta(days=14),  # ocean leg, to arrival
+    ARRIVAL: timedelta(days=1),  # to discharge
+    DISCHARGE: timedelta(days=3),  # to gate out for delivery
+    GATE_OUT: timedelta(days=5),  # to empty container return
+}
+DEFAULT_GAP = timedelta(days=2)
+LEAD_TIME = timedelta(hours=6)  # refresh this long before the predicted milestone
+MIN_INTERVAL = 2 * 60 * 60  # seconds between two fetches of the same booking, at least
+MAX_INTERVAL = 3 * 24 * 60 * 60  # seconds between two fetches of the same booking, at most
+NEVER = math.inf
+
+
+def predict_next_event(container: ContainerRecord, now: datetime) -> Optional[datetime]:
+    """
+    Estimate when the next milestone of a container happens.
+
+    The site lists estimated dates for upcoming milestones, so the earliest
+    future date is used when there is one; otherwise the typical gap after the
+    latest milestone so far. A result in the past means the milestone is overdue.
+
+    Args:
+        container (ContainerRecord): The container's last known state
+        now (datetime): The current time, in the site's local time like the milestone dates
+
+    Returns:
+        Optional[datetime]: The predicted time, or None if the container is complete
+    """
+    if container.is_complete:
+        return None
+    dates = [milestone.date for milestone in container.milestones if milestone.date is not None]
+    upcoming = [date for date in dates if date > now]
+    if upcoming:
+        return min(upcoming)
+
+    latest = next((milestone for milestone in reversed(container.milestones)
+                   if milestone.date is not None and milestone.date <= now), None)
+    if latest is None:
+        return now
+    return latest.date + TYPICAL_GAPS.get(normalize_event(latest.event), DEFAULT_GAP)
+
+
+@dataclass
+class RefreshPlan:
+    """
+    Which bookings a run fetches, in which order, and which it leaves alone.
+
+    Attributes:
+        refresh_times (Dict[str, float]): Refresh time by booking number, NEVER for the skipped ones
+        due (List[str]): Bookings to fetch, the one due the longest first
+        skip (Set[str]): Bookings not to fetch in this run; cached ones are served from the cache
+            however old, the others are left for a later run
+    """
+    refresh_times: Dict[str, float] = field(default_factory=dict)
+    due: List[str] = field(default_factory=list)
+    skip: Set[str] = field(default_factory=set)
+
+
+class Scheduler:
+    """
+    Decides which cached bookings are worth fetching again in this run.
+
+    Every on-going container gets a predicted next milestone time; a booking is
+    due shortly before the earliest prediction of its containers, but never more
+    often than `min_interval` and never less often than `max_interval`. So a
+    container in the middle of the ocean is checked every few days while one
+    about to arrive is checked at every run. Bookings that were never fetched are
+    due from the start of the run, so cached bookings overdue since before then
+    are fetched ahead of them and do not starve while new bookings keep
+    arriving; complete bookings are never due.
+
+    Attributes:
+        cache (ResultCache): Holds the milestone history and fetch times
+        lead_time (timedelta): How long before the predicted milestone a booking becomes due
+        min_interval (float): Seconds between two fetches of a booking, at least
+        max_interval (float): Seconds between two fetches of a booking, at most
+    """
+
+    def __init__(self, cache: ResultCache, lead_time: timedelta = LEAD_TIME,
+                 min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL) -> None:
+        self.cache = cache
+        self.lead_time = lead_time
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+    def refresh_time(self, shipment: ShipmentRecord, fetched_at: float, now: float) -> float:
+        """
+        UNIX time from which a cached shipment should be fetched again.
+
+        Args:
+            shipment (ShipmentRecord): The cached shipment
+            fetched_at (float): When it was fetched, as a UNIX timestamp
+            now (float): The current time, as a UNIX timestamp
+
+        Returns:
+            float: The refresh time, NEVER if every container is complete
+        """
+        current = datetime.fromtimestamp(now)
+        predictions = [predict_next_event(container, current) for container in shipment.containers]
+        predictions = [prediction for prediction in predictions if prediction is not None]
+        if shipment.containers and not predictions:
+            return NEVER
+        if not predictions:
+            return fetched_at  # no container known yet, look again
+        due = (min(predictions) - self.lead_time).timestamp()
+        return min(max(due, fetched_at + self.min_interval), fetched_at + self.max_interval)
+
+    def plan(self, booking_numbers: Iterable[str], now: Optional[float] = None,
+             limit: Optional[int] = None) -> RefreshPlan:
+        """
+        Decide which bookings to fetch in this run.
+
+        Args:
+            booking_numbers (Iterable[str]): The bookings of the run
+            now (Optional[float]): Current time as a UNIX timestamp, defaults to time.time()
+            limit (Optional[int]): Most bookings to fetch, new and cached together; the ones
+                due the longest are kept
+
+        Returns:
+            RefreshPlan: The due bookings in fetch order and the skipped ones
+        """
+        now = time.time() if now is None else now
+        refresh_times = {}
+        for booking_number in map(str, booking_numbers):
+            fetched_at = self.cache.fetched_at(booking_number)
+            shipment = self.cache.peek(booking_number) if fetched_at is not None else None
+            refresh_times[booking_number] = now if shipment is None else self.refresh_time(shipment, fetched_at, now)
+
+        # sorted() is stable, so bookings due at the same time keep their input order
+        due = sorted((booking_number for booking_number, refresh_at in refresh_times.items() if refresh_at <= now),
+                     key=refresh_times.get)
+        if limit is not None:
+            due = due[:limit]
+        skip = set(refresh_times) - set(due)
+        for booking_number in skip:
+            refresh_times[booking_number] = NEVER
+        logging.info(f"{len(due)} of {len(refresh_times)} bookings due for a refresh")
+        return RefreshPlan(refresh_times, due, skip)
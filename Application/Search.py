@@ -11,7 +11,12 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException
 #from ..Log.logging_config import setup_logger
 #setup_logger()
 
-TIMEOUT = 60
+TIMEOUT = 30
+
+
+class BookingNotFound(Exception):
+    """Raised when the tracking page answers a search with no results."""
+
 
 class SearchBar:
     def __init__(self, driver):
@@ -27,6 +32,7 @@ class SearchBar:
             return button
         except TimeoutException:
             logging.error("Failed to get search click button.")
+            raise
 
     def get_search_box(self, identifier: tuple) -> WebElement:
         try:
@@ -35,6 +41,7 @@ class SearchBar:
             return search_bar
         except (TimeoutException) as e:
             logging.error(f"Failed to access search bar. Error: {e}")
+            raise
 
     def clear(self):
         self.search_box.send_keys(Keys.CONTROL + "a", Keys.BACKSPACE)
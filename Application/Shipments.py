@@ -3,21 +3,39 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from typing import List
+from dataclasses import replace
+from typing import Dict, List, Optional
 from Application.Container import Container
 from selenium.webdriver.remote.webelement import WebElement
 from Application.helpers import retry_until_success
+from Application.Records import ContainerRecord, ShipmentRecord
+from Application.Metrics import metrics
+from Application.RunIndex import RunIndex
 
 import logging
 from Application.logging_config import setup_logger
 setup_logger()
 
 # Constants
-TIMEOUT = 60
+TIMEOUT = 15  # the search already waited for the result rows, these waits only cover re-renders
 CONTAINER_TABLE_ID = "//*[@id='main-grid']/tbody"
 CONTAINER_ROW_XPATH = "./tr[@id]"
 CONTAINER_CELL_XPATH = "./td[4]"
 
+# Returns {container ID: row text} for every container row of the tbody passed as arguments[0].
+CONTAINER_SUMMARY_SCRIPT = """
+var rows = arguments[0].querySelectorAll(':scope > tr[id]');
+var summaries = {};
+for (var i = 0; i < rows.length; i++) {
+    var cells = rows[i].querySelectorAll(':scope > td');
+    var id = cells[3] ? cells[3].getAttribute('title') : null;
+    if (id) {
+        summaries[id] = rows[i].innerText.replace(/\\s+/g, ' ').trim();
+    }
+}
+return summaries;
+"""
+
 
 class Shipment:
     """
@@ -28,15 +46,24 @@ class Shipment:
         shipment_page (WebDriver): The Selenium WebDriver instance for the shipment page
         containers (List[Container]): List of containers associated with this shipment
         container_table (WebElement): The table element containing container information
+        known_containers (Optional[Dict[str, ContainerRecord]]): Last known state of the containers
+        index (Optional[RunIndex]): Containers and vessels already scraped in this run
     """
     
-    def __init__(self, booking_number: str, driver: WebDriver) -> None:
+    def __init__(self, booking_number: str, driver: WebDriver,
+                 known_containers: Optional[Dict[str, ContainerRecord]] = None,
+                 index: Optional[RunIndex] = None) -> None:
         """
         Initialize a Shipment instance.
         
         Args:
             booking_number (str): The unique booking number for this shipment
             driver (WebDriver): The Selenium WebDriver instance for the shipment page
+            known_containers (Optional[Dict[str, ContainerRecord]]): Last known state of the
+                containers by ID; when given, containers are only opened if their summary
+                row changed or they are unknown
+            index (Optional[RunIndex]): Containers and vessels already scraped in this run;
+                containers found there are not opened again
             
         Raises:
             ValueError: If booking_number is empty or driver is invalid
@@ -47,9 +74,51 @@ class Shipment:
             
         self.booking_number = booking_number
         self.shipment_page = driver
+        self.known_containers = known_containers
+        self.index = index
         self.containers: List[Container] = []
         self.containers = self.get_containers()
 
+    def to_record(self) -> ShipmentRecord:
+        """
+        Convert to a detached record that holds no page or WebElement references.
+        
+        Returns:
+            ShipmentRecord: The shipment data, safe to cache, pickle or keep in bulk
+        """
+        return ShipmentRecord(
+            booking_number=self.booking_number,
+            containers=tuple(self.container_record(container) for container in self.containers),
+        )
+
+    def container_record(self, container: Container) -> ContainerRecord:
+        """
+        Get the record of a container, reusing the known one if the container cannot have changed.
+        
+        A known container is reused when it is complete or when its summary row reads
+        the same as last time, and a container another booking already scraped in
+        this run with the same summary row is taken from the run index; otherwise the
+        container is opened and scraped.
+        
+        Args:
+            container (Container): The container on the shipment page
+            
+        Returns:
+            ContainerRecord: The container data
+        """
+        known = (self.known_containers or {}).get(container.id)
+        if known is not None and (known.is_complete or (container.summary and known.summary == container.summary)):
+            logging.info(f"Container {container.id} unchanged, skipping...")
+            return replace(known, summary=container.summary or known.summary)
+        if self.index is not None:
+            scraped = self.index.container(container.id, container.summary)
+            if scraped is not None:
+                return scraped
+        record = container.to_record()
+        if self.index is not None:
+            self.index.add_container(record, container.summary)
+        return record
+
     def get_container_table(self) -> WebElement:
         """
         Get the container table element from the shipment page.
@@ -75,6 +144,15 @@ class Shipment:
                                    on_fail_message="Container table not found",
                                    on_fail_execute_message="Container table not found")    
     
+    def get_container_summaries(self) -> Dict[str, str]:
+        """
+        Read the summary row text of every container in one script call.
+        
+        Returns:
+            Dict[str, str]: Whitespace-normalized row text by container ID
+        """
+        return self.shipment_page.execute_script(CONTAINER_SUMMARY_SCRIPT, self.get_container_table()) or {}
+
     def get_containers(self) -> List[Container]:
         """
         Get all containers associated with this shipment.
@@ -91,18 +169,26 @@ class Shipment:
             )
             logging.info(f"Found {len(containers)} containers...")
 
-            return [
+            lazy = self.known_containers is not None or self.index is not None
+            summaries = self.get_container_summaries() if lazy else {}
+            containers = [
                 Container(
                     container.find_element(By.XPATH, CONTAINER_CELL_XPATH),
-                    self.shipment_page
+                    self.shipment_page,
+                    lazy=lazy,
+                    index=self.index
                 ) for container in containers
             ]
+            for container in containers:
+                container.summary = summaries.get(container.id)
+            return containers
         
-        return retry_until_success(func,
-                                   max_retries=3,
-                                   delay=2,
-                                   exceptions=(TimeoutException),
-                                   on_fail_message="Container rows not found",
-                                   on_fail_execute_message="Container rows not found")      
+        with metrics.span("container table"):
+            return retry_until_success(func,
+                                       max_retries=3,
+                                       delay=2,
+                                       exceptions=(TimeoutException),
+                                       on_fail_message="Container rows not found",
+                                       on_fail_execute_message="Container rows not found")      
 
 
@@ -0,0 +1,103 @@
+import json
+import os
+import random
+import shutil
+import sys
+from functools import lru_cache
+from typing import List, Optional
+
+from Application.helpers import write_atomic
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+STARTUP_CACHE_DIR = "startup_cache"
+USER_AGENTS_FILE = "user_agents.json"
+USER_AGENT_POOL_SIZE = 50
+# used when the pool cannot be built, e.g. offline without fake_useragent data
+FALLBACK_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/135.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/135.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/135.0.0.0 Safari/537.36",
+]
+
+
+@lru_cache(maxsize=None)
+def user_agents(cache_dir: str = STARTUP_CACHE_DIR) -> List[str]:
+    """
+    Load the persisted user agent pool, building it from fake_useragent on first use.
+
+    Loaded once per process, so drivers started later in the run pick from memory.
+
+    Args:
+        cache_dir (str): Directory of the startup cache
+
+    Returns:
+        List[str]: User agent strings to pick from
+    """
+    path = os.path.join(cache_dir, USER_AGENTS_FILE)
+    try:
+        with open(path, encoding="utf-8") as file:
+            pool = json.load(file)
+        if pool:
+            return pool
+    except (OSError, ValueError):
+        pass
+
+    try:
+        from fake_useragent import UserAgent
+        generator = UserAgent()
+        pool = sorted({generator.random for _ in range(USER_AGENT_POOL_SIZE)})
+    except Exception as e:
+        logging.warning(f"Could not build the user agent pool, using the built-in agents: {e}")
+        return list(FALLBACK_USER_AGENTS)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    write_atomic(path, json.dumps(pool, indent=1))
+    logging.info(f"Saved {len(pool)} user agents to {path}")
+    return pool
+
+
+def random_user_agent(cache_dir: str = STARTUP_CACHE_DIR) -> str:
+    return random.choice(user_agents(cache_dir))
+
+
+def patched_driver_path(version_main: int, cache_dir: str = STARTUP_CACHE_DIR) -> Optional[str]:
+    """
+    Return a chromedriver already patched by undetected_chromedriver, patching one on first use.
+
+    undetected_chromedriver downloads and patches a fresh chromedriver on every
+    launch unless given a patched binary; the binary is kept per Chrome major
+    version so later launches skip the download entirely and work offline.
+
+    Args:
+        version_main (int): Chrome major version the driver must match
+        cache_dir (str): Directory of the startup cache
+
+    Returns:
+        Optional[str]: Path of the patched binary, or None if it could not be prepared
+    """
+    path = os.path.abspath(os.path.join(
+        cache_dir, f"chromedriver-{version_main}{'.exe' if sys.platform.startswith('win') else ''}"
+    ))
+    if os.path.isfile(path):
+        return path
+
+    try:
+        from undetected_chromedriver.patcher import Patcher
+        patcher = Patcher(version_main=version_main)
+        patcher.auto()
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copy2(patcher.executable_path, temporary_path)
+        os.replace(temporary_path, path)
+    except Exception as e:
+        logging.warning(f"Could not prepare a patched chromedriver, it will be patched on every launch: {e}")
+        return None
+    logging.info(f"Saved patched chromedriver {version_main} to {path}")
+    return path
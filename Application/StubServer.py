@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from Application.Api import TRACKING_PATH, SEARCH_COMMAND, DETAIL_COMMAND
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "tracking")
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+class FixtureStore:
+    """
+    Loads recorded tracking responses, one JSON file per booking number.
+
+    Each file holds {"search": <search response>, "details": {<container ID>: <detail response>}},
+    which is the format written by TrackingApi(record_dir=...).
+    """
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR) -> None:
+        self.fixtures_dir = fixtures_dir
+        self._fixtures: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, booking_number: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if booking_number not in self._fixtures:
+                path = os.path.join(self.fixtures_dir, f"{booking_number}.json")
+                if not os.path.isfile(path):
+                    return None
+                with open(path, encoding="utf-8") as file:
+                    self._fixtures[booking_number] = json.load(file)
+            return self._fixtures[booking_number]
+
+    def find_container(self, container_id: str, booking_number: str = "") -> Optional[Dict[str, Any]]:
+        fixture = self.get(booking_number) if booking_number else None
+        if fixture and container_id in fixture["details"]:
+            return fixture["details"][container_id]
+        for name in sorted(os.listdir(self.fixtures_dir)):
+            if name.endswith(".json"):
+                fixture = self.get(name[:-len(".json")])
+                if fixture and container_id in fixture["details"]:
+                    return fixture["details"][container_id]
+        return None
+
+
+class TrackingStubHandler(BaseHTTPRequestHandler):
+    """
+    Answers the tracking endpoint from a FixtureStore, like the live site would.
+
+    Unknown bookings get an empty result list, unknown paths a 404.
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the live site
+    store: FixtureStore = None
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != TRACKING_PATH:
+            self.send_json({"error": "not found"}, status=404)
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        self.send_json(self.answer(form))
+
+    def answer(self, form: Dict[str, str]) -> Dict[str, Any]:
+        command = form.get("f_cmd")
+        if command == SEARCH_COMMAND:
+            fixture = self.store.get(form.get("search_name", ""))
+            return fixture["search"] if fixture else {"list": []}
+        if command == DETAIL_COMMAND:
+            detail = self.store.find_container(form.get("cntr_no", ""), form.get("bkg_no", ""))
+            return detail if detail else {"list": []}
+        return {"error": f"unknown command {command}"}
+
+    def send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.info(f"Stub server: {format % args}")
+
+
+def serve(host: str = HOST, port: int = PORT, fixtures_dir: str = FIXTURES_DIR,
+          handler: type = TrackingStubHandler, store: Optional[FixtureStore] = None) -> ThreadingHTTPServer:
+    """
+    Start the stub server on a background thread.
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind, 0 picks a free one
+        fixtures_dir (str): Directory of recorded booking fixtures
+        handler (type): Request handler class, a TrackingStubHandler subclass
+        store (Optional[FixtureStore]): Store to answer from instead of the fixtures directory
+
+    Returns:
+        ThreadingHTTPServer: The running server; call shutdown() to stop it
+    """
+    handler = type(handler.__name__, (handler,), {"store": store or FixtureStore(fixtures_dir)})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"Stub server listening on http://{host}:{server.server_address[1]}")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded tracking fixtures locally.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.fixtures)
+    print(f"Serving {args.fixtures} on http://{args.host}:{server.server_address[1]}{TRACKING_PATH}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -2,8 +2,9 @@
 import undetected_chromedriver as uc
 
 from selenium.webdriver.chrome.options import Options
-from fake_useragent import UserAgent
 from selenium.webdriver.support.wait import WebDriverWait
+from Application.Metrics import metrics, instrument_driver
+from Application.StartupCache import random_user_agent, patched_driver_path
 
 import logging
 
@@ -16,19 +17,45 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
+CHROME_VERSION_MAIN = 135
+
+# Throughput profile: requests the scraper never needs, blocked through CDP
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    "*hotjar.com*", "*clarity.ms*",
+]
+THROUGHPUT_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+]
+THROUGHPUT_DISABLED_FEATURES = ["Translate", "MediaRouter", "OptimizationHints", "AutofillServerCommunication"]
+
 
 class Driver:
-    def __init__(self):
+    def __init__(self, capture_network=False, headless=False, throughput=False):
         self.driver = None
+        self.capture_network = capture_network # record CDP network events in the performance log
+        # headless, eager page loads and no images, fonts, stylesheets or analytics
+        self.throughput = throughput
+        self.headless = headless or throughput
         self.chrome_options = Options()
-        self.ua = UserAgent()
-        self.setUpDriver()
+        with metrics.span("driver startup"):
+            self.setUpDriver()
         self.wait = WebDriverWait(self.driver, 30, poll_frequency=0.5)
         #self.cookies = Cookies(self.driver, "cookies.pkl")
 
     def setUpDriver(self):
         logging.info("Setting up driver...")
-        # self.chrome_options.add_argument("--headless=new")
+        if self.headless:
+            self.chrome_options.add_argument("--headless=new")
         self.chrome_options.add_argument("--disable-gpu")
 
         self.chrome_options.add_argument("--ignore-certificate-errors")
@@ -46,19 +73,35 @@ class Driver:
         self.chrome_options.add_argument("--disable-dev-shm-usage")
         self.chrome_options.add_argument("--window-size=1920,1080")
         self.chrome_options.add_argument("--disable-browser-side-navigation")
-        self.chrome_options.add_argument("--disable-features=VizDisplayCompositor")
+        disabled_features = ["VizDisplayCompositor"]
+        if self.throughput:
+            self.chrome_options.page_load_strategy = "eager"
+            for argument in THROUGHPUT_ARGUMENTS:
+                self.chrome_options.add_argument(argument)
+            disabled_features += THROUGHPUT_DISABLED_FEATURES
+        self.chrome_options.add_argument(f"--disable-features={','.join(disabled_features)}")
         self.chrome_options.add_argument(
             "--disable-blink-features=AutomationControlled"
         )
         self.chrome_options.add_argument("--disable-extensions")
         self.chrome_options.add_argument("--disable-infobars")
+        if self.capture_network:
+            self.chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         # Initialize the WebDriver
+        # reuse the chromedriver patched by an earlier launch instead of downloading one
         self.driver = uc.Chrome(
-            version_main=135, options=self.chrome_options, use_subprocess=True
+            version_main=CHROME_VERSION_MAIN, options=self.chrome_options, use_subprocess=True,
+            driver_executable_path=patched_driver_path(CHROME_VERSION_MAIN),
         )
+        instrument_driver(self.driver)
+        if self.throughput:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        if not self.headless:
+            self.driver.maximize_window()
         self.driver.execute_cdp_cmd(
             "Network.setUserAgentOverride",
-            {"userAgent": self.ua.random},  # Pass the User-Agent as a dictionary
+            {"userAgent": random_user_agent()},  # Pass the User-Agent as a dictionary
         )
 
         self.driver.execute_script(
@@ -0,0 +1,247 @@
+import functools
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+from Application.DriverPool import DriverPool, Session, RECYCLE_AFTER
+from Application.One import EcommOne
+from Application.Cache import ResultCache
+from Application.RateController import RateController, ChallengeDetected
+from Application.Records import ShipmentRecord
+from Application.RunIndex import RunIndex
+from Application.helpers import retry_budget
+from Application.WebDriverManager import Driver
+
+import logging
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+POOL_SIZE = 4
+OPEN_ATTEMPTS = 3  # browsers tried before a worker gives up opening the tracking page
+MAX_REQUEUES = 2  # times a booking may be retried on a fresh browser after its browser died
+URGENT = 0  # priority of bookings that jump the queue, lower runs first
+NORMAL = 10  # priority of bookings without one
+
+
+class WorkerPool:
+    """
+    Scrapes booking numbers in parallel using a pool of browser sessions.
+
+    Every worker takes a browser from a DriverPool, opens its own EcommOne
+    session (iframe and search bar included) on it and pulls booking numbers off
+    a shared queue. Browsers outlive `run`, so later chunks reuse the opened
+    pages. When a browser dies mid-booking it is replaced and the booking is put
+    back on the queue; worn out browsers are recycled between bookings. With
+    `adaptive_rate` the workers share a RateController that lowers how many of
+    them search at once and spaces their searches out when the site slows down,
+    times out or shows a bot challenge, and raises them again once searches are
+    fast; bookings hit by a challenge are put back on the queue. Finished
+    shipments are collected by input position so the output order always matches
+    the order of the input file.
+
+    Attributes:
+        base_url (str): The cargo tracking page URL
+        pool_size (int): Number of browser sessions to run in parallel
+        drivers (DriverPool): The browsers the workers scrape with
+        rate_controller (Optional[RateController]): Paces the searches of all workers, None for a fixed rate
+        results (Dict[int, ShipmentRecord]): Finished shipments keyed by input position
+        failures (Dict[int, Tuple[str, Exception]]): Failed booking numbers keyed by input position
+    """
+
+    def __init__(self, base_url: str, pool_size: int = POOL_SIZE,
+                 driver_factory: Optional[Callable[[], Driver]] = None, warm_session: bool = False,
+                 capture_network: bool = False, cache: Optional[ResultCache] = None,
+                 lazy_containers: bool = False, throughput: bool = False,
+                 recycle_after: int = RECYCLE_AFTER, max_browser_rss: Optional[int] = None,
+                 adaptive_rate: bool = False, min_interval: float = 0.0, index: Optional[RunIndex] = None) -> None:
+        """
+        Initialize a WorkerPool instance.
+
+        Args:
+            base_url (str): The cargo tracking page URL
+            pool_size (int): Number of browser sessions to run in parallel
+            driver_factory (Callable[[], Driver]): Creates a new Driver for each worker
+            warm_session (bool): Reuse each worker's loaded page between bookings
+            capture_network (bool): Build shipments from captured network responses
+            cache (Optional[ResultCache]): Shared result cache consulted before searching
+            lazy_containers (bool): Only open containers whose summary row changed since the cached state
+            throughput (bool): Start the default drivers with the headless, resource-trimmed profile
+            recycle_after (int): Bookings before a browser is replaced
+            max_browser_rss (Optional[int]): Browser memory in bytes before it is replaced
+            adaptive_rate (bool): Adapt search concurrency and pacing to the site's responses
+            min_interval (float): Shortest pause in seconds between two search starts with adaptive_rate
+            index (Optional[RunIndex]): Containers and vessels already scraped in this run, shared by the workers
+
+        Raises:
+            ValueError: If pool_size is lower than 1
+        """
+        if pool_size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.drivers = DriverPool(
+            driver_factory or functools.partial(Driver, capture_network=capture_network, throughput=throughput),
+            size=pool_size, recycle_after=recycle_after, max_rss=max_browser_rss,
+        )
+        self.warm_session = warm_session
+        self.capture_network = capture_network
+        self.cache = cache
+        self.lazy_containers = lazy_containers
+        self.rate_controller = RateController(pool_size, min_interval=min_interval) if adaptive_rate else None
+        self.index = index
+        self._lock = threading.Lock()
+        self._attempts: Dict[int, int] = {}
+        self.results: Dict[int, ShipmentRecord] = {}
+        self.failures: Dict[int, Tuple[str, Exception]] = {}
+
+    def close(self) -> None:
+        self.drivers.close()
+
+    def run(self, tracking_numbers: List[str], priorities: Optional[Dict[str, int]] = None) -> List[ShipmentRecord]:
+        """
+        Scrape all booking numbers and return the shipments in input order.
+
+        Booking numbers that failed, or that were left in the queue because every
+        worker died, are recorded in `failures` instead of aborting the run.
+
+        Args:
+            tracking_numbers (List[str]): Booking numbers to scrape
+            priorities (Optional[Dict[str, int]]): Priority by booking number, lower is scraped first,
+                NORMAL if missing
+
+        Returns:
+            List[ShipmentRecord]: Scraped shipments, ordered like the input
+        """
+        self.results = {}
+        self.failures = {}
+        self._attempts = {}
+        jobs: queue.Queue = queue.Queue()
+        order = list(enumerate(tracking_numbers))
+        if priorities:
+            order.sort(key=lambda job: priorities.get(str(job[1]), NORMAL))
+        for index, tracking_number in order:
+            jobs.put((index, tracking_number))
+
+        workers = [
+            threading.Thread(target=self._work, args=(worker_id, jobs), name=f"worker-{worker_id}")
+            for worker_id in range(min(self.pool_size, len(tracking_numbers)))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        while not jobs.empty():
+            index, tracking_number = jobs.get_nowait()
+            self.failures[index] = (str(tracking_number), RuntimeError("No worker left to process booking"))
+
+        for index in sorted(self.failures):
+            tracking_number, error = self.failures[index]
+            logging.error(f"Booking {tracking_number} failed: {error}")
+        if self.rate_controller is not None:
+            logging.info(f"Rate controller state: {self.rate_controller.state()}")
+
+        return [self.results[index] for index in sorted(self.results)]
+
+    def _open_session(self, worker_id: int) -> Optional[Session]:
+        """
+        Get a browser with the tracking page opened, replacing browsers that fail to open it.
+
+        Returns:
+            Optional[Session]: A session whose context is an opened EcommOne, or None
+        """
+        for attempt in range(1, OPEN_ATTEMPTS + 1):
+            try:
+                session = self.drivers.acquire()
+            except RuntimeError as e:
+                logging.error(f"Worker {worker_id} got no browser: {e}")
+                return None
+            if session.context is not None:
+                return session
+            try:
+                one = EcommOne(session.driver.driver, self.base_url, warm_session=self.warm_session,
+                               capture_network=self.capture_network, cache=self.cache,
+                               lazy_containers=self.lazy_containers, rate_controller=self.rate_controller,
+                               index=self.index)
+                one.open()
+                session.context = one
+                return session
+            except Exception as e:
+                logging.error(f"Worker {worker_id} failed to open the tracking page ({attempt}/{OPEN_ATTEMPTS}): {e}")
+                self.drivers.retire(session)
+        return None
+
+    def _requeue(self, index: int, tracking_number: str, error: Exception, jobs: queue.Queue) -> None:
+        """
+        Put a booking whose browser died or was challenged back on the queue, unless it already failed
+        too often or the run's retry budget is spent.
+        """
+        with self._lock:
+            self._attempts[index] = self._attempts.get(index, 0) + 1
+            if self._attempts[index] > MAX_REQUEUES or not retry_budget.spend():
+                self.failures[index] = (str(tracking_number), error)
+                return
+        logging.info(f"Re-queueing booking {tracking_number}")
+        jobs.put((index, tracking_number))
+
+    def _work(self, worker_id: int, jobs: queue.Queue) -> None:
+        """
+        Process booking numbers from the queue until it is empty or no browser can be had.
+
+        Args:
+            worker_id (int): Identifier used in log messages
+            jobs (queue.Queue): Shared queue of (input position, booking number)
+        """
+        session: Optional[Session] = None
+        try:
+            while True:
+                try:
+                    index, tracking_number = jobs.get_nowait()
+                except queue.Empty:
+                    break
+
+                if session is None:
+                    session = self._open_session(worker_id)
+                    if session is None:
+                        jobs.put((index, tracking_number))
+                        break
+                one: EcommOne = session.context
+
+                failed = True
+                try:
+                    logging.info(f"Worker {worker_id} processing booking {tracking_number}...")
+                    shipment = one.search(tracking_number)
+                    with self._lock:
+                        self.results[index] = shipment
+                    failed = False
+                except ChallengeDetected as e:
+                    logging.warning(f"Worker {worker_id}: {e}")
+                    self._requeue(index, tracking_number, e, jobs)
+                except Exception as e:
+                    if not self.drivers.is_alive(session):
+                        logging.error(f"Worker {worker_id} browser died on booking {tracking_number}: {e}")
+                        self.drivers.retire(session)
+                        session = None
+                        self._requeue(index, tracking_number, e, jobs)
+                        continue
+                    with self._lock:
+                        self.failures[index] = (str(tracking_number), e)
+
+                session.bookings += 1
+                if self.drivers.should_recycle(session):
+                    self.drivers.retire(session)
+                    session = None
+                    continue
+                try:
+                    one.prepare_next_search(failed)
+                except WebDriverException as e:
+                    logging.error(f"Worker {worker_id} browser is unusable, replacing it: {e}")
+                    self.drivers.retire(session)
+                    session = None
+        finally:
+            if session is not None:
+                self.drivers.release(session)
@@ -0,0 +1,122 @@
+import argparse
+import sys
+
+from Application.Cache import CACHE_PATH, TTL
+
+# pandas, selenium and undetected_chromedriver are imported once the arguments are
+# valid, so --help and argument errors are instant and worker processes start sooner
+FORMATS = ("csv", "xlsx", "parquet")
+
+
+def parse_shard(value: str) -> tuple:
+    """
+    Parse a "--shard i/n" value into (i, n).
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected i/n, got {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m Application", description="Scrape ONE cargo tracking milestones.")
+    parser.add_argument("input", help="Input file, booking numbers in the first column")
+    parser.add_argument("output", help="Output file")
+    parser.add_argument("--input-format", choices=FORMATS, help="Defaults to the input file extension")
+    parser.add_argument("--output-format", choices=FORMATS, help="Defaults to the output file extension")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each owning one browser")
+    parser.add_argument("--shard", type=parse_shard, metavar="i/n",
+                        help="Only process shard i of n, to split one input across hosts")
+    parser.add_argument("--pool-size", type=int, default=1, help="Browsers per process when --workers is 1")
+    parser.add_argument("--base-url", help="The cargo tracking page URL")
+    parser.add_argument("--cold-session", action="store_true", help="Refresh the page between bookings")
+    parser.add_argument("--no-api", action="store_true", help="Only scrape through the browser")
+    parser.add_argument("--capture-network", action="store_true",
+                        help="Build shipments from the page's captured JSON responses instead of the DOM")
+    parser.add_argument("--cache", default=CACHE_PATH, help="ResultCache database")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch every booking")
+    parser.add_argument("--cache-ttl", type=float, default=TTL,
+                        help="Seconds before an on-going shipment is fetched again")
+    parser.add_argument("--open-all-containers", action="store_true",
+                        help="Open every container instead of only those whose summary row changed")
+    parser.add_argument("--throughput", action="store_true",
+                        help="Headless browsers with images, fonts, stylesheets and analytics blocked")
+    parser.add_argument("--recycle-after", type=int,
+                        help="Bookings before a browser is replaced by a fresh one (default 200)")
+    parser.add_argument("--max-browser-mb", type=float,
+                        help="Replace a browser once it uses more memory than this (needs psutil)")
+    parser.add_argument("--fixed-rate", action="store_true",
+                        help="Search at full speed instead of slowing down when the site does")
+    parser.add_argument("--min-interval", type=float, default=0.0,
+                        help="Shortest pause in seconds between two browser searches")
+    parser.add_argument("--retry-budget", type=int,
+                        help="Retries allowed in the whole run before failures become final (default 100)")
+    parser.add_argument("--event-mapping",
+                        help="JSON list of [pattern, event] pairs replacing the built-in event mapping")
+    parser.add_argument("--diff",
+                        help="Append the milestone changes since the previous run to this JSON lines file")
+    parser.add_argument("--snapshot", help="State the changes are computed against (default snapshot.sqlite3)")
+    parser.add_argument("--async", dest="async_sessions", action="store_true",
+                        help="Drive the browsers from an asyncio orchestrator that cancels stuck bookings")
+    parser.add_argument("--task-timeout", type=float,
+                        help="Seconds a booking may run before --async cancels it (default 300)")
+    parser.add_argument("--schedule", action="store_true",
+                        help="Only fetch cached bookings whose next milestone is predicted soon")
+    parser.add_argument("--refresh-limit", type=int,
+                        help="Most bookings fetched per run with --schedule, the most overdue first")
+    parser.add_argument("--chunk-size", type=int,
+                        help="Bookings fetched before their rows are appended to the output (default 100)")
+    parser.add_argument("--metrics-json", help="Write per-stage latency and WebDriver call counts as JSON")
+    parser.add_argument("--metrics-prom", help="Write the same metrics as a Prometheus textfile")
+    args = parser.parse_args(argv)
+
+    from Application.Metrics import metrics
+    from Application.Runner import RunConfig, read_booking_numbers, select_shard, run_sharded
+
+    defaults = RunConfig()
+    config = RunConfig(
+        base_url=args.base_url or defaults.base_url,
+        pool_size=args.pool_size,
+        warm_session=not args.cold_session,
+        use_api=not args.no_api,
+        capture_network=args.capture_network,
+        cache_path=None if args.no_cache else args.cache,
+        cache_ttl=args.cache_ttl,
+        lazy_containers=not args.open_all_containers,
+        chunk_size=args.chunk_size or defaults.chunk_size,
+        throughput=args.throughput,
+        recycle_after=args.recycle_after or defaults.recycle_after,
+        max_browser_mb=args.max_browser_mb,
+        adaptive_rate=not args.fixed_rate,
+        min_interval=args.min_interval,
+        retry_budget=args.retry_budget if args.retry_budget is not None else defaults.retry_budget,
+        event_mapping=args.event_mapping,
+        diff_path=args.diff,
+        snapshot_path=args.snapshot or defaults.snapshot_path,
+        async_sessions=args.async_sessions,
+        task_timeout=args.task_timeout or defaults.task_timeout,
+        schedule=args.schedule,
+        refresh_limit=args.refresh_limit,
+    )
+
+    booking_numbers = read_booking_numbers(args.input, args.input_format)
+    if args.shard:
+        booking_numbers = select_shard(booking_numbers, *args.shard)
+    print(f"Processing {len(booking_numbers)} bookings")
+
+    try:
+        missing = run_sharded(config, booking_numbers, args.output, args.workers, args.output_format)
+    finally:
+        if args.metrics_json:
+            metrics.to_json(args.metrics_json)
+        if args.metrics_prom:
+            metrics.to_prometheus(args.metrics_prom)
+    print(metrics.report())
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,79 @@
 MAX_ATTEMPTS = 3
+MAX_DELAY = 30
+RETRY_BUDGET = 100 # retries allowed per run, across every retry loop and worker
+import os
+import random
+import threading
 import time
+from Application.Readiness import wait_stats
 
-def retry_until_success(func, max_retries=MAX_ATTEMPTS, delay=2, exceptions=(Exception,), on_fail_message=None, on_fail_execute_message=None):
-    
+
+class RetryBudget:
+    """
+    Retries left for the whole run, shared by every retry loop and worker thread.
+
+    Once it is spent, failing operations give up at their first failure instead of
+    waiting out their retries, so a run against a broken site ends quickly.
+    """
+
+    def __init__(self, limit=RETRY_BUDGET):
+        self._lock = threading.Lock()
+        self.reset(limit)
+
+    def reset(self, limit=RETRY_BUDGET):
+        with self._lock:
+            self.limit = limit
+            self.spent = 0
+
+    @property
+    def remaining(self):
+        return max(self.limit - self.spent, 0)
+
+    def spend(self):
+        """
+        Take one retry from the budget, returning False if none is left.
+        """
+        with self._lock:
+            if self.spent >= self.limit:
+                return False
+            self.spent += 1
+            return True
+
+
+retry_budget = RetryBudget()
+
+
+def write_atomic(path, content):
+    """
+    Replace a text file in one step, so readers and concurrent writers never see half a file.
+
+    The temporary file is named after the process, so processes writing the same
+    file at once do not clobber each other's temporary file; the last one wins intact.
+    """
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        file.write(content)
+    os.replace(temporary_path, path)
+
+
+def retry_until_success(func, max_retries=MAX_ATTEMPTS, delay=2, exceptions=(Exception,), on_fail_message=None, on_fail_execute_message=None, backoff=2, max_delay=MAX_DELAY, jitter=0.1):
+    """
+    Call `func` until it succeeds, sleeping `delay * backoff ** attempt` seconds
+    (capped at `max_delay`, +/- `jitter`) between attempts. Every retry is taken
+    from the run's `retry_budget`; when it is spent the first failure is final.
+    """
     for attempt in range(max_retries):
         try:
             return func()
         except exceptions as e:
             print(f"{on_fail_message or 'Attempt failed'}, retrying... ({attempt + 1}/{max_retries}) {e}")
-            time.sleep(delay)
-    raise Exception(on_fail_execute_message or "Max retries exceeded")
\ No newline at end of file
+            if attempt + 1 == max_retries:
+                break
+            if not retry_budget.spend():
+                print("Retry budget exhausted, giving up.")
+                break
+            pause = min(delay * backoff ** attempt, max_delay)
+            pause *= 1 + random.uniform(-jitter, jitter)
+            with wait_stats.waiting("retry backoff"):
+                time.sleep(pause)
+    raise Exception(on_fail_execute_message or "Max retries exceeded")
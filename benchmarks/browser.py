@@ -0,0 +1,100 @@
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from Application.WebDriverManager import Driver
+from benchmarks.replica import serve_replica
+from benchmarks.run import browser_rss
+
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+LOADS = 10
+TIMEOUT = 30
+# name -> Driver keyword arguments
+PROFILES = {
+    "headed": {},
+    "headless": {"headless": True},
+    "throughput": {"throughput": True},
+}
+
+
+def load_page(driver: Driver, url: str) -> float:
+    """
+    Load the tracking page until its search box is usable.
+
+    Returns:
+        float: Seconds from navigation to a visible search box
+    """
+    started = time.perf_counter()
+    driver.driver.get(url)
+    iframe = WebDriverWait(driver.driver, TIMEOUT).until(
+        EC.visibility_of_element_located((By.ID, "IframeCurrentEcom"))
+    )
+    driver.driver.switch_to.frame(iframe)
+    WebDriverWait(driver.driver, TIMEOUT).until(EC.visibility_of_element_located((By.ID, "searchName")))
+    elapsed = time.perf_counter() - started
+    driver.driver.switch_to.default_content()
+    return elapsed
+
+
+def benchmark_profile(name: str, url: str, loads: int = LOADS) -> Dict[str, Any]:
+    """
+    Start a browser with one profile, load the page repeatedly and measure it.
+
+    Args:
+        name (str): A key of PROFILES
+        url (str): The tracking page to load
+        loads (int): Number of page loads
+
+    Returns:
+        Dict[str, Any]: Startup time, page load times and browser RSS of the profile
+    """
+    started = time.perf_counter()
+    driver = Driver(**PROFILES[name])
+    startup = time.perf_counter() - started
+    try:
+        load_times: List[float] = [load_page(driver, url) for _ in range(loads)]
+        rss = browser_rss()
+    finally:
+        driver.driver.quit()
+    return {
+        "profile": name,
+        "startup_seconds": startup,
+        "load_mean_seconds": statistics.mean(load_times),
+        "load_median_seconds": statistics.median(load_times),
+        "load_max_seconds": max(load_times),
+        "browser_rss_bytes": rss,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare page load time and memory of the browser profiles.")
+    parser.add_argument("--loads", type=int, default=LOADS)
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=["headless", "throughput"])
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the replica adds to every request")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    server = serve_replica(port=0, latency=args.latency)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        results = [benchmark_profile(name, url, args.loads) for name in args.profiles]
+    finally:
+        server.shutdown()
+
+    for result in results:
+        rss = result["browser_rss_bytes"]
+        print(f"{result['profile']}: startup {result['startup_seconds']:.1f}s, "
+              f"page load {result['load_median_seconds']:.2f}s median / {result['load_max_seconds']:.2f}s max, "
+              f"browser RSS {f'{rss / 2 ** 20:.0f} MiB' if rss is not None else 'n/a (install psutil)'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,246 @@
+import argparse
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from Application.Api import TRACKING_PATH, SEARCH_COMMAND, DETAIL_COMMAND
+from Application.StubServer import FixtureStore, TrackingStubHandler, serve, HOST
+
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+PORT = 8766
+CONTAINERS = 3  # containers per booking
+MILESTONES = 10  # milestones per container
+LATENCY = 0.2  # seconds added to every tracking request
+INVALID_PREFIX = "INVALID"  # booking numbers answered with no results
+
+# (event, place, yard, has vessel), repeated legs are inserted for longer event lists
+ORIGIN_EVENTS = [
+    ("Empty Container Release to Shipper", "HO CHI MINH, VIET NAM", "CAT LAI", False),
+    ("Gate In to Outbound Terminal", "HO CHI MINH, VIET NAM", "CAT LAI", False),
+]
+LEG_EVENTS = [
+    ("Loaded on '{vessel}' at Port of Loading", "{port}", "TERMINAL {leg}", True),
+    ("'{vessel}' Departure from Port of Loading", "{port}", "TERMINAL {leg}", True),
+    ("'{vessel}' Arrival at Port of Discharging", "{next_port}", "TERMINAL {next_leg}", True),
+    ("Unloaded from '{vessel}' at Port of Discharging", "{next_port}", "TERMINAL {next_leg}", True),
+]
+DESTINATION_EVENTS = [
+    ("Gate Out from Inbound Terminal for Delivery to Consignee", "LOS ANGELES, CA, UNITED STATES", "YUSEN TERMINALS", False),
+    ("Empty Container Returned from Customer", "LOS ANGELES, CA, UNITED STATES", "YUSEN TERMINALS", False),
+]
+PORTS = ["HO CHI MINH, VIET NAM", "SINGAPORE", "BUSAN, KOREA", "LOS ANGELES, CA, UNITED STATES"]
+
+# The cargo tracking page: a Skip popup over the IframeCurrentEcom iframe.
+MAIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Cargo Tracking</title></head>
+<body style="margin:0">
+<div id="popup" style="position:fixed;inset:0;background:rgba(0,0,0,.5);z-index:10">
+  <div style="margin:20% auto;width:300px;background:#fff;padding:20px">
+    <p>Welcome to cargo tracking</p>
+    <button onclick="document.getElementById('popup').style.display='none'">Skip</button>
+  </div>
+</div>
+<iframe id="IframeCurrentEcom" src="/frame" style="width:100%;height:1000px;border:0"></iframe>
+</body></html>
+"""
+
+# The iframe content: search bar, container grid and milestone detail, filled from the tracking endpoint.
+FRAME_PAGE = """<!DOCTYPE html>
+<html><head><title>Tracking</title></head>
+<body>
+<input id="searchName" type="text"><button id="btnSearch" type="button">Search</button>
+<table id="main-grid"><tbody></tbody></table>
+<table id="detail"><tbody></tbody></table>
+<script>
+function post(form, done) {
+  var xhr = new XMLHttpRequest();
+  xhr.open('POST', '%(tracking_path)s');
+  xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+  xhr.onload = function () { done(JSON.parse(xhr.responseText)); };
+  xhr.send(new URLSearchParams(form).toString());
+}
+function replaceBody(table, html) {
+  var body = document.createElement('tbody');
+  body.innerHTML = html;
+  table.replaceChild(body, table.tBodies[0]);
+}
+function escape(text) {
+  var div = document.createElement('div');
+  div.textContent = text || '';
+  return div.innerHTML;
+}
+function showDetail(row) {
+  post({f_cmd: '%(detail_command)s', cntr_no: row.cntrNo, bkg_no: row.bkgNo, cop_no: row.copNo}, function (data) {
+    var html = '';
+    data.list.forEach(function (event, index) {
+      var vessel = event.vslEngNm
+        ? '<br><a title="' + escape(event.vslEngNm) + '">' + escape(event.vslEngNm + ' ' + event.skdVoyNo + event.skdDirCd) + '</a>'
+        : '';
+      html += '<tr><td>' + (index + 1) + '</td><td>' + escape(event.statusNm) + vessel + '</td>'
+        + '<td>' + escape(event.placeNm) + '<br>' + escape(event.yardNm) + '</td>'
+        + '<td>' + (event.actTpCd === 'E' ? 'Estimate' : 'Actual') + '<br>' + escape(event.eventDt) + '</td></tr>';
+    });
+    replaceBody(document.getElementById('detail'), html);
+  });
+}
+document.getElementById('btnSearch').onclick = function () {
+  var name = document.getElementById('searchName').value.trim();
+  post({f_cmd: '%(search_command)s', search_type: 'B', search_name: name, cust_cd: ''}, function (data) {
+    var html = '';
+    data.list.forEach(function (row, index) {
+      html += '<tr id="row' + index + '"><td>' + (index + 1) + '</td><td>' + escape(row.bkgNo) + '</td>'
+        + '<td>' + escape(row.cntrTpszNm) + '</td>'
+        + '<td title="' + escape(row.cntrNo) + '"><a href="javascript:void(0)">' + escape(row.cntrNo) + '</a></td>'
+        + '<td>' + escape(row.lastStatus) + '</td></tr>';
+    });
+    replaceBody(document.getElementById('main-grid'), html || '<tr><td colspan="5">No data found.</td></tr>');
+    var links = document.querySelectorAll('#main-grid > tbody > tr > td > a');
+    links.forEach(function (link, index) { link.onclick = function () { showDetail(data.list[index]); }; });
+    if (data.list.length) { showDetail(data.list[0]); }
+  });
+};
+</script>
+</body></html>
+""" % {"tracking_path": TRACKING_PATH, "search_command": SEARCH_COMMAND, "detail_command": DETAIL_COMMAND}
+
+
+def synthetic_events(seed: int, milestones: int) -> List[Dict[str, Any]]:
+    """
+    Build a plausible event list of exactly `milestones` events for one container.
+
+    The route gets as many vessel legs as needed and always ends with the
+    destination events, so the container is complete.
+    """
+    legs = max(-(-(milestones - len(ORIGIN_EVENTS) - len(DESTINATION_EVENTS)) // len(LEG_EVENTS)), 1)
+    template = list(ORIGIN_EVENTS)
+    for leg in range(legs):
+        vessel = f"REPLICA VESSEL {leg + 1}"
+        port, next_port = PORTS[leg % len(PORTS)], PORTS[(leg + 1) % len(PORTS)]
+        for event, place, yard, has_vessel in LEG_EVENTS:
+            template.append((
+                event.format(vessel=f"{vessel} {seed % 900 + 100:03d}W"),
+                place.format(port=port, next_port=next_port),
+                yard.format(leg=leg + 1, next_leg=leg + 2),
+                has_vessel and vessel,
+            ))
+    template = template[:max(milestones - len(DESTINATION_EVENTS), 0)] + DESTINATION_EVENTS
+
+    events = []
+    for index, (event, place, yard, vessel) in enumerate(template[-milestones:] if milestones else []):
+        day = 1 + index * 2 + seed % 3
+        events.append({
+            "statusNm": event, "placeNm": place, "yardNm": yard,
+            "eventDt": f"2025-{4 + day // 28:02d}-{1 + day % 28:02d} {seed % 24:02d}:{index * 7 % 60:02d}",
+            "actTpCd": "A",
+            "vslEngNm": vessel or "", "skdVoyNo": f"{seed % 900 + 100:03d}" if vessel else "",
+            "skdDirCd": "W" if vessel else "",
+        })
+    return events
+
+
+class SyntheticStore(FixtureStore):
+    """
+    Generates tracking responses for any booking number instead of reading fixtures.
+
+    Every booking gets `containers` containers with `milestones` events each,
+    derived from the booking number so repeated runs see the same data. Booking
+    numbers starting with INVALID_PREFIX have no containers, like unknown bookings.
+    """
+
+    def __init__(self, containers: int = CONTAINERS, milestones: int = MILESTONES) -> None:
+        super().__init__(fixtures_dir="")
+        self.containers = containers
+        self.milestones = milestones
+
+    def get(self, booking_number: str) -> Optional[Dict[str, Any]]:
+        if not booking_number:
+            return None
+        with self._lock:
+            if booking_number not in self._fixtures:
+                self._fixtures[booking_number] = self._generate(booking_number)
+            return self._fixtures[booking_number]
+
+    def find_container(self, container_id: str, booking_number: str = "") -> Optional[Dict[str, Any]]:
+        fixture = self.get(booking_number)
+        return fixture["details"].get(container_id) if fixture else None
+
+    def _generate(self, booking_number: str) -> Dict[str, Any]:
+        seed = sum(booking_number.encode())
+        rows, details = [], {}
+        for index in range(0 if booking_number.startswith(INVALID_PREFIX) else self.containers):
+            container_id = f"RPLU{(seed * 31 + index) % 10 ** 7:07d}"
+            events = synthetic_events(seed + index, self.milestones)
+            rows.append({
+                "cntrNo": container_id, "bkgNo": booking_number, "copNo": f"C{container_id}",
+                "cntrTpszNm": "40' DRY HC", "lastStatus": events[-1]["statusNm"] if events else "",
+            })
+            details[container_id] = {"list": events}
+        return {"search": {"list": rows}, "details": details}
+
+
+class ReplicaHandler(TrackingStubHandler):
+    """
+    Serves the tracking page replica and answers its requests after an injected latency.
+    """
+
+    latency: float = LATENCY
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path in ("/", "/frame"):
+            self.send_html(MAIN_PAGE if path == "/" else FRAME_PAGE)
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+    def do_POST(self) -> None:
+        time.sleep(self.latency)
+        super().do_POST()
+
+    def send_html(self, page: str) -> None:
+        body = page.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_replica(host: str = HOST, port: int = PORT, containers: int = CONTAINERS, milestones: int = MILESTONES,
+                  latency: float = LATENCY) -> ThreadingHTTPServer:
+    """
+    Start the tracking page replica on a background thread.
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind, 0 picks a free one
+        containers (int): Containers per booking
+        milestones (int): Milestones per container
+        latency (float): Seconds added to every tracking request
+
+    Returns:
+        ThreadingHTTPServer: The running server; the page is at http://host:port/
+    """
+    handler = type(ReplicaHandler.__name__, (ReplicaHandler,), {"latency": latency})
+    return serve(host, port, handler=handler, store=SyntheticStore(containers, milestones))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local replica of the cargo tracking page.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--containers", type=int, default=CONTAINERS)
+    parser.add_argument("--milestones", type=int, default=MILESTONES)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    args = parser.parse_args()
+
+    server = serve_replica(args.host, args.port, args.containers, args.milestones, args.latency)
+    print(f"Serving the tracking page replica on http://{args.host}:{server.server_address[1]}/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from Application.Metrics import metrics
+from Application.One import EcommOne
+from Application.WebDriverManager import Driver
+from benchmarks.replica import serve_replica, CONTAINERS, MILESTONES, LATENCY, INVALID_PREFIX
+
+from Application.logging_config import setup_logger
+setup_logger()
+
+# Constants
+BOOKINGS = 20
+
+
+def python_max_rss() -> Optional[int]:
+    """
+    Peak resident memory of this process, in bytes.
+
+    Returns:
+        Optional[int]: The peak RSS, or None on Windows without psutil
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024  # kilobytes except on macOS
+
+
+def browser_rss() -> Optional[int]:
+    """
+    Resident memory of every process started by this one (the browser and chromedriver), in bytes.
+
+    Returns:
+        Optional[int]: The summed RSS, or None if psutil is not installed
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+def run_benchmark(bookings: int = BOOKINGS, containers: int = CONTAINERS, milestones: int = MILESTONES,
+                  latency: float = LATENCY, headless: bool = True, warm_session: bool = True,
+                  throughput: bool = False, invalid: int = 0) -> Dict[str, Any]:
+    """
+    Scrape synthetic bookings from a local replica of the tracking page.
+
+    Args:
+        bookings (int): Number of bookings to scrape
+        containers (int): Containers per booking
+        milestones (int): Milestones per container
+        latency (float): Seconds the replica adds to every tracking request
+        headless (bool): Run the browser without a window
+        warm_session (bool): Reuse the loaded page between bookings
+        throughput (bool): Use the headless, resource-trimmed browser profile
+        invalid (int): Bookings, among `bookings`, that the replica answers with no results
+
+    Returns:
+        Dict[str, Any]: Throughput, WebDriver call and memory figures plus the stage metrics
+    """
+    server = serve_replica(port=0, containers=containers, milestones=milestones, latency=latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    booking_numbers = [f"{INVALID_PREFIX if index < invalid else 'BENCH'}{index:07d}" for index in range(bookings)]
+
+    metrics.reset()
+    started = time.perf_counter()
+    driver = Driver(headless=headless, throughput=throughput)
+    startup = time.perf_counter() - started
+    one = EcommOne(driver.driver, base_url, warm_session=warm_session)
+    try:
+        metrics.reset()  # scraping figures only, startup is reported on its own
+        started = time.perf_counter()
+        one.start(booking_numbers)
+        elapsed = time.perf_counter() - started
+        rss = browser_rss()
+    finally:
+        driver.driver.quit()
+        server.shutdown()
+
+    summary = metrics.summary()
+    scraped_containers = sum(len(shipment.containers) for shipment in one.shipments)
+    webdriver_calls = sum(call["count"] for call in summary["calls"].values())
+    return {
+        "bookings": bookings,
+        "containers_per_booking": containers,
+        "milestones_per_container": milestones,
+        "latency": latency,
+        "headless": headless,
+        "warm_session": warm_session,
+        "throughput": throughput,
+        "invalid": invalid,
+        "failed": sum(1 for shipment in one.shipments if shipment.error is not None),
+        "driver_startup_seconds": startup,
+        "elapsed_seconds": elapsed,
+        "bookings_per_minute": bookings / elapsed * 60 if elapsed else 0.0,
+        "webdriver_calls": webdriver_calls,
+        "webdriver_calls_per_container": webdriver_calls / scraped_containers if scraped_containers else 0.0,
+        "python_max_rss_bytes": python_max_rss(),
+        "browser_rss_bytes": rss,
+        "metrics": summary,
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    lines = [
+        f"Bookings: {result['bookings']} x {result['containers_per_booking']} containers x "
+        f"{result['milestones_per_container']} milestones, {result['latency']}s latency",
+        f"Driver startup: {result['driver_startup_seconds']:.1f}s",
+        f"Elapsed: {result['elapsed_seconds']:.1f}s, {result['bookings_per_minute']:.1f} bookings/min",
+        f"Failed: {result['failed']} ({result['invalid']} invalid)",
+        f"WebDriver calls: {result['webdriver_calls']}, {result['webdriver_calls_per_container']:.1f} per container",
+    ]
+    if result["python_max_rss_bytes"] is not None:
+        lines.append(f"Python max RSS: {result['python_max_rss_bytes'] / 2 ** 20:.0f} MiB")
+    if result["browser_rss_bytes"] is not None:
+        lines.append(f"Browser RSS: {result['browser_rss_bytes'] / 2 ** 20:.0f} MiB")
+    lines.append(metrics.report())
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local replica of the tracking page.")
+    parser.add_argument("--bookings", type=int, default=BOOKINGS)
+    parser.add_argument("--containers", type=int, default=CONTAINERS)
+    parser.add_argument("--milestones", type=int, default=MILESTONES)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--cold-session", action="store_true", help="Refresh the page between bookings")
+    parser.add_argument("--throughput", action="store_true", help="Use the resource-trimmed browser profile")
+    parser.add_argument("--invalid", type=int, default=0, help="Bookings answered with no results")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.bookings, args.containers, args.milestones, args.latency,
+                           headless=not args.headed, warm_session=not args.cold_session,
+                           throughput=args.throughput, invalid=args.invalid)
+    print(format_result(result))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+        print(f"Results written to {os.path.abspath(args.json)}")
@@ -0,0 +1,93 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from Application.Aggregate import aggregate, milestone_frame, OUTPUT_COLUMNS, MILESTONE_KEYS, read_cache
+from Application.Cache import ResultCache
+from Application.Events import EMPTY_RETURN
+from Application.Records import ContainerRecord, MilestoneRecord, ShipmentRecord, format_date
+
+SCRAPE_DATE = "05/01/25 12:00 PM"
+FIRST_OCCURRENCE_KEYS = {"Gate in", "Departure"}
+VESSEL_KEYS = {"Arrival", "Departure"}
+OTHER_EVENTS = ["Loaded on vessel", "Unloaded from vessel", "Transhipment", EMPTY_RETURN]
+
+
+def reference_rows(shipment):
+    """The per-container loop the aggregation replaced, kept as the reference semantics."""
+    rows = []
+    for container in shipment.containers:
+        row = dict.fromkeys(OUTPUT_COLUMNS)
+        row["Shipment ID"] = shipment.booking_number
+        row["Container ID"] = container.id
+        for milestone in container.milestones:
+            if milestone.event not in MILESTONE_KEYS:
+                continue
+            if row[milestone.event] is None or milestone.event not in FIRST_OCCURRENCE_KEYS:
+                row[milestone.event] = format_date(milestone.date)
+                if milestone.event in VESSEL_KEYS:
+                    row[f"{milestone.event} Vessel Name"] = milestone.vessel_name
+                    row[f"{milestone.event} Voyage ID"] = milestone.vessel_id
+        row["Scrape Date"] = SCRAPE_DATE
+        row["Status"] = 'Complete' if container.is_complete else 'On-going'
+        rows.append(row)
+    return rows
+
+
+def random_shipments(seed, count):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    shipments = []
+    for booking in range(count):
+        containers = []
+        for position in range(rng.randint(1, 4)):
+            milestones = []
+            for _ in range(rng.randint(0, 12)):
+                event = rng.choice([*MILESTONE_KEYS, *OTHER_EVENTS])
+                date = None if rng.random() < 0.1 else start + timedelta(minutes=rng.randrange(500000))
+                vessel = rng.random() < 0.5
+                milestones.append(MilestoneRecord(
+                    event, date, rng.choice(["SGSIN", "NLRTM"]),
+                    vessel_name=rng.choice(["ONE APUS", "ONE HANGZHOU"]) if vessel else None,
+                    vessel_id=f"{rng.randrange(100):03d}E" if vessel else None,
+                ))
+            containers.append(ContainerRecord(f"CONT{booking}{position}", tuple(milestones),
+                                              is_complete=rng.random() < 0.3))
+        shipments.append(ShipmentRecord(f"BKG{booking}", tuple(containers)))
+    return shipments
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_aggregate_matches_the_per_container_loop(seed):
+    shipments = random_shipments(seed, 250)
+
+    output = aggregate(milestone_frame(shipments), scrape_date=SCRAPE_DATE)
+
+    expected = [row for shipment in shipments for row in reference_rows(shipment)]
+    assert output.to_dict("records") == expected
+
+
+def test_failed_booking_gets_one_error_row():
+    shipments = [ShipmentRecord.failed("BAD", "No results for booking BAD"), *random_shipments(0, 1)]
+
+    output = aggregate(milestone_frame(shipments), scrape_date=SCRAPE_DATE)
+
+    error_row = output.iloc[0]
+    assert (error_row["Shipment ID"], error_row["Container ID"]) == ("BAD", None)
+    assert (error_row["Status"], error_row["Error"]) == ("Error", "No results for booking BAD")
+    assert output["Error"].iloc[1:].isna().all()
+
+
+def test_aggregate_from_the_cache_matches_the_records(tmp_path):
+    shipments = random_shipments(1, 20)
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    for shipment in shipments:
+        cache.put(shipment)
+    cache.close()
+
+    from_cache = aggregate(read_cache(str(tmp_path / "cache.sqlite3")), scrape_date=SCRAPE_DATE)
+    from_records = aggregate(milestone_frame(sorted(shipments, key=lambda s: s.booking_number)),
+                             scrape_date=SCRAPE_DATE)
+
+    assert from_cache.to_dict("records") == from_records.to_dict("records")
@@ -0,0 +1,68 @@
+import pytest
+
+from Application import StubServer
+from Application.Api import TrackingApi, TrackingApiError
+from Application.Search import BookingNotFound
+
+
+@pytest.fixture
+def api():
+    api = TrackingApi()
+    yield api
+    api.close()
+
+
+@pytest.mark.parametrize("rows, events", [
+    ([{"copNo": "J1"}], []),  # container row without container ID
+    (["C1"], []),  # container row that is not an object
+    ([{"cntrNo": "C1"}], [None]),  # event that is not an object
+    ([{"cntrNo": "C1"}], []),  # container without events
+])
+def test_unexpected_payloads_raise_tracking_api_error(api, rows, events):
+    api.search = lambda booking_number: rows
+    api.get_events = lambda booking_number, container_row: events
+
+    with pytest.raises(TrackingApiError):
+        api.get_shipment("A")
+
+
+def test_get_shipments_sends_broken_bookings_to_the_fallback(api):
+    rows = {"A": [{"cntrNo": "C1"}], "B": [{"copNo": "J1"}]}
+    api.search = lambda booking_number: rows[booking_number]
+    api.get_events = lambda booking_number, container_row: [
+        {"statusNm": "Gate In", "eventDt": "2025-01-01 10:00", "placeNm": "SGSIN"}
+    ]
+
+    shipments, failures = api.get_shipments(["A", "B"])
+
+    assert [shipment.booking_number for shipment in shipments.values()] == ["A"]
+    assert failures == {1: "B"}
+
+
+@pytest.fixture
+def stub_api():
+    server = StubServer.serve(port=0)
+    api = TrackingApi(base_url=f"http://{StubServer.HOST}:{server.server_address[1]}")
+    yield api
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_shipment_from_the_stub_server(stub_api):
+    shipment = stub_api.get_shipment("TESTBKG00001")
+
+    assert shipment.error is None
+    assert [container.id for container in shipment.containers] == ["TSTU0000011", "TSTU0000022"]
+    assert all(container.milestones for container in shipment.containers)
+
+
+def test_unknown_booking_is_not_sent_to_the_fallback(stub_api):
+    with pytest.raises(BookingNotFound):
+        stub_api.get_shipment("UNKNOWN")
+
+    shipments, failures = stub_api.get_shipments(["UNKNOWN", "TESTBKG00001"])
+
+    assert failures == {}
+    assert shipments[0].error == "No results for booking UNKNOWN"
+    assert shipments[1].error is None
@@ -0,0 +1,69 @@
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+from Application.Cache import ResultCache
+from Application.Events import GATE_IN, EMPTY_RETURN
+from Application.Records import ContainerRecord, MilestoneRecord, ShipmentRecord
+
+TTL = 60
+NOW = 1_000_000.0
+
+
+def shipment(booking_number, *events, summary=None):
+    milestones = tuple(MilestoneRecord(event, datetime(2025, 4, day + 1, 8, 0), "SGSIN", "ONE APUS", "012E")
+                       for day, event in enumerate(events))
+    return ShipmentRecord(booking_number, (
+        replace(ContainerRecord.from_milestones("C1", milestones), summary=summary),
+        ContainerRecord.from_milestones("C2", milestones[:1]),
+    ))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), ttl=TTL)
+    yield cache
+    cache.close()
+
+
+def test_round_trip_keeps_containers_and_milestones(cache):
+    original = shipment("A", GATE_IN, EMPTY_RETURN, summary="C1 Empty container return")
+    cache.put(original, now=NOW)
+    assert cache.get("A", now=NOW) == original
+
+
+def test_on_going_shipment_expires_after_the_ttl(cache):
+    cache.put(shipment("A", GATE_IN), now=NOW)
+    assert cache.get("A", now=NOW + TTL - 1) is not None
+    assert cache.get("A", now=NOW + TTL) is None
+    assert cache.peek("A") is not None
+
+
+def test_complete_shipment_never_expires(cache):
+    complete = ShipmentRecord("A", (ContainerRecord.from_milestones(
+        "C1", (MilestoneRecord(EMPTY_RETURN, None, "SGSIN"),)),))
+    cache.put(complete, now=NOW)
+    assert cache.get("A", now=NOW + 1000 * TTL) == complete
+
+
+def test_refresh_times_override_the_ttl(cache):
+    cache.put(shipment("A", GATE_IN), now=NOW)
+    cache.refresh_times = {"A": NOW + 10 * TTL}
+    assert cache.get("A", now=NOW + 5 * TTL) is not None
+    cache.refresh_times = {"A": NOW}
+    assert cache.get("A", now=NOW) is None
+
+
+def test_failed_shipments_are_not_cached(cache):
+    cache.put(ShipmentRecord.failed("A", "No results"), now=NOW)
+    assert cache.fetched_at("A") is None
+    assert cache.get("A", now=NOW) is None
+
+
+def test_put_replaces_the_previous_shipment(cache):
+    cache.put(shipment("A", GATE_IN), now=NOW)
+    cache.put(shipment("A", GATE_IN, EMPTY_RETURN), now=NOW + 1)
+    assert cache.fetched_at("A") == NOW + 1
+    assert [len(container.milestones) for container in cache.peek("A").containers] == [2, 1]
+    assert set(cache.get_containers("A")) == {"C1", "C2"}
@@ -0,0 +1,108 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from Application.Diff import ChangeDetector, MILESTONE_ADDED, MILESTONE_CHANGED, MILESTONE_REMOVED, COMPLETED, \
+    CONTAINER_REMOVED
+from Application.Events import GATE_IN, DEPARTURE, EMPTY_RETURN
+from Application.Records import ContainerRecord, MilestoneRecord, ShipmentRecord
+
+GATE_IN_MILESTONE = MilestoneRecord(GATE_IN, datetime(2025, 4, 1, 8, 0), "SGSIN")
+DEPARTURE_MILESTONE = MilestoneRecord(DEPARTURE, datetime(2025, 4, 3, 8, 0), "SGSIN", "ONE APUS", "012E")
+
+
+def shipment(*milestones, booking_number="A"):
+    return ShipmentRecord(booking_number, (ContainerRecord.from_milestones("C1", milestones),))
+
+
+@pytest.fixture
+def detect(tmp_path):
+    delta_path = tmp_path / "deltas.jsonl"
+
+    def detect(*shipments):
+        detector = ChangeDetector(str(delta_path), str(tmp_path / "snapshot.sqlite3"))
+        try:
+            detector.process(shipments)
+        finally:
+            detector.close()
+        lines = delta_path.read_text().splitlines() if delta_path.exists() else []
+        delta_path.unlink(missing_ok=True)
+        return [json.loads(line) for line in lines]
+
+    return detect
+
+
+def test_new_container_emits_every_milestone(detect):
+    deltas = detect(shipment(GATE_IN_MILESTONE, DEPARTURE_MILESTONE))
+
+    assert [(delta["type"], delta["event"]) for delta in deltas] == [
+        (MILESTONE_ADDED, GATE_IN), (MILESTONE_ADDED, DEPARTURE),
+    ]
+    assert deltas[1]["vessel_name"] == "ONE APUS"
+    assert {delta["booking_number"] for delta in deltas} == {"A"}
+
+
+def test_unchanged_container_emits_nothing(detect):
+    detect(shipment(GATE_IN_MILESTONE))
+    assert detect(shipment(GATE_IN_MILESTONE)) == []
+
+
+def test_new_estimate_is_a_change(detect):
+    detect(shipment(GATE_IN_MILESTONE, DEPARTURE_MILESTONE))
+    delayed = MilestoneRecord(DEPARTURE, datetime(2025, 4, 4, 8, 0), "SGSIN", "ONE APUS", "012E")
+
+    deltas = detect(shipment(GATE_IN_MILESTONE, delayed))
+
+    assert len(deltas) == 1
+    assert deltas[0]["type"] == MILESTONE_CHANGED
+    assert deltas[0]["changes"] == {"date": ["2025-04-03 08:00:00", "2025-04-04 08:00:00"]}
+
+
+def test_removed_milestone_and_completion(detect):
+    detect(shipment(GATE_IN_MILESTONE, DEPARTURE_MILESTONE))
+    empty_return = MilestoneRecord(EMPTY_RETURN, datetime(2025, 5, 1, 8, 0), "NLRTM")
+
+    deltas = detect(shipment(GATE_IN_MILESTONE, empty_return))
+
+    assert [delta["type"] for delta in deltas] == [MILESTONE_ADDED, MILESTONE_REMOVED, COMPLETED]
+
+
+def test_repeated_event_is_a_new_milestone(detect):
+    detect(shipment(GATE_IN_MILESTONE))
+    again = MilestoneRecord(GATE_IN, datetime(2025, 4, 2, 8, 0), "SGSIN")
+
+    deltas = detect(shipment(GATE_IN_MILESTONE, again))
+
+    assert [(delta["type"], delta["date"]) for delta in deltas] == [(MILESTONE_ADDED, "2025-04-02 08:00:00")]
+
+
+def test_failed_booking_keeps_its_snapshot(detect):
+    detect(shipment(GATE_IN_MILESTONE))
+    assert detect(ShipmentRecord.failed("A", "No results")) == []
+    assert detect(shipment(GATE_IN_MILESTONE)) == []
+
+
+def test_same_container_in_two_bookings_is_tracked_per_booking(detect):
+    deltas = detect(shipment(GATE_IN_MILESTONE), shipment(GATE_IN_MILESTONE, booking_number="B"))
+    assert [delta["booking_number"] for delta in deltas] == ["A", "B"]
+
+
+def test_container_dropped_from_a_booking_is_removed(detect):
+    two_containers = ShipmentRecord("A", (ContainerRecord.from_milestones("C1", [GATE_IN_MILESTONE]),
+                                          ContainerRecord.from_milestones("C2", [GATE_IN_MILESTONE])))
+    detect(two_containers)
+
+    deltas = detect(shipment(GATE_IN_MILESTONE))
+
+    assert [(delta["type"], delta["container_id"]) for delta in deltas] == [(CONTAINER_REMOVED, "C2")]
+    assert detect(shipment(GATE_IN_MILESTONE)) == []  # the removed container left the snapshot
+    assert [delta["type"] for delta in detect(two_containers)] == [MILESTONE_ADDED]
+
+
+def test_snapshot_lookup_is_batched(detect, monkeypatch):
+    monkeypatch.setattr("Application.Diff.MAX_VARIABLES", 2)
+    shipments = [shipment(GATE_IN_MILESTONE, booking_number=f"B{number}") for number in range(5)]
+
+    assert len(detect(*shipments)) == 5
+    assert detect(*shipments) == []
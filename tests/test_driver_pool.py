@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+from Application import DriverPool as driver_pool
+from Application.DriverPool import DriverPool, LAUNCH_ATTEMPTS
+
+from tests.test_orchestrator import FakeDriver
+
+
+class FakeFactory:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> FakeDriver:
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("browser did not start")
+            driver = FakeDriver()
+            self.drivers.append(driver)
+            return driver
+
+
+def wait_until(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def settled(pool: DriverPool, ready: int):
+    return lambda: pool._launching == 0 and pool._ready.qsize() == ready
+
+
+@pytest.fixture
+def factory():
+    return FakeFactory()
+
+
+def test_session_is_recycled_after_enough_bookings(factory):
+    pool = DriverPool(factory, size=1, spares=0, recycle_after=2)
+    session = pool.acquire()
+    session.bookings = 1
+    pool.release(session)
+    assert pool.acquire() is session
+
+    session.bookings = 2
+    pool.release(session)
+
+    wait_until(lambda: session.driver.driver.quits == 1)
+    wait_until(settled(pool, 0))
+    pool.close()
+
+
+def test_session_is_recycled_when_the_browser_grows_too_big(factory, monkeypatch):
+    rss = {}
+    monkeypatch.setattr(DriverPool, "rss", staticmethod(lambda session: rss.get(session)))
+    pool = DriverPool(factory, size=1, spares=0, max_rss=100)
+    session = pool.acquire()
+
+    rss[session] = 100
+    assert not pool.should_recycle(session)
+    rss[session] = 101
+    assert pool.should_recycle(session)
+    pool.release(session)
+
+    wait_until(lambda: session.driver.driver.quits == 1)
+    pool.close()
+
+
+def test_missing_psutil_or_pid_never_recycles(factory):
+    pool = DriverPool(factory, size=1, spares=0, max_rss=1)
+    session = pool.acquire()
+
+    assert pool.rss(session) is None  # the fake browser has no pid
+    assert not pool.should_recycle(session)
+    pool.close()
+
+
+def test_spares_are_refilled_after_acquire_and_retire(factory):
+    pool = DriverPool(factory, size=1, spares=1)
+    pool.start()
+    wait_until(settled(pool, 2))
+
+    first = pool.acquire()
+    wait_until(settled(pool, 1))
+    assert len(factory.drivers) == 2  # the spare covers the acquire
+
+    second = pool.acquire()
+    wait_until(settled(pool, 1))
+    assert len(factory.drivers) == 3
+
+    pool.retire(first)
+    wait_until(lambda: first.driver.driver.quits == 1)
+    wait_until(settled(pool, 1))
+    assert len(factory.drivers) == 3  # a spare is still ready
+    pool.release(second)
+    pool.close()
+    assert all(driver.driver.quits == 1 for driver in factory.drivers)
+
+
+def test_launch_does_not_sleep_after_the_last_attempt(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(driver_pool.time, "sleep", sleeps.append)
+    pool = DriverPool(FakeFactory(failures=LAUNCH_ATTEMPTS), size=1, spares=0)
+
+    with pool._lock:
+        pool._launching += 1
+    pool._launch()
+
+    assert len(sleeps) == LAUNCH_ATTEMPTS - 1
+    assert pool._ready.qsize() == 0 and pool._launching == 0
+
+
+def test_launch_retries_until_a_browser_starts(monkeypatch):
+    monkeypatch.setattr(driver_pool.time, "sleep", lambda seconds: None)
+    factory = FakeFactory(failures=LAUNCH_ATTEMPTS - 1)
+    pool = DriverPool(factory, size=1, spares=0)
+
+    session = pool.acquire()
+
+    assert session.driver is factory.drivers[0]
+    pool.close()
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from Application.Events import (EventNormalizer, configure, load_mapping, normalize_event,
+                                GATE_IN, DEPARTURE, ARRIVAL, DISCHARGE, GATE_OUT, EMPTY_RETURN)
+
+
+@pytest.mark.parametrize("raw, event", [
+    ("Gate In to Outbound Terminal", GATE_IN),
+    ("'TEST VESSEL 001W' Departure from Port of Loading", DEPARTURE),
+    ("'TEST VESSEL 001W' Arrival at Port of Discharging", ARRIVAL),
+    ("Unloaded from 'TEST VESSEL 001W' at Port of Discharging", DISCHARGE),
+    ("Gate Out from Inbound Terminal for Delivery to Consignee", GATE_OUT),
+    ("Empty Container Returned from Customer", EMPTY_RETURN),
+    ("Loaded on 'TEST VESSEL 001W' at Port of Loading", "Loaded on 'TEST VESSEL 001W' at Port of Loading"),
+    ("Empty Container Release to Shipper", "Empty Container Release to Shipper"),
+])
+def test_site_events_map_to_canonical_events(raw, event):
+    assert normalize_event(raw) == event
+
+
+@pytest.mark.parametrize("event", [GATE_IN, DEPARTURE, ARRIVAL, DISCHARGE, GATE_OUT, EMPTY_RETURN])
+def test_canonical_events_map_to_themselves(event):
+    assert normalize_event(event) == event
+    assert normalize_event(event.upper()) == event
+
+
+def test_first_pattern_in_table_order_wins():
+    normalizer = EventNormalizer([(r"gate out", "Out"), (r"gate", "Any gate")])
+    assert normalizer.normalize("Gate in, then gate out") == "Out"
+    assert normalizer.normalize("Gate in") == "Any gate"
+
+
+def test_results_are_memoized():
+    normalizer = EventNormalizer()
+    for _ in range(3):
+        normalizer.normalize("Gate In to Outbound Terminal")
+    assert normalizer.normalize.cache_info().hits == 2
+
+
+def test_empty_mapping_keeps_events():
+    assert EventNormalizer([]).normalize("Gate In") == "Gate In"
+
+
+def test_configure_replaces_and_restores_the_mapping(tmp_path):
+    path = tmp_path / "mapping.json"
+    path.write_text(json.dumps([["ontvangen", GATE_IN]]))
+    try:
+        configure(load_mapping(str(path)))
+        assert normalize_event("Container ontvangen") == GATE_IN
+        assert normalize_event("Gate In to Outbound Terminal") == "Gate In to Outbound Terminal"
+    finally:
+        configure()
+    assert normalize_event("Gate In to Outbound Terminal") == GATE_IN
+
+
+def test_load_mapping_rejects_other_shapes(tmp_path):
+    path = tmp_path / "mapping.json"
+    path.write_text(json.dumps({"gate in": GATE_IN}))
+    with pytest.raises(ValueError):
+        load_mapping(str(path))
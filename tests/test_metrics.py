@@ -0,0 +1,81 @@
+import pytest
+
+from Application.Metrics import Metrics, quantile, METRIC_PREFIX
+
+
+@pytest.mark.parametrize("q, expected", [
+    (0.0, 1.0),
+    (0.07, 7.0),  # 0.07 * 100 is 7.000000000000001 in floats
+    (0.5, 50.0),
+    (0.95, 95.0),
+    (0.99, 99.0),
+    (1.0, 100.0),
+])
+def test_quantile_is_nearest_rank(q, expected):
+    samples = [float(value) for value in range(1, 101)]
+
+    assert quantile(samples, q) == expected
+
+
+@pytest.mark.parametrize("q", [0.0, 0.5, 0.99, 1.0])
+def test_quantile_of_a_single_sample_is_that_sample(q):
+    assert quantile([3.0], q) == 3.0
+
+
+def test_quantile_of_no_samples_is_zero():
+    assert quantile([], 0.5) == 0.0
+
+
+def test_summary_sorts_samples_before_taking_quantiles():
+    metrics = Metrics()
+    for seconds in (3.0, 1.0, 2.0):
+        metrics.add("search", seconds)
+
+    stats = metrics.summary()["stages"]["search"]
+
+    assert stats == {"count": 3, "total": 6.0, "mean": 2.0, "p50": 2.0, "p95": 3.0, "p99": 3.0, "max": 3.0}
+
+
+def test_snapshots_of_shards_merge_into_one_summary():
+    parent, first, second = Metrics(), Metrics(), Metrics()
+    first.add("search", 1.0)
+    first.add_call("findElement", 0.5)
+    second.add("search", 3.0)
+    second.add("container click", 0.2)
+    second.add_call("findElement", 0.25)
+    second.add_call("executeScript", 1.0)
+
+    for shard in (first, second):
+        parent.merge(shard.snapshot())
+
+    summary = parent.summary()
+    assert summary["stages"]["search"]["count"] == 2
+    assert summary["stages"]["search"]["total"] == 4.0
+    assert summary["stages"]["container click"]["count"] == 1
+    assert summary["calls"] == {"findElement": {"count": 2, "total": 0.75},
+                                "executeScript": {"count": 1, "total": 1.0}}
+    # a snapshot is a copy: later samples of the shard do not leak into the parent
+    first.add("search", 5.0)
+    assert parent.summary()["stages"]["search"]["count"] == 2
+
+
+def test_prometheus_export(tmp_path):
+    metrics = Metrics()
+    metrics.add("search", 1.0)
+    metrics.add("search", 2.0)
+    metrics.add('odd "stage"', 0.5)
+    metrics.add_call("findElement", 0.25)
+    path = tmp_path / "metrics.prom"
+
+    metrics.to_prometheus(str(path))
+
+    lines = path.read_text().splitlines()
+    assert f"# TYPE {METRIC_PREFIX}_stage_seconds summary" in lines
+    assert f'{METRIC_PREFIX}_stage_seconds{{stage="search",quantile="0.5"}} 1.000000' in lines
+    assert f'{METRIC_PREFIX}_stage_seconds{{stage="search",quantile="0.99"}} 2.000000' in lines
+    assert f'{METRIC_PREFIX}_stage_seconds_sum{{stage="search"}} 3.000000' in lines
+    assert f'{METRIC_PREFIX}_stage_seconds_count{{stage="search"}} 2' in lines
+    assert f'{METRIC_PREFIX}_stage_seconds_count{{stage="odd \\"stage\\""}} 1' in lines
+    assert f'{METRIC_PREFIX}_webdriver_calls_total{{command="findElement"}} 1' in lines
+    assert f'{METRIC_PREFIX}_webdriver_call_seconds_total{{command="findElement"}} 0.250000' in lines
+    assert path.read_text().endswith("\n")
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from Application import One
+from Application.One import EcommOne
+from Application.Readiness import NO_RESULTS
+from Application.Records import ShipmentRecord
+from Application.Search import BookingNotFound
+
+
+class FakeDriver:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    def find_elements(self, by, value):
+        return self.rows
+
+
+class FakeCapture:
+    def __init__(self, error=None, click_time=0.0) -> None:
+        self.error = error
+        self.click_time = click_time
+
+    def capture_shipment(self, booking_number, submit_search, on_search_response=None):
+        submit_search()
+        if self.error is not None:
+            raise self.error
+        on_search_response()
+        time.sleep(self.click_time)  # container clicks
+        return ShipmentRecord(booking_number, ())
+
+
+class FakeRateController:
+    def __init__(self) -> None:
+        self.latencies = []
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+
+
+@pytest.fixture
+def one():
+    one = EcommOne(FakeDriver(["previous booking row"]), "http://tracking")
+    one.submit_search = lambda booking_number: None
+    return one
+
+
+def test_fallback_waits_for_the_previous_rows_to_go(one, monkeypatch):
+    waits = []
+
+    def wait_for_search_outcome(driver, previous_row, timeout):
+        waits.append(previous_row)
+        return NO_RESULTS
+
+    monkeypatch.setattr(One, "wait_for_search_outcome", wait_for_search_outcome)
+    one.network_capture = FakeCapture(error=TimeoutException("no response"))
+
+    with pytest.raises(BookingNotFound):
+        one.scrape("B")
+    assert waits == ["previous booking row"]
+
+
+def test_latency_covers_the_search_round_trip_only(one):
+    one.network_capture = FakeCapture(click_time=0.3)
+    one.rate_controller = FakeRateController()
+
+    one.scrape("B")
+
+    assert len(one.rate_controller.latencies) == 1
+    assert one.rate_controller.latencies[0] < 0.1
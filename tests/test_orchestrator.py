@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from Application.DriverPool import Session
+from Application.Orchestrator import AsyncOrchestrator, SessionLost, _Job
+from Application.Records import ShipmentRecord
+from Application.WorkerPool import WorkerPool, NORMAL
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.quits = 0
+        self.quit_event = threading.Event()
+
+    @property
+    def window_handles(self):
+        if self.quit_event.is_set():
+            raise WebDriverException("browser quit")
+        return ["main"]
+
+    def quit(self) -> None:
+        self.quits += 1
+        self.quit_event.set()
+
+
+class FakeDriver:
+    def __init__(self) -> None:
+        self.driver = FakeBrowser()
+
+
+class FakeOne:
+    searched = []
+    stuck = set()
+
+    def __init__(self, driver, base_url, **kwargs) -> None:
+        self.driver = driver
+
+    def open(self) -> None:
+        pass
+
+    def prepare_next_search(self, failed: bool = False) -> None:
+        pass
+
+    def search(self, booking_number: str) -> ShipmentRecord:
+        FakeOne.searched.append(booking_number)
+        if booking_number in FakeOne.stuck:
+            FakeOne.stuck.discard(booking_number)
+            self.driver.quit_event.wait(5)  # hangs until the browser is killed
+            raise WebDriverException("browser quit")
+        return ShipmentRecord(booking_number, ())
+
+
+@pytest.fixture
+def browsers(monkeypatch):
+    monkeypatch.setattr("Application.WorkerPool.EcommOne", FakeOne)
+    FakeOne.searched, FakeOne.stuck = [], set()
+    browsers = []
+
+    def factory():
+        browsers.append(FakeDriver())
+        return browsers[-1]
+
+    yield factory, browsers
+
+
+def test_stuck_booking_is_killed_and_retried(browsers):
+    factory, launched = browsers
+    FakeOne.stuck = {"B"}
+    orchestrator = AsyncOrchestrator("http://tracking", pool_size=2, task_timeout=0.5, driver_factory=factory)
+    try:
+        shipments = orchestrator.run(["A", "B", "C"])
+    finally:
+        orchestrator.close()
+
+    assert [shipment.booking_number for shipment in shipments] == ["A", "B", "C"]
+    assert FakeOne.searched.count("B") == 2
+    assert all(browser.driver.quits <= 1 for browser in launched)
+
+
+def test_kill_does_not_retire_a_session_given_back():
+    orchestrator = AsyncOrchestrator("http://tracking", pool_size=1, driver_factory=FakeDriver)
+    retired = []
+    orchestrator.drivers.retire = retired.append
+    job = _Job(0, "A", NORMAL)
+    session = job.session = Session(FakeDriver())
+    try:
+        assert orchestrator._take_session(job) is session
+        orchestrator._kill(job)
+        assert retired == []
+    finally:
+        orchestrator.close()
+
+
+def test_killed_session_is_retired_once_and_not_given_back():
+    orchestrator = AsyncOrchestrator("http://tracking", pool_size=1, driver_factory=FakeDriver)
+    retired = []
+    orchestrator.drivers.retire = retired.append
+    job = _Job(0, "A", NORMAL)
+    session = job.session = Session(FakeDriver())
+    try:
+        orchestrator._kill(job)
+        orchestrator._kill(job)
+        with pytest.raises(SessionLost):
+            orchestrator._take_session(job)
+        assert retired == [session]
+    finally:
+        orchestrator.close()
+
+
+@pytest.mark.parametrize("pool_class", [WorkerPool, AsyncOrchestrator])
+def test_missing_priority_runs_as_normal(browsers, pool_class):
+    factory, _ = browsers
+    pool = pool_class("http://tracking", pool_size=1, driver_factory=factory)
+    try:
+        shipments = pool.run(["A", "B", "C"], priorities={"C": NORMAL - 1, "A": NORMAL + 1})
+    finally:
+        pool.close()
+
+    assert FakeOne.searched == ["C", "B", "A"]
+    assert [shipment.booking_number for shipment in shipments] == ["A", "B", "C"]
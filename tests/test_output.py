@@ -0,0 +1,95 @@
+import csv
+
+import pandas as pd
+import pytest
+
+from Application.Output import OutputWriter
+
+COLUMNS = ["Shipment ID", "Container ID"]
+
+
+def rows(*booking_numbers):
+    return pd.DataFrame([{"Shipment ID": booking_number, "Container ID": f"{booking_number}-C1"}
+                         for booking_number in booking_numbers], columns=COLUMNS)
+
+
+def read(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return [row["Shipment ID"] for row in csv.DictReader(file)]
+
+
+def test_resume_skips_written_bookings_and_drops_unchecked_rows(tmp_path):
+    path = str(tmp_path / "out.csv")
+    writer = OutputWriter(path, columns=COLUMNS)
+    writer.write(["A", "B"], rows("A", "B"))
+    writer._file.write("C,C-C1\n")  # rows of a chunk that was never checkpointed
+    writer._file.close()
+
+    resumed = OutputWriter(path, columns=COLUMNS)
+    assert resumed.completed() == {"A", "B"}
+    resumed.write(["C"], rows("C"))
+    resumed.finalize()
+
+    assert read(path) == ["A", "B", "C"]
+    assert not (tmp_path / "out.csv.checkpoint").exists()
+
+
+def test_torn_checkpoint_line_is_ignored(tmp_path):
+    path = str(tmp_path / "out.csv")
+    writer = OutputWriter(path, columns=COLUMNS)
+    writer.write(["A"], rows("A"))
+    writer.write(["B"], rows("B"))
+    writer._file.close()
+    checkpoint = tmp_path / "out.csv.checkpoint"
+    lines = checkpoint.read_text().splitlines()
+    checkpoint.write_text(lines[0] + "\n" + lines[1][:10])
+
+    resumed = OutputWriter(path, columns=COLUMNS)
+    assert resumed.completed() == {"A"}
+    resumed.finalize()
+    assert read(path) == ["A"]
+
+
+def test_output_without_checkpoint_starts_over(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("old,output\n")
+
+    writer = OutputWriter(str(path), columns=COLUMNS)
+    writer.write(["A"], rows("A"))
+    writer.finalize()
+
+    assert read(path) == ["A"]
+
+
+def test_xlsx_output_is_converted_from_the_staging_file(tmp_path):
+    pytest.importorskip("openpyxl")
+    path = str(tmp_path / "out.xlsx")
+    writer = OutputWriter(path, columns=COLUMNS)
+    writer.write(["A", "B"], rows("A", "B"))
+    writer.finalize()
+
+    assert pd.read_excel(path)["Shipment ID"].tolist() == ["A", "B"]
+    assert not (tmp_path / "out.xlsx.partial.csv").exists()
+
+
+def test_unsupported_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        OutputWriter(str(tmp_path / "out.json"), columns=COLUMNS)
+
+
+def test_torn_checkpoint_line_does_not_swallow_later_entries(tmp_path):
+    path = str(tmp_path / "out.csv")
+    writer = OutputWriter(path, columns=COLUMNS)
+    writer.write(["A"], rows("A"))
+    writer._file.close()
+    checkpoint = tmp_path / "out.csv.checkpoint"
+    checkpoint.write_text(checkpoint.read_text() + '{"booking_number": "B", "off')
+
+    resumed = OutputWriter(path, columns=COLUMNS)
+    resumed.write(["C"], rows("C"))
+    resumed._file.close()
+
+    resumed_again = OutputWriter(path, columns=COLUMNS)
+    assert resumed_again.completed() == {"A", "C"}
+    resumed_again.finalize()
+    assert read(path) == ["A", "C"]
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from Application import RateController as rate
+from Application.RateController import RateController
+from Application.helpers import RetryBudget, retry_until_success, retry_budget
+
+
+def test_fast_searches_raise_concurrency_additively():
+    controller = RateController(4, min_interval=0.0)
+    controller.record_timeout()
+    assert controller.concurrency == 2
+
+    for _ in range(2):  # a full window of fast searches at concurrency 2
+        controller.record_success(1.0)
+    assert controller.concurrency == 3
+    assert controller.interval == pytest.approx(rate.BACKOFF_INTERVAL - rate.INTERVAL_STEP)
+
+
+def test_timeouts_halve_concurrency_and_double_the_pause():
+    controller = RateController(8)
+    controller.record_timeout()
+    assert (controller.concurrency, controller.interval) == (4, rate.BACKOFF_INTERVAL)
+    controller.record_timeout()
+    assert (controller.concurrency, controller.interval) == (2, 2 * rate.BACKOFF_INTERVAL)
+    for _ in range(5):
+        controller.record_timeout()
+    assert (controller.concurrency, controller.interval) == (1, rate.MAX_INTERVAL)
+
+
+def test_concurrency_never_exceeds_the_maximum():
+    controller = RateController(2, min_interval=0.5)
+    for _ in range(20):
+        controller.record_success(0.1)
+    assert (controller.concurrency, controller.interval) == (2, 0.5)
+
+
+def test_slow_searches_stretch_the_pause():
+    controller = RateController(2, target_latency=1.0)
+    controller.record_success(3.0)
+    assert controller.concurrency == 2
+    assert controller.interval == rate.INTERVAL_STEP
+    controller.record_success(3.0)
+    assert controller.interval == pytest.approx(rate.INTERVAL_STEP * rate.SLOW_FACTOR)
+
+
+def test_challenge_drops_to_minimum_and_pauses_everyone():
+    controller = RateController(4, min_concurrency=1)
+    controller.record_challenge()
+    assert (controller.concurrency, controller.interval) == (1, rate.MAX_INTERVAL)
+    assert controller._paused_until > time.monotonic() + rate.CHALLENGE_COOLDOWN - 1
+
+
+def test_search_timeout_follows_recent_latency():
+    controller = RateController(1)
+    assert controller.search_timeout() == rate.TIMEOUT
+    for _ in range(rate.MIN_SAMPLES):
+        controller.record_success(1.0)
+    assert controller.search_timeout() == rate.MIN_TIMEOUT
+    for _ in range(rate.LATENCY_WINDOW):
+        controller.record_success(20.0)
+    assert controller.search_timeout() == rate.MAX_TIMEOUT
+
+
+def test_slots_limit_concurrent_searches():
+    controller = RateController(2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def search():
+        with controller.slot():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=search) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert controller.state()["active"] == 0
+
+
+def test_retry_budget_is_shared_and_resettable():
+    budget = RetryBudget(2)
+    assert [budget.spend() for _ in range(3)] == [True, True, False]
+    assert budget.remaining == 0
+    budget.reset(1)
+    assert (budget.remaining, budget.spend()) == (1, True)
+
+
+def test_spent_budget_makes_the_first_failure_final():
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError("broken")
+
+    retry_budget.reset(0)
+    try:
+        with pytest.raises(Exception, match="Max retries exceeded"):
+            retry_until_success(fail, max_retries=5, delay=0)
+    finally:
+        retry_budget.reset()
+    assert len(calls) == 1
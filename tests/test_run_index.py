@@ -0,0 +1,59 @@
+import pytest
+
+from Application.Api import TrackingApi
+from Application.Milestone import Milestone
+from Application.RunIndex import RunIndex
+
+
+@pytest.fixture
+def api():
+    index = RunIndex()
+    api = TrackingApi(index=index)
+    api.requests = []
+    api.rows = {}
+
+    def get_events(booking_number, container_row):
+        api.requests.append((booking_number, container_row["cntrNo"]))
+        return [{"statusNm": "Gate In", "eventDt": "2025-01-01 10:00", "placeNm": f"Yard {booking_number}"}]
+
+    api.search = lambda booking_number: api.rows[booking_number]
+    api.get_events = get_events
+    yield api
+    api.close()
+
+
+def test_container_on_the_same_journey_is_fetched_once(api):
+    api.rows = {"A": [{"cntrNo": "C1", "copNo": "J1"}], "B": [{"cntrNo": "C1", "copNo": "J1"}]}
+
+    first, second = api.get_shipment("A"), api.get_shipment("B")
+
+    assert api.requests == [("A", "C1")]
+    assert second.containers == first.containers
+    assert api.index.hits == 1
+
+
+def test_container_on_another_journey_is_fetched_again(api):
+    api.rows = {"A": [{"cntrNo": "C1", "copNo": "J1"}], "B": [{"cntrNo": "C1", "copNo": "J2"}]}
+
+    first, second = api.get_shipment("A"), api.get_shipment("B")
+
+    assert api.requests == [("A", "C1"), ("B", "C1")]
+    assert second.containers[0].milestones != first.containers[0].milestones
+
+
+def test_container_without_journey_is_never_reused():
+    index = RunIndex()
+    index.add_container(object(), None)
+    assert index.containers == {}
+    assert index.container("C1", None) is None
+
+
+def test_vessel_names_are_shared_between_voyages():
+    index = RunIndex()
+    cells = {"event": "Departure", "date": "", "location": "SGSIN", "vessel_title": "ONE APUS"}
+    first = Milestone.from_cells({**cells, "vessel_text": "ONE APUS 012E"}, index=index)
+    second = Milestone.from_cells({**cells, "vessel_text": "ONE APUS 013W"}, index=index)
+
+    assert first.vessel_name is second.vessel_name
+    assert (first.vessel_id, second.vessel_id) == ("012E", "013W")
+    assert index.vessels == {"ONE APUS": "ONE APUS"}
@@ -0,0 +1,48 @@
+import zlib
+
+import pandas as pd
+import pytest
+
+from Application.Aggregate import OUTPUT_COLUMNS
+from Application.Runner import select_shard, merge_outputs
+
+
+def part(path, *booking_numbers):
+    rows = pd.DataFrame([{"Shipment ID": booking_number, "Container ID": f"{booking_number}-C1"}
+                         for booking_number in booking_numbers], columns=OUTPUT_COLUMNS)
+    rows.to_csv(path, index=False)
+    return str(path)
+
+
+def test_select_shard_is_stable_and_covers_every_booking():
+    booking_numbers = [f"BKG{number:05d}" for number in range(50)]
+
+    shards = [select_shard(booking_numbers, index, 3) for index in (1, 2, 3)]
+
+    assert sorted(sum(shards, [])) == booking_numbers
+    for index, shard in enumerate(shards, start=1):
+        assert shard == [booking_number for booking_number in booking_numbers
+                         if zlib.crc32(booking_number.encode()) % 3 == index - 1]
+    # the split does not depend on the order of the input
+    assert select_shard(list(reversed(booking_numbers)), 2, 3) == list(reversed(shards[1]))
+
+
+def test_select_shard_rejects_invalid_shards():
+    with pytest.raises(ValueError):
+        select_shard(["A"], 0, 2)
+    with pytest.raises(ValueError):
+        select_shard(["A"], 3, 2)
+
+
+def test_merge_outputs_keeps_part_order_and_leading_zeros(tmp_path):
+    part_paths = [part(tmp_path / "out.csv.part-1.csv", "B", "00123"),
+                  part(tmp_path / "out.csv.part-2.csv", "A", "0042")]
+    output_path = str(tmp_path / "out.csv")
+
+    merge_outputs(part_paths, output_path)
+
+    merged = pd.read_csv(output_path, dtype=str)
+    assert merged["Shipment ID"].tolist() == ["B", "00123", "A", "0042"]
+    assert merged["Container ID"].tolist() == ["B-C1", "00123-C1", "A-C1", "0042-C1"]
+    assert list(merged.columns) == OUTPUT_COLUMNS
+    assert not any(path.name.startswith("out.csv.part-") for path in tmp_path.iterdir())
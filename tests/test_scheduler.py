@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from Application.Cache import ResultCache
+from Application.Events import GATE_IN, DEPARTURE, EMPTY_RETURN
+from Application.Records import ContainerRecord, MilestoneRecord, ShipmentRecord
+from Application.Runner import Runner, RunConfig, DEFERRED_ERROR
+from Application.Scheduler import Scheduler, NEVER, MIN_INTERVAL, predict_next_event
+from Application.WorkerPool import NORMAL
+
+NOW = datetime(2025, 5, 1, 12, 0).timestamp()
+DAY = 24 * 60 * 60
+
+
+def shipment(booking_number, *events):
+    milestones = tuple(MilestoneRecord(event, date, "SGSIN") for event, date in events)
+    return ShipmentRecord(booking_number, (ContainerRecord.from_milestones(f"{booking_number}-C1", milestones),))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_predict_next_event_prefers_an_upcoming_estimate():
+    now = datetime(2025, 5, 1)
+    container = shipment("A", (GATE_IN, now - timedelta(days=1)), (DEPARTURE, now + timedelta(days=2))).containers[0]
+    assert predict_next_event(container, now) == now + timedelta(days=2)
+
+
+def test_predict_next_event_is_none_for_a_complete_container():
+    now = datetime(2025, 5, 1)
+    container = shipment("A", (GATE_IN, now - timedelta(days=20)), (EMPTY_RETURN, now - timedelta(days=1))).containers[0]
+    assert predict_next_event(container, now) is None
+
+
+def test_plan_skips_complete_and_recent_bookings(cache):
+    overdue = datetime.fromtimestamp(NOW) - timedelta(days=10)
+    cache.put(shipment("OVERDUE", (GATE_IN, overdue)), now=NOW - 5 * DAY)
+    cache.put(shipment("RECENT", (GATE_IN, overdue)), now=NOW - MIN_INTERVAL / 2)
+    cache.put(shipment("DONE", (GATE_IN, overdue), (EMPTY_RETURN, overdue)), now=NOW - 5 * DAY)
+
+    plan = Scheduler(cache).plan(["NEW", "OVERDUE", "RECENT", "DONE"], now=NOW)
+
+    assert plan.due == ["OVERDUE", "NEW"]
+    assert plan.skip == {"RECENT", "DONE"}
+    assert plan.refresh_times["DONE"] == NEVER
+
+
+def test_plan_limit_covers_new_and_cached_bookings(cache):
+    for age, booking_number in enumerate(["OLD1", "OLD2", "OLD3"], start=1):
+        fetched_at = NOW - (10 - age) * DAY
+        gate_in = datetime.fromtimestamp(fetched_at) - timedelta(days=1)
+        cache.put(shipment(booking_number, (GATE_IN, gate_in)), now=fetched_at)
+
+    plan = Scheduler(cache).plan(["NEW1", "NEW2", "NEW3", "OLD3", "OLD2", "OLD1"], now=NOW, limit=2)
+
+    assert plan.due == ["OLD1", "OLD2"]
+    assert plan.skip == {"NEW1", "NEW2", "NEW3", "OLD3"}
+
+
+def test_runner_honours_the_refresh_limit(tmp_path):
+    runner = Runner(RunConfig(cache_path=str(tmp_path / "cache.sqlite3"), use_api=False,
+                              schedule=True, refresh_limit=1))
+    try:
+        gate_in = datetime.now() - timedelta(days=30)
+        runner.cache.put(shipment("OLD", (GATE_IN, gate_in)), now=gate_in.timestamp())
+        runner.cache.put(shipment("RECENT", (GATE_IN, gate_in)))
+
+        runner.plan(["NEW", "RECENT", "OLD"])
+
+        assert runner.priorities == {"OLD": NORMAL}
+        assert runner.skip == {"NEW", "RECENT"}
+        assert runner.deferred == {"NEW"}
+        # skipped, so served from the cache or deferred without a browser
+        fetched = {record.booking_number: record for record in runner.fetch(["NEW", "RECENT"])}
+        assert fetched["RECENT"].error is None
+        assert fetched["NEW"].error == DEFERRED_ERROR
+    finally:
+        runner.close()
@@ -0,0 +1,120 @@
+import json
+import sys
+import types
+
+import pytest
+
+from Application.StartupCache import user_agents, patched_driver_path, FALLBACK_USER_AGENTS, USER_AGENTS_FILE
+
+
+@pytest.fixture(autouse=True)
+def clear_user_agents():
+    user_agents.cache_clear()
+    yield
+    user_agents.cache_clear()
+
+
+def fake_module(monkeypatch, name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    monkeypatch.setitem(sys.modules, name, module)
+
+
+class FakeUserAgent:
+    def __init__(self) -> None:
+        self.count = 0
+
+    @property
+    def random(self) -> str:
+        self.count += 1
+        return f"Agent/{self.count % 3}"
+
+
+class BrokenUserAgent:
+    def __init__(self) -> None:
+        raise RuntimeError("no browser data offline")
+
+
+def test_missing_pool_is_built_and_saved(tmp_path, monkeypatch):
+    fake_module(monkeypatch, "fake_useragent", UserAgent=FakeUserAgent)
+
+    pool = user_agents(str(tmp_path))
+
+    assert pool == ["Agent/0", "Agent/1", "Agent/2"]
+    assert json.loads((tmp_path / USER_AGENTS_FILE).read_text()) == pool
+
+
+def test_saved_pool_is_loaded_without_fake_useragent(tmp_path, monkeypatch):
+    fake_module(monkeypatch, "fake_useragent", UserAgent=BrokenUserAgent)
+    (tmp_path / USER_AGENTS_FILE).write_text(json.dumps(["Saved/1"]))
+
+    assert user_agents(str(tmp_path)) == ["Saved/1"]
+
+
+@pytest.mark.parametrize("content", [None, "[\"torn", "[]"])
+def test_unusable_pool_falls_back_to_the_built_in_agents(tmp_path, monkeypatch, content):
+    fake_module(monkeypatch, "fake_useragent", UserAgent=BrokenUserAgent)
+    if content is not None:
+        (tmp_path / USER_AGENTS_FILE).write_text(content)
+
+    assert user_agents(str(tmp_path)) == FALLBACK_USER_AGENTS
+
+
+def test_corrupt_pool_is_rebuilt(tmp_path, monkeypatch):
+    fake_module(monkeypatch, "fake_useragent", UserAgent=FakeUserAgent)
+    (tmp_path / USER_AGENTS_FILE).write_text("{not json")
+
+    pool = user_agents(str(tmp_path))
+
+    assert pool == ["Agent/0", "Agent/1", "Agent/2"]
+    assert json.loads((tmp_path / USER_AGENTS_FILE).read_text()) == pool
+
+
+class FakePatcher:
+    patched = []
+
+    def __init__(self, version_main: int) -> None:
+        self.version_main = version_main
+        self.executable_path = None
+
+    def auto(self) -> None:
+        FakePatcher.patched.append(self.version_main)
+        self.executable_path = str(FakePatcher.download_dir / f"patched-{self.version_main}")
+        with open(self.executable_path, "w") as file:
+            file.write(f"chromedriver {self.version_main}")
+
+
+@pytest.fixture
+def patcher(tmp_path, monkeypatch):
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+    FakePatcher.patched, FakePatcher.download_dir = [], download_dir
+    fake_module(monkeypatch, "undetected_chromedriver.patcher", Patcher=FakePatcher)
+    return FakePatcher
+
+
+def test_patched_driver_is_copied_once_and_reused(tmp_path, patcher):
+    cache_dir = str(tmp_path / "cache")
+
+    path = patched_driver_path(135, cache_dir)
+
+    assert open(path).read() == "chromedriver 135"
+    assert path.startswith(str(tmp_path / "cache"))
+    assert patched_driver_path(135, cache_dir) == path
+    assert patcher.patched == [135]
+    assert [name for name in (tmp_path / "cache").iterdir() if name.suffix == ".tmp"] == []
+
+    other = patched_driver_path(136, cache_dir)
+    assert other != path
+    assert patcher.patched == [135, 136]
+
+
+def test_failed_patch_returns_none_and_caches_nothing(tmp_path, patcher, monkeypatch):
+    def auto(self):
+        raise OSError("offline")
+
+    monkeypatch.setattr(FakePatcher, "auto", auto)
+    cache_dir = tmp_path / "cache"
+
+    assert patched_driver_path(135, str(cache_dir)) is None
+    assert not cache_dir.exists() or list(cache_dir.iterdir()) == []